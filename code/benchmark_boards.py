@@ -0,0 +1,180 @@
+import argparse
+import copy
+import importlib
+import random
+import time
+
+from dlgo.agent import naive
+from dlgo.agent.helpers import is_point_an_eye
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player, Point
+
+"""
+Board-level benchmarks, i.e. the cost of the board engine itself rather than of an agent choosing moves.
+
+- replay: random games are recorded once, then every engine replays the same move lists with place_stone on a
+  single board, and walks them down and back up again with play/undo.
+- playouts: complete random games (uniform over legal_moves(), never filling our own eyes), the workload of
+  Monte Carlo rollouts on small boards.
+- ko check: the next hash for every capturing move in the last third of the recorded games (the capture heavy
+  endgame), computed with play/zobrist_hash/undo and with hash_after, which doesn't touch the board.
+- big group: a stone is played and taken back next to a 60 stone group, which is where string bookkeeping that
+  rewrites the whole group on every liberty change hurts.
+
+    python benchmark_boards.py --board-size 19 --games 10
+"""
+
+
+def record_games(board_size, num_games, seed):
+    from dlgo import goboard_array
+    random.seed(seed)
+    bot = naive.RandomBot()
+    games = []
+    for _ in range(num_games):
+        game = goboard_array.GameState.new_game(board_size)
+        moves = []
+        while not game.is_over():
+            move = bot.select_move(game)
+            if move.is_play:
+                moves.append((game.next_player, move.point))
+            game = game.apply_move(move)
+        games.append(moves)
+    return games
+
+
+def time_replay(engine, board_size, games):
+    start = time.perf_counter()
+    for moves in games:
+        board = engine.Board(board_size, board_size)
+        for player, point in moves:
+            board.place_stone(player, point)
+    place_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for moves in games:
+        board = engine.Board(board_size, board_size)
+        for player, point in moves:
+            board.play(player, point)
+        for _ in moves:
+            board.undo()
+    play_undo_time = time.perf_counter() - start
+    return place_time, play_undo_time
+
+
+def random_playout(engine, board_size):
+    game = engine.GameState.new_game(board_size)
+    num_moves = 0
+    while not game.is_over():
+        candidates = [
+            move for move in game.legal_moves()
+            if move.is_play and not is_point_an_eye(game.board, move.point, game.next_player)]
+        game = game.apply_move(random.choice(candidates) if candidates else Move.pass_turn())
+        num_moves += 1
+    return num_moves
+
+
+def time_playouts(engine, board_size, num_playouts, seed):
+    random.seed(seed)
+    num_moves = 0
+    start = time.perf_counter()
+    for _ in range(num_playouts):
+        num_moves += random_playout(engine, board_size)
+    return num_moves, time.perf_counter() - start
+
+
+def endgame_captures(engine, board_size, games):
+    """(board, player, point) for every capturing move available in the last third of each game."""
+    positions = []
+    for moves in games:
+        board = engine.Board(board_size, board_size)
+        for i, (player, point) in enumerate(moves):
+            board.place_stone(player, point)
+            if i < len(moves) * 2 // 3 or i + 1 == len(moves):
+                continue
+            next_player = moves[i + 1][0]
+            snapshot = copy.deepcopy(board)
+            for r in range(1, board_size + 1):
+                for c in range(1, board_size + 1):
+                    candidate = Point(r, c)
+                    if board.get(candidate) is None and board.will_capture(next_player, candidate):
+                        positions.append((snapshot, next_player, candidate))
+    return positions
+
+
+def time_ko_checks(positions):
+    start = time.perf_counter()
+    for board, player, point in positions:
+        board.play(player, point)
+        board.zobrist_hash()
+        board.undo()
+    play_undo_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for board, player, point in positions:
+        board.hash_after(player, point)
+    hash_after_time = time.perf_counter() - start
+    return play_undo_time, hash_after_time
+
+
+def time_big_group(engine, board_size, repeats):
+    board = engine.Board(board_size, board_size)
+    # Three full rows plus three stones: a single 60 stone string on 19x19.
+    for row in (1, 2, 3):
+        for col in range(1, board_size + 1):
+            board.place_stone(Player.black, Point(row, col))
+    for col in (1, 2, 3):
+        board.place_stone(Player.black, Point(4, col))
+    print('  %s: big group has %d stones' % (
+        engine.__name__.split('.')[-1], len(board.get_go_string(Point(1, 1)).stones)))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        board.play(Player.white, Point(4, board_size // 2 + 1))  # takes a liberty
+        board.play(Player.black, Point(4, 4))  # joins the group
+        board.undo()
+        board.undo()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engines', default='goboard_fast,goboard_array')
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--playouts', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    engines = [importlib.import_module('dlgo.' + name) for name in args.engines.split(',')]
+
+    games = record_games(args.board_size, args.games, args.seed)
+    num_moves = sum(len(moves) for moves in games)
+    print('replay: %d games, %d stones placed, %dx%d' % (
+        len(games), num_moves, args.board_size, args.board_size))
+    for engine in engines:
+        place_time, play_undo_time = time_replay(engine, args.board_size, games)
+        print('  %-16s place_stone %8.1f stones/sec   play+undo %8.1f stones/sec' % (
+            engine.__name__.split('.')[-1], num_moves / place_time, num_moves / play_undo_time))
+
+    print('playouts: %d random games to the end, %dx%d' % (args.playouts, args.board_size, args.board_size))
+    for engine in engines:
+        num_moves, elapsed = time_playouts(engine, args.board_size, args.playouts, args.seed)
+        print('  %-16s %8.1f playouts/sec  %8.1f moves/sec' % (
+            engine.__name__.split('.')[-1], args.playouts / elapsed, num_moves / elapsed))
+
+    print('ko check: next hash of capturing moves in the endgame')
+    for engine in engines:
+        positions = endgame_captures(engine, args.board_size, games)
+        play_undo_time, hash_after_time = time_ko_checks(positions)
+        print('  %-16s %5d captures  play+undo %6.2f us  hash_after %6.2f us' % (
+            engine.__name__.split('.')[-1], len(positions),
+            play_undo_time * 1e6 / len(positions), hash_after_time * 1e6 / len(positions)))
+
+    print('big group: play and undo two stones next to it')
+    for engine in engines:
+        elapsed = time_big_group(engine, args.board_size, args.repeats)
+        print('  %-16s %8.2f us per play+undo pair' % (engine.__name__.split('.')[-1], elapsed * 1e6 / 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from dlgo import goboard_fast
+from dlgo.agent import naive
+from dlgo.encoders import get_encoder_by_name
+from dlgo.gotypes import Player, Point
+
+"""
+States per second through the encoders. Positions come from random games on goboard_fast; each encoder
+encodes all of them into one preallocated batch array with encode_batch(). For comparison, the same planes
+are also built the straightforward way, a Point and a few board lookups per point, and both results must
+agree.
+
+    python benchmark_encoders.py --board-size 19 --games 20
+"""
+
+
+def record_states(board_size, num_games, seed):
+    random.seed(seed)
+    bot = naive.RandomBot()
+    states = []
+    for _ in range(num_games):
+        game = goboard_fast.GameState.new_game(board_size)
+        while not game.is_over():
+            game = game.apply_move(bot.select_move(game))
+            states.append(game)
+    return states
+
+
+def encode_per_point(encoder, game_state):
+    """The planes of encoder, built one Point at a time."""
+    board = game_state.board
+    player = game_state.next_player
+    planes = np.zeros(encoder.shape())
+    for r in range(1, board.num_rows + 1):
+        for c in range(1, board.num_cols + 1):
+            point = Point(row=r, col=c)
+            string = board.get_go_string(point)
+            if encoder.name() == 'oneplane':
+                if string is not None:
+                    planes[0, r - 1, c - 1] = 1 if string.color == player else -1
+                continue
+            if string is not None:
+                planes[0 if string.color == Player.black else 1, r - 1, c - 1] = 1
+                planes[1 + min(string.num_liberties, 3), r - 1, c - 1] = 1
+                age = board.move_ages.get(r - 1, c - 1)
+                if age >= 0:
+                    planes[6, r - 1, c - 1] = 1.0 / (1.0 + age)
+            elif game_state.does_move_violate_ko(player, goboard_fast.Move.play(point)) and \
+                    not board.is_self_capture(player, point):
+                planes[5, r - 1, c - 1] = 1
+            if player == Player.black:
+                planes[7, r - 1, c - 1] = 1
+    return planes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--encoders', default='oneplane,multiplane')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    states = record_states(args.board_size, args.games, args.seed)
+    print('%d positions from %d random games, %dx%d' % (len(states), args.games, args.board_size, args.board_size))
+    for name in args.encoders.split(','):
+        encoder = get_encoder_by_name(name, args.board_size)
+        out = np.zeros((len(states),) + encoder.shape())
+
+        start = time.perf_counter()
+        encoder.encode_batch(states, out)
+        batch_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference = np.stack([encode_per_point(encoder, state) for state in states])
+        per_point_seconds = time.perf_counter() - start
+        assert np.array_equal(out, reference), '%s: encode_batch and the per point encoding differ' % name
+
+        for label, seconds in (('encode_batch', batch_seconds), ('per point', per_point_seconds)):
+            print('  %-12s %-14s %10.0f states/sec' % (name, label, len(states) / seconds))
+
+
+if __name__ == '__main__':
+    main()
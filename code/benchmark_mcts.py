@@ -0,0 +1,62 @@
+import argparse
+import random
+
+from dlgo import goboard_fast
+from dlgo.agent import naive
+from dlgo.agent.mcts import MCTSAgent
+from dlgo.agent.parallel_mcts import ParallelMCTSAgent
+
+"""
+Playouts (MCTS rounds) per second against the number of worker processes, for the serial MCTSAgent and both
+modes of ParallelMCTSAgent. Each agent searches the same position, a few random moves into a game, for
+--seconds of wall clock; the worker processes are started and warmed up before the clock starts.
+
+    python benchmark_mcts.py --board-sizes 9,19 --workers 1,2,4,8,16,32 --seconds 5
+"""
+
+
+def opening_position(board_size, num_moves, seed):
+    random.seed(seed)
+    bot = naive.RandomBot()
+    game = goboard_fast.GameState.new_game(board_size)
+    for _ in range(num_moves):
+        game = game.apply_move(bot.select_move(game))
+    return game
+
+
+def measure(agent, game, seconds):
+    # A short search first, so that process start-up isn't counted.
+    agent.num_rounds, agent.time_limit = None, 0.2
+    agent.select_move(game)
+    agent.time_limit = seconds
+    agent.select_move(game)
+    return agent.stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--board-sizes', default='9,19')
+    parser.add_argument('--workers', default='1,2,4')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--opening-moves', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for board_size in [int(size) for size in args.board_sizes.split(',')]:
+        game = opening_position(board_size, args.opening_moves, args.seed)
+        serial = measure(MCTSAgent(), game, args.seconds)
+        print('%dx%d: serial %.1f playouts/sec, %.1f nodes/sec' % (
+            board_size, board_size, serial.rounds_per_sec, serial.nodes_per_sec))
+        for num_workers in [int(n) for n in args.workers.split(',')]:
+            for mode in ('root', 'tree'):
+                agent = ParallelMCTSAgent(num_workers=num_workers, mode=mode)
+                try:
+                    stats = measure(agent, game, args.seconds)
+                finally:
+                    agent.close()
+                print('  %-4s %3d workers  %8.1f playouts/sec  x%.2f' % (
+                    mode, num_workers, stats.rounds_per_sec, stats.rounds_per_sec / serial.rounds_per_sec))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import numpy as np
+
+from dlgo import goboard_bitboard, goboard_fast
+from dlgo.batchplayout import random_games
+from benchmark_boards import time_playouts
+
+"""
+Random games per second with batchplayout, K games at a time, against one game at a time on the Python
+engines (the playouts of benchmark_boards: uniform over legal moves, never filling our own eyes).
+
+    python benchmark_playouts.py --board-sizes 9,19 --batch-sizes 1,64,1024
+"""
+
+
+def time_batch(board_size, batch_size, min_games, seed):
+    """Runs batches of batch_size until at least min_games games are done. Returns (games, moves, seconds)."""
+    rng = np.random.default_rng(seed)
+    num_games = 0
+    num_moves = 0
+    start = time.perf_counter()
+    while num_games < min_games:
+        result = random_games(batch_size, board_size, rng=rng)
+        num_games += batch_size
+        num_moves += int(result.num_moves.sum())
+    return num_games, num_moves, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--board-sizes', default='9,19')
+    parser.add_argument('--batch-sizes', default='1,64,1024')
+    parser.add_argument('--python-games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    for board_size in [int(size) for size in args.board_sizes.split(',')]:
+        print('%dx%d' % (board_size, board_size))
+        for engine in (goboard_fast, goboard_bitboard):
+            num_moves, seconds = time_playouts(engine, board_size, args.python_games, args.seed)
+            print('  %-20s %9.1f games/sec  %10.0f moves/sec' % (
+                engine.__name__.split('.')[-1], args.python_games / seconds, num_moves / seconds))
+        for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+            num_games, num_moves, seconds = time_batch(board_size, batch_size, batch_size, args.seed)
+            print('  %-20s %9.1f games/sec  %10.0f moves/sec' % (
+                'batchplayout K=%d' % batch_size, num_games / seconds, num_moves / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from dlgo import recordfile, sgf
+
+"""
+The binary record format against SGF on the same corpus (an SGF file, e.g. the one benchmark_sgf.py makes):
+conversion speed, file size, a scan over every game's moves, and random access to single games and positions.
+Getting game i out of SGF means parsing every game before it, so SGF random access is only timed on the first
+--sgf-lookups games.
+
+    python benchmark_sgf.py --corpus corpus.sgf
+    python benchmark_records.py --corpus corpus.sgf --records corpus.bin
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default='corpus.sgf')
+    parser.add_argument('--records', default='corpus.bin')
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--positions', type=int, default=200)
+    parser.add_argument('--sgf-lookups', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if os.path.exists(args.records):
+        os.remove(args.records)
+    start = time.perf_counter()
+    num_games, skipped = recordfile.convert_sgf(args.corpus, args.records, args.board_size)
+    seconds = time.perf_counter() - start
+    print('convert: %d games (%d skipped) in %.1fs, %.0f games/sec; %.1f MB of SGF -> %.1f MB' % (
+        num_games, skipped, seconds, num_games / seconds,
+        os.path.getsize(args.corpus) / 1e6, os.path.getsize(args.records) / 1e6))
+
+    start = time.perf_counter()
+    reader = recordfile.RecordReader(args.records)
+    print('open:    %d games indexed in %.1f ms' % (len(reader), 1000 * (time.perf_counter() - start)))
+
+    start = time.perf_counter()
+    num_moves = 0
+    for i in range(len(reader)):
+        num_moves += len(reader.move_indices(i))
+    seconds = time.perf_counter() - start
+    print('scan:    %.0f games/sec, %.0f moves/sec (move arrays)' % (len(reader) / seconds, num_moves / seconds))
+
+    rng = random.Random(args.seed)
+    games = [rng.randrange(len(reader)) for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for i in games:
+        reader.moves(i)
+    seconds = time.perf_counter() - start
+    print('random game i as Moves:      %.1f us per game' % (1e6 * seconds / len(games)))
+
+    positions = [(i, rng.randrange(int(reader.num_moves[i]) + 1)) for i in games[:args.positions]]
+    start = time.perf_counter()
+    for i, k in positions:
+        reader.position(i, k)
+    seconds = time.perf_counter() - start
+    print('random position (i, k):      %.2f ms per position (replaying k moves, k = %.0f on average)' % (
+        1000 * seconds / len(positions), np.mean([k for _, k in positions])))
+
+    start = time.perf_counter()
+    for i, _ in enumerate(sgf.iter_games(args.corpus)):
+        if i + 1 == args.sgf_lookups:
+            break
+    seconds = time.perf_counter() - start
+    print('SGF game i:                  %.1f us per game before it (%.0f ms for the middle game)' % (
+        1e6 * seconds / args.sgf_lookups, 1000 * seconds / args.sgf_lookups * len(reader) / 2))
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from dlgo import sgf
+from dlgo.batchplayout import random_games
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Point
+
+"""
+SGF parsing throughput on a big corpus. Unless --corpus already exists, it is made first: --unique random games
+(batchplayout, cut off at --max-moves) written over and over, round robin, into one multi-game file until it
+holds --games games. Then the whole file is streamed with iter_games(), first just parsing, then also
+converting every game to goboard_fast Moves; replaying on the board is timed on the first --replay games.
+
+    python benchmark_sgf.py --games 100000 --corpus /tmp/corpus.sgf
+"""
+
+
+def make_corpus(path, num_games, num_unique, board_size, max_moves, seed):
+    result = random_games(num_unique, board_size, max_moves=max_moves, rng=np.random.default_rng(seed),
+                          record_moves=True)
+    points = [Point(row=r, col=c) for r in range(1, board_size + 1) for c in range(1, board_size + 1)]
+    texts = []
+    for k in range(num_unique):
+        moves = [Move.play(points[m]) if m >= 0 else Move.pass_turn() for m in result.moves[:, k].tolist() if m != -2]
+        score = float(result.scores[k])
+        outcome = 'B+%.1f' % score if score > 0 else 'W+%.1f' % -score
+        texts.append(sgf.format_game(moves, board_size, result=outcome, properties={'GN': 'random %d' % k}))
+    sgf.write_games(path, (texts[i % num_unique] for i in range(num_games)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default='corpus.sgf')
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--unique', type=int, default=1024)
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--max-moves', type=int, default=250)
+    parser.add_argument('--replay', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        start = time.perf_counter()
+        make_corpus(args.corpus, args.games, args.unique, args.board_size, args.max_moves, args.seed)
+        print('wrote %s in %.1fs' % (args.corpus, time.perf_counter() - start))
+    megabytes = os.path.getsize(args.corpus) / 1e6
+
+    start = time.perf_counter()
+    num_games = 0
+    num_moves = 0
+    for game in sgf.iter_games(args.corpus):
+        num_games += 1
+        num_moves += len(game.moves)
+    seconds = time.perf_counter() - start
+    print('parse:           %d games, %d moves, %.1f MB in %.2fs: %.0f games/sec, %.0f moves/sec, %.1f MB/sec' % (
+        num_games, num_moves, megabytes, seconds, num_games / seconds, num_moves / seconds, megabytes / seconds))
+
+    start = time.perf_counter()
+    for game in sgf.iter_games(args.corpus):
+        game.goboard_moves()
+    seconds = time.perf_counter() - start
+    print('parse + Moves:   %.0f games/sec, %.0f moves/sec' % (num_games / seconds, num_moves / seconds))
+
+    start = time.perf_counter()
+    num_replayed = 0
+    num_positions = 0
+    for game in sgf.iter_games(args.corpus):
+        if num_replayed == args.replay:
+            break
+        for _ in sgf.replay(game):
+            num_positions += 1
+        num_replayed += 1
+    seconds = time.perf_counter() - start
+    print('parse + replay:  %.1f games/sec, %.0f positions/sec (first %d games)' % (
+        num_replayed / seconds, num_positions / seconds, num_replayed))
+
+
+if __name__ == '__main__':
+    main()
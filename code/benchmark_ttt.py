@@ -0,0 +1,108 @@
+import argparse
+import importlib
+import random
+import time
+
+import numpy as np
+
+from dlgo.minimax import AlphaBetaAgent, best_result
+from dlgo.ttt import mnkboard
+
+"""
+Tic-tac-toe as a search benchmark: the same searches on each ttt engine, so the difference is the cost of the
+engine itself.
+
+- tree walk: every move sequence from the empty board (549,946 positions), the raw apply_move / legal_moves /
+  is_over cost.
+- minimax: best_result from the empty board with no transposition table, i.e. the full tree with win cut-offs.
+- alpha-beta: one AlphaBetaAgent move from the empty board, searched to the end.
+- batch win check (--batch): random m,n,k positions checked for a winner one board at a time in Python and all
+  at once with mnkboard.winners.
+
+    python benchmark_ttt.py --engines tttboard tttbitboard mnkboard
+    python benchmark_ttt.py --engines --batch 10000 --board-size 15 --k 5
+"""
+
+
+def walk(game_state):
+    if game_state.is_over():
+        return 1
+    count = 1
+    for move in game_state.legal_moves():
+        count += walk(game_state.apply_move(move))
+    return count
+
+
+def time_engine(engine):
+    results = []
+    start = time.perf_counter()
+    num_positions = walk(engine.GameState.new_game())
+    results.append(('tree walk', num_positions, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    result = best_result(engine.GameState.new_game())
+    results.append(('minimax (%s)' % result.name, None, time.perf_counter() - start))
+
+    bot = AlphaBetaAgent()
+    start = time.perf_counter()
+    bot.select_move(engine.GameState.new_game())
+    results.append(('alpha-beta', bot.stats.nodes, time.perf_counter() - start))
+    return results
+
+
+def time_batch(num_boards, board_size, k, seed):
+    random.seed(seed)
+    states = []
+    while len(states) < num_boards:
+        game = mnkboard.GameState.new_game(board_size, k=k)
+        while not game.is_over():
+            game = game.apply_move(random.choice(game.legal_moves()))
+            states.append(game)
+    states = states[:num_boards]
+    boards = np.stack([state.board.cells() for state in states])
+
+    start = time.perf_counter()
+    one_at_a_time = []
+    for state in states:
+        board = state.board
+        winner = None
+        for point in board._table.points:
+            if board.line_through(point, k):
+                winner = board.get(point)
+                break
+        one_at_a_time.append(winner)
+    python_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = mnkboard.winners(boards, k)
+    numpy_seconds = time.perf_counter() - start
+    assert [mnkboard.CELL_TO_PLAYER[cell] for cell in batched.tolist()] == one_at_a_time
+
+    for label, seconds in (('python', python_seconds), ('numpy batch', numpy_seconds)):
+        print('%dx%d k=%d %-12s %8.3fs  %9.0f boards/sec' % (
+            board_size, board_size, k, label, seconds, num_boards / seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engines', nargs='*', default=['tttboard', 'tttbitboard', 'mnkboard'])
+    parser.add_argument('--batch', type=int, default=0, help='number of positions for the batch win check')
+    parser.add_argument('--board-size', type=int, default=15)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    for name in args.engines:
+        engine = importlib.import_module('dlgo.ttt.' + name)
+        for label, num_positions, seconds in time_engine(engine):
+            if num_positions is None:
+                print('%-12s %-20s %8.3fs' % (name, label, seconds))
+            else:
+                print('%-12s %-20s %8.3fs  %9d positions  %9.0f positions/sec' % (
+                    name, label, seconds, num_positions, num_positions / seconds))
+    if args.batch:
+        time_batch(args.batch, args.board_size, args.k, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import os
+import time
+
+from dlgo import dataset, recordfile
+
+"""
+Turns game records into a training dataset (see dlgo.dataset) and reports positions/sec, first for building
+it and then for reading it back in shuffled batches. Games come from a record file, or from SGF files that are
+converted to one first (DIRECTORY/games.bin).
+
+    python self_play.py --board-size 19 --games 1000 --workers 0 --records games.bin
+    python build_dataset.py --records games.bin --out data/ --encoder multiplane
+    python build_dataset.py --sgf kgs/ --out data/ --workers 0
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', default=None, help='record file to read games from')
+    parser.add_argument('--sgf', default=None, help='SGF file or directory to read games from instead')
+    parser.add_argument('--board-size', type=int, default=19, help='with --sgf: games of other sizes are skipped')
+    parser.add_argument('--out', default='data')
+    parser.add_argument('--encoder', default='multiplane')
+    parser.add_argument('--shard-size', type=int, default=4096, help='positions per shard')
+    parser.add_argument('--games-per-task', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=0, help='processes to encode on, 0 for one per core')
+    parser.add_argument('--batch-size', type=int, default=256, help='for timing the reader')
+    args = parser.parse_args()
+
+    records_path = args.records
+    if args.sgf is not None:
+        os.makedirs(args.out, exist_ok=True)
+        records_path = os.path.join(args.out, 'games.bin')
+        if os.path.exists(records_path):
+            os.remove(records_path)
+        start = time.perf_counter()
+        num_games, skipped = recordfile.convert_sgf(args.sgf, records_path, args.board_size)
+        print('converted %d games (%d skipped) in %.1fs' % (num_games, skipped, time.perf_counter() - start))
+    if records_path is None:
+        parser.error('give --records or --sgf')
+
+    def progress(stats):
+        print('  shard %d: %d games, %d positions, %.0f positions/sec' % (
+            stats.num_shards - 1, stats.num_games, stats.num_positions, stats.positions_per_sec), flush=True)
+
+    stats = dataset.build_dataset(records_path, args.out, args.encoder, args.shard_size, args.games_per_task,
+                                  num_workers=args.workers or None, progress=progress)
+    print('built: %d games, %d positions, %d shards in %.1fs: %.0f positions/sec' % (
+        stats.num_games, stats.num_positions, stats.num_shards, stats.seconds, stats.positions_per_sec))
+
+    data = dataset.Dataset(args.out)
+    start = time.perf_counter()
+    for features, labels in data.batches(args.batch_size, seed=1):
+        pass
+    seconds = time.perf_counter() - start
+    print('read:  %d positions in shuffled batches of %d in %.1fs: %.0f positions/sec' % (
+        len(data), args.batch_size, seconds, len(data) / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import importlib
+import random
+import time
+
+from dlgo.agent import naive
+
+"""
+Times an alternate board engine against goboard_fast: the same random games are played on both, and then
+legal_moves() is called on every position. That the engines play identically is checked by
+tests/test_engine_parity.py.
+
+    python compare_engines.py --engine goboard_array --board-size 19 --games 5
+"""
+
+
+def time_engine(engine, board_size, num_games, seed):
+    """Returns (moves played, seconds spent playing, seconds spent in legal_moves over the same positions)."""
+    random.seed(seed)
+    bot = naive.RandomBot()
+    positions = []
+    start = time.perf_counter()
+    for _ in range(num_games):
+        game = engine.GameState.new_game(board_size)
+        while not game.is_over():
+            game = game.apply_move(bot.select_move(game))
+            positions.append(game)
+    play_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for game in positions:
+        game.legal_moves()
+    return len(positions), play_time, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine', default='goboard_array')
+    parser.add_argument('--reference', default='goboard_fast')
+    parser.add_argument('--board-size', type=int, default=9)
+    parser.add_argument('--games', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    reference_engine = importlib.import_module('dlgo.' + args.reference)
+    candidate_engine = importlib.import_module('dlgo.' + args.engine)
+
+    for engine in (reference_engine, candidate_engine):
+        num_moves, play_time, legal_moves_time = time_engine(engine, args.board_size, args.games, args.seed)
+        print('%-16s %6d moves in %7.3fs  %8.1f moves/sec  %8.1f legal_moves() calls/sec' % (
+            engine.__name__.split('.')[-1], num_moves, play_time,
+            num_moves / play_time, num_moves / legal_moves_time))
+
+
+if __name__ == '__main__':
+    main()
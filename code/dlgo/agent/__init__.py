@@ -1,2 +1,5 @@
 from .naive import *
 from .base import *
+from .mcts import *
+from .parallel_mcts import *
+from .batch_mcts import *
@@ -13,10 +13,10 @@ def is_point_an_eye(board: Board, point: Point, color: Player) -> bool:
                 return False
         
     corners = [
-        Point(point.row - 1, point.row + 1),
-        Point(point.row - 1, point.row - 1),
-        Point(point.row + 1, point.row + 1),
-        Point(point.row + 1, point.row - 1),
+        Point(point.row - 1, point.col + 1),
+        Point(point.row - 1, point.col - 1),
+        Point(point.row + 1, point.col + 1),
+        Point(point.row + 1, point.col - 1),
     ]
 
     # my attempt:
@@ -0,0 +1,244 @@
+import math
+import random
+import time
+from collections import namedtuple
+
+from dlgo.agent.base import Agent
+from dlgo.agent.helpers import is_point_an_eye
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player
+from dlgo.scoring import compute_board_result
+from dlgo.search import search_position
+
+"""
+Monte Carlo tree search with UCT selection and random rollouts.
+
+Tree nodes don't hold a GameState. select_move copies the board once; every round walks down the tree with
+board.play(), plays the rollout on the same board and then takes all of it back with board.undo(). A node only
+stores the move that leads to it, its statistics and the moves it hasn't tried yet. This needs a board with
+goboard_fast's play/undo, hash_after and legal_points(), which goboard_fast, goboard_array and goboard_bitboard
+all have; dlgo.search.search_position() rejects any other board.
+
+Rollouts play uniformly random legal moves, never filling one of the mover's own eyes, until both players
+pass. Ko is checked (only for capturing moves) against the game's history plus the positions of the current
+round.
+"""
+
+__all__ = [
+    'MCTSAgent',
+    'MCTSStats',
+]
+
+
+class MCTSNode():
+    def __init__(self, parent, move, next_player, consecutive_passes, unvisited_moves):
+        self.parent = parent
+        self.move = move
+        self.next_player = next_player
+        self.consecutive_passes = consecutive_passes
+        self.unvisited_moves = unvisited_moves
+        self.children = []
+        self.win_counts = {
+            Player.black: 0,
+            Player.white: 0,
+        }
+        self.num_rollouts = 0
+
+    def record_win(self, winner):
+        self.win_counts[winner] += 1
+        self.num_rollouts += 1
+
+    def record_wins(self, black_wins, white_wins):
+        self.win_counts[Player.black] += black_wins
+        self.win_counts[Player.white] += white_wins
+        self.num_rollouts += black_wins + white_wins
+
+    def add_virtual_loss(self):
+        """Count a rollout that hasn't finished yet as a loss for both sides.
+        add_win() completes it once the winner is known.
+        """
+        self.num_rollouts += 1
+
+    def add_win(self, winner):
+        self.win_counts[winner] += 1
+
+    def winning_frac(self, player):
+        return self.win_counts[player] / self.num_rollouts
+
+
+class MCTSStats(namedtuple('MCTSStats', 'rounds nodes rollout_moves seconds')):
+    """What the last select_move() did."""
+    @property
+    def nodes_per_sec(self):
+        return self.nodes / self.seconds
+
+    @property
+    def rounds_per_sec(self):
+        return self.rounds / self.seconds
+
+    def __str__(self):
+        return '%d rounds, %d nodes, %d rollout moves in %.3fs: %.1f nodes/sec, %.1f rounds/sec' % (
+            self.rounds, self.nodes, self.rollout_moves, self.seconds, self.nodes_per_sec, self.rounds_per_sec)
+
+
+class MCTSAgent(Agent):
+    """UCT search for num_rounds rounds or time_limit seconds, whichever
+    comes first (either may be None, not both). temperature weighs
+    exploration against the win rate. After each move, the numbers of that
+    search are in self.stats; with verbose=True they are also printed.
+    """
+    def __init__(self, num_rounds=1000, time_limit=None, temperature=1.4, verbose=False):
+        Agent.__init__(self)
+        assert num_rounds is not None or time_limit is not None
+        self.num_rounds = num_rounds
+        self.time_limit = time_limit
+        self.temperature = temperature
+        self.verbose = verbose
+        self.stats = None
+
+    def select_move(self, game_state):
+        start = time.perf_counter()
+        root = self._new_search(*search_position(game_state))
+        num_nodes = 1
+
+        rounds = 0
+        while self.num_rounds is None or rounds < self.num_rounds:
+            if self.time_limit is not None and time.perf_counter() - start >= self.time_limit:
+                break
+            num_nodes += self._run_round(root)
+            rounds += 1
+
+        self.stats = MCTSStats(rounds, num_nodes, self._rollout_moves, time.perf_counter() - start)
+        if self.verbose:
+            print(self.stats)
+        if not root.children:
+            return Move.pass_turn()
+        return max(root.children, key=lambda child: child.num_rollouts).move
+
+    def _new_search(self, board, next_player, history, consecutive_passes):
+        """Search from board (which the search will modify and restore) and return the root node."""
+        self._board = board
+        self._history = history
+        self._situations = set()
+        self._rollout_moves = 0
+        self._max_rollout_moves = 3 * board.num_rows * board.num_cols
+        return MCTSNode(
+            None, None, next_player, consecutive_passes, self._tree_moves(next_player, consecutive_passes))
+
+    def _run_round(self, root):
+        """Select, expand, roll out and back up once. Returns the number of new nodes."""
+        node, num_plays, new_nodes = self._select_and_expand(root)
+        winner, rollout_plays = self._rollout(node.next_player, node.consecutive_passes)
+        self._undo(num_plays + rollout_plays)
+
+        while node is not None:
+            node.record_win(winner)
+            node = node.parent
+        return new_nodes
+
+    def _select_and_expand(self, root):
+        """Walk down from root, playing the moves on the search board, and add
+        a child for an untried move at the end. Returns (node reached, number
+        of stones played, number of new nodes).
+        """
+        num_plays = 0
+        node = root
+
+        # Walk down through fully expanded nodes.
+        while not node.unvisited_moves and node.children:
+            node = self.select_child(node)
+            num_plays += self._play(node.parent.next_player, node.move)
+
+        # Add one child for a move that hasn't been tried yet.
+        if not node.unvisited_moves:
+            return node, num_plays, 0
+        moves = node.unvisited_moves
+        index = random.randrange(len(moves))
+        move = moves[index]
+        moves[index] = moves[-1]
+        moves.pop()
+        num_plays += self._play(node.next_player, move)
+        passes = node.consecutive_passes + 1 if move.is_pass else 0
+        child = MCTSNode(node, move, node.next_player.other, passes, self._tree_moves(node.next_player.other, passes))
+        node.children.append(child)
+        return child, num_plays, 1
+
+    def _undo(self, num_plays):
+        """Take the search board back to the root."""
+        for _ in range(num_plays):
+            self._board.undo()
+        self._situations.clear()
+
+    def select_child(self, node):
+        """UCT: the child with the best win rate for the player choosing, plus an exploration bonus."""
+        log_rollouts = math.log(node.num_rollouts)
+        player = node.next_player
+        temperature = self.temperature
+        best_score = -1
+        best_child = None
+        for child in node.children:
+            score = child.winning_frac(player) + \
+                temperature * math.sqrt(log_rollouts / child.num_rollouts)
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
+
+    def _play(self, player, move):
+        """Play move on the search board; returns the number of undo() calls it needs."""
+        if not move.is_play:
+            return 0
+        self._board.play(player, move.point)
+        self._situations.add((player.other, self._board.zobrist_hash()))
+        return 1
+
+    def _violates_ko(self, player, point):
+        next_situation = (player.other, self._board.hash_after(player, point))
+        return next_situation in self._situations or next_situation in self._history
+
+    def _tree_moves(self, player, consecutive_passes):
+        """The moves to try from a node: legal plays that don't fill one of our own eyes, and pass."""
+        if consecutive_passes >= 2:
+            return []
+        board = self._board
+        legal, capturing = board.legal_points(player)
+        moves = [
+            Move.play(point) for point in legal
+            if not is_point_an_eye(board, point, player) and
+            not (point in capturing and self._violates_ko(player, point))]
+        moves.append(Move.pass_turn())
+        return moves
+
+    def _random_point(self, player):
+        """A random legal point that doesn't fill one of player's eyes, or None."""
+        board = self._board
+        legal, capturing = board.legal_points(player)
+        candidates = list(legal)
+        while candidates:
+            index = random.randrange(len(candidates))
+            point = candidates[index]
+            candidates[index] = candidates[-1]
+            candidates.pop()
+            if is_point_an_eye(board, point, player):
+                continue
+            if point in capturing and self._violates_ko(player, point):
+                continue
+            return point
+        return None
+
+    def _rollout(self, player, consecutive_passes):
+        """Play random moves until both sides pass. Returns (winner, number of stones played)."""
+        board = self._board
+        num_plays = 0
+        while consecutive_passes < 2 and num_plays < self._max_rollout_moves:
+            point = self._random_point(player)
+            if point is None:
+                consecutive_passes += 1
+            else:
+                board.play(player, point)
+                self._situations.add((player.other, board.zobrist_hash()))
+                consecutive_passes = 0
+                num_plays += 1
+            player = player.other
+        self._rollout_moves += num_plays
+        return compute_board_result(board).winner, num_plays
@@ -0,0 +1,222 @@
+import multiprocessing
+import queue
+import random
+import time
+
+from dlgo.agent.mcts import MCTSAgent, MCTSStats
+from dlgo.goboard_fast import Move
+from dlgo.search import search_position
+from dlgo.utils import WorkerError
+
+"""
+MCTS on several processes. Each worker process keeps an MCTSAgent and its own copy of the position, which is
+sent to it once per move. Two ways of splitting the work:
+
+- 'root' (root parallelization): every worker grows its own tree from the position for its share of the
+  rounds (or the whole time limit) and sends back the visit and win counts of the root's children. The
+  counts are summed per move and the most visited move is played. Workers only talk to the parent twice per
+  move, so this scales with the number of cores; the price is that the trees don't share what they learn.
+- 'tree' (tree parallelization with virtual loss): the parent keeps a single tree and only does selection,
+  expansion and backup. Each selected leaf goes to an idle worker as the list of moves leading to it, the
+  worker plays them out and rolls out, and sends back the winner. Until the result arrives, every node on
+  the path counts the rollout as a loss (virtual loss), which pushes the next selections onto other lines
+  of play. The search is closer to one big serial search, but every rollout is a round trip to the parent,
+  which does all the tree work on one core.
+
+A worker that raises sends the exception back instead of a reply and exits; select_move stops the other
+workers and raises it. The next select_move starts a fresh set of workers.
+"""
+
+__all__ = [
+    'ParallelMCTSAgent',
+]
+
+
+def _search_worker(seed, temperature, commands, results):
+    try:
+        random.seed(seed)
+        agent = MCTSAgent(num_rounds=None, time_limit=0, temperature=temperature)
+        root = None
+        while True:
+            command = commands.get()
+            if command is None:
+                return
+            kind = command[0]
+            if kind == 'position':
+                root = agent._new_search(*command[1:])
+            elif kind == 'search':
+                _, num_rounds, time_limit = command
+                agent.num_rounds, agent.time_limit = num_rounds, time_limit
+                start = time.perf_counter()
+                num_nodes = 1
+                rounds = 0
+                while num_rounds is None or rounds < num_rounds:
+                    if time_limit is not None and time.perf_counter() - start >= time_limit:
+                        break
+                    num_nodes += agent._run_round(root)
+                    rounds += 1
+                counts = [(child.move, child.num_rollouts, child.win_counts) for child in root.children]
+                results.put((counts, rounds, num_nodes, agent._rollout_moves))
+            elif kind == 'rollout':
+                _, job, path, next_player, consecutive_passes = command
+                num_plays = 0
+                for player, move in path:
+                    num_plays += agent._play(player, move)
+                winner, rollout_plays = agent._rollout(next_player, consecutive_passes)
+                agent._undo(num_plays + rollout_plays)
+                results.put((job, winner, rollout_plays))
+    except Exception as exc:
+        results.put(WorkerError(exc))
+
+
+class ParallelMCTSAgent(MCTSAgent):
+    """MCTSAgent searching on num_workers processes (default: one per
+    core), with mode 'root' or 'tree' (see above). num_rounds counts the
+    rollouts of all workers together. The worker processes start on the
+    first move and stay up until close().
+    """
+    # How long to wait for a reply before checking that the workers are still alive.
+    poll_seconds = 1.0
+
+    def __init__(self, num_rounds=1000, time_limit=None, temperature=1.4, verbose=False,
+                 num_workers=None, mode='root'):
+        MCTSAgent.__init__(self, num_rounds, time_limit, temperature, verbose)
+        assert mode in ('root', 'tree')
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.mode = mode
+        self._workers = None
+
+    def _start_workers(self):
+        self._results = multiprocessing.Queue()
+        self._commands = []
+        self._workers = []
+        for _ in range(self.num_workers):
+            commands = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_search_worker,
+                args=(random.getrandbits(63), self.temperature, commands, self._results),
+                daemon=True)
+            worker.start()
+            self._commands.append(commands)
+            self._workers.append(worker)
+
+    def close(self):
+        if self._workers is None:
+            return
+        for commands in self._commands:
+            commands.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = None
+
+    def _terminate(self):
+        for worker in self._workers:
+            worker.terminate()
+        self._workers = None
+
+    def _get_result(self):
+        """The next reply from any worker. If a worker sent back an
+        exception or died, the workers are stopped and the error is raised.
+        """
+        while True:
+            try:
+                item = self._results.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                # Workers only exit on close(), so any exit code here means one died.
+                for worker in self._workers:
+                    if worker.exitcode is not None:
+                        self._terminate()
+                        raise RuntimeError('MCTS worker %d died with exit code %d' % (worker.pid, worker.exitcode))
+                continue
+            if isinstance(item, WorkerError):
+                self._terminate()
+                item.reraise()
+            return item
+
+    def select_move(self, game_state):
+        start = time.perf_counter()
+        if self._workers is None:
+            self._start_workers()
+        position = search_position(game_state)
+        for commands in self._commands:
+            commands.put(('position',) + position)
+
+        if self.mode == 'root':
+            move, self.stats = self._root_search(start)
+        else:
+            # The queues pickle in a background thread, so the parent searches
+            # on a board of its own rather than the one just sent.
+            move, self.stats = self._tree_search(start, search_position(game_state))
+        if self.verbose:
+            print(self.stats)
+        return move
+
+    def _root_search(self, start):
+        num_workers = self.num_workers
+        for i, commands in enumerate(self._commands):
+            num_rounds = None
+            if self.num_rounds is not None:
+                # Split the rounds as evenly as possible.
+                num_rounds = self.num_rounds // num_workers + (1 if i < self.num_rounds % num_workers else 0)
+            commands.put(('search', num_rounds, self.time_limit))
+
+        visits = {}
+        rounds = num_nodes = rollout_moves = 0
+        for _ in range(num_workers):
+            counts, worker_rounds, worker_nodes, worker_moves = self._get_result()
+            for move, num_rollouts, _ in counts:
+                visits[move] = visits.get(move, 0) + num_rollouts
+            rounds += worker_rounds
+            num_nodes += worker_nodes
+            rollout_moves += worker_moves
+        stats = MCTSStats(rounds, num_nodes, rollout_moves, time.perf_counter() - start)
+        if not visits:
+            return Move.pass_turn(), stats
+        return max(visits, key=visits.get), stats
+
+    def _tree_search(self, start, position):
+        root = self._new_search(*position)
+        num_nodes = 1
+        rounds = rollout_moves = 0
+        in_flight = {}
+        idle = list(range(self.num_workers))
+        next_job = 0
+
+        def out_of_budget():
+            if self.num_rounds is not None and next_job >= self.num_rounds:
+                return True
+            return self.time_limit is not None and time.perf_counter() - start >= self.time_limit
+
+        while True:
+            while idle and not out_of_budget():
+                leaf, num_plays, new_nodes = self._select_and_expand(root)
+                self._undo(num_plays)
+                num_nodes += new_nodes
+                path = []
+                node = leaf
+                while node is not None:
+                    node.add_virtual_loss()
+                    if node.parent is not None:
+                        path.append((node.parent.next_player, node.move))
+                    node = node.parent
+                path.reverse()
+                worker = idle.pop()
+                self._commands[worker].put(('rollout', next_job, path, leaf.next_player, leaf.consecutive_passes))
+                in_flight[next_job] = (leaf, worker)
+                next_job += 1
+            if not in_flight:
+                break
+            job, winner, worker_moves = self._get_result()
+            # Workers answer in any order; the job number says which leaf and worker it was.
+            node, worker = in_flight.pop(job)
+            idle.append(worker)
+            rounds += 1
+            rollout_moves += worker_moves
+            while node is not None:
+                node.add_win(winner)
+                node = node.parent
+
+        stats = MCTSStats(rounds, num_nodes, rollout_moves, time.perf_counter() - start)
+        if not root.children:
+            return Move.pass_turn(), stats
+        return max(root.children, key=lambda child: child.num_rollouts).move, stats
@@ -0,0 +1,274 @@
+from collections import namedtuple
+
+import numpy as np
+
+from dlgo.gotypes import Player, Point
+from dlgo.scoring import BLACK, EMPTY, OFF_BOARD, WHITE
+
+"""
+Random playouts for many games at once: K independent games advance in lockstep, one move each per step, and
+every step is a handful of NumPy operations over all K boards instead of a Python loop per game and per point.
+
+- The K boards live in one flat int8 array, each board padded with an OFF_BOARD border like in scoring, so every
+  point has its four neighbors (and four diagonals) at fixed offsets, in every game.
+- Strings are kept as a union-find over the whole array: every stone holds the index of its string's root (its
+  smallest index). The starting position is labeled once by flood fill (min-label propagation with pointer
+  jumping, as in scoring). After that a move only merges strings, which takes one write per merged root and one
+  pointer jump over the array, and a capture removes whole strings, found by looking up every stone's root.
+- Each step the liberties of every string are counted at once: every empty point adds one to each distinct
+  string next to it (np.bincount over the roots).
+- From that, for the player to move in each game, a point is a candidate if it is empty, not suicide (it has
+  an empty neighbor, captures, or joins a string with a spare liberty), not the simple-ko point and not one of
+  the player's own eyes (the same rule as agent.helpers.is_point_an_eye). Each game plays a uniformly random
+  candidate, or passes if it has none.
+- Ko is only simple ko: a single stone that just captured a single stone can't be taken back at once. There is
+  no superko history, which random playouts can do without.
+- A game ends after two passes in a row or max_moves moves; the final boards are area-scored all at once
+  (empty regions labeled by flood fill, then given to the color they touch alone).
+
+    result = random_games(1024, 9)
+    black_wins = np.count_nonzero(result.winners == BLACK)
+
+Boards go in and out as (K, N, N) int8 arrays of EMPTY, BLACK and WHITE (row r, column c of a board at
+[r - 1, c - 1]); board_array() makes one from a Board of any engine.
+"""
+
+__all__ = [
+    'PlayoutResult',
+    'board_array',
+    'play_out',
+    'random_games',
+]
+
+PLAYER_TO_CELL = {Player.black: BLACK, Player.white: WHITE}
+
+
+class _PlayoutTable:
+    """The padded layout shared by every board of one size."""
+    def __init__(self, board_size):
+        self.board_size = board_size
+        stride = board_size + 2
+        self.stride = stride
+        self.num_cells = stride * stride
+        self.points = [Point(row=r, col=c) for r in range(1, board_size + 1) for c in range(1, board_size + 1)]
+        self.indices = np.array([point.row * stride + point.col for point in self.points])
+        self.offsets = np.array([-stride, -1, 1, stride])
+        self.diagonals = np.array([-stride - 1, -stride + 1, stride - 1, stride + 1])
+        self.template = np.full(self.num_cells, OFF_BOARD, dtype=np.int8)
+        self.template[self.indices] = EMPTY
+        # Diagonal neighbors of each point that are off the board.
+        self.off_diagonals = (self.template[self.indices[:, np.newaxis] + self.diagonals] == OFF_BOARD).sum(axis=1)
+
+
+_playout_tables = {}
+
+
+def _get_playout_table(board_size):
+    if board_size not in _playout_tables:
+        _playout_tables[board_size] = _PlayoutTable(board_size)
+    return _playout_tables[board_size]
+
+
+class PlayoutResult(namedtuple('PlayoutResult', 'boards scores num_moves moves')):
+    """boards: the final (K, N, N) positions. scores: black's area minus white's area minus komi, per game.
+    num_moves: stones played in each game. moves: with record_moves, a (steps, K) int16 array of what each game
+    did at each step: the index of the point played in row order (r - 1) * N + (c - 1), -1 for a pass, or -2
+    once the game is over; otherwise None.
+    """
+    @property
+    def winners(self):
+        """BLACK or WHITE for each game."""
+        return np.where(self.scores > 0, BLACK, WHITE).astype(np.int8)
+
+
+def board_array(board):
+    """A (N, N) int8 array of EMPTY, BLACK and WHITE for a square Board."""
+    black = Player.black
+    return np.array([
+        [EMPTY if stone is None else BLACK if stone is black else WHITE
+         for stone in (board.get(Point(r, c)) for c in range(1, board.num_cols + 1))]
+        for r in range(1, board.num_rows + 1)], dtype=np.int8)
+
+
+def _label(cells, points, neighbors, mask, sentinel):
+    """Label every point in mask with the smallest index of the points in mask connected to it through
+    neighbors of the same color; everything else gets sentinel. points are the global indices of the board
+    points, neighbors their (..., 4) neighbor indices, and cells has an extra entry at sentinel.
+    """
+    labels = np.full(len(cells), sentinel)
+    labels[points[mask]] = points[mask]
+    points = points[mask]
+    connected = cells[neighbors[mask]] == cells[points][:, np.newaxis]
+    neighbors = np.where(connected, neighbors[mask], sentinel)
+    current = points
+    while True:
+        smallest = np.minimum(current, labels[neighbors].min(axis=1))
+        labels[points] = smallest
+        smallest = labels[smallest]
+        if np.array_equal(smallest, current):
+            return labels
+        labels[points] = smallest
+        current = smallest
+
+
+def _scores(cells, points, neighbors, num_games, komi, sentinel):
+    """Black's area minus white's area minus komi for each of the (num_games, N * N) boards."""
+    board = cells[points]
+    regions = _label(cells, points, neighbors, board == EMPTY, sentinel)
+    neighbor_cells = cells[neighbors]
+    is_empty = board == EMPTY
+    touches_black = np.zeros(len(cells), dtype=bool)
+    touches_white = np.zeros(len(cells), dtype=bool)
+    touches_black[regions[points[is_empty & (neighbor_cells == BLACK).any(axis=-1)]]] = True
+    touches_white[regions[points[is_empty & (neighbor_cells == WHITE).any(axis=-1)]]] = True
+    black_region = touches_black[regions[points]] & ~touches_white[regions[points]]
+    white_region = touches_white[regions[points]] & ~touches_black[regions[points]]
+    black_area = np.count_nonzero((board == BLACK) | (is_empty & black_region), axis=1)
+    white_area = np.count_nonzero((board == WHITE) | (is_empty & white_region), axis=1)
+    return black_area - white_area - komi
+
+
+def play_out(boards, next_players, komi=7.5, max_moves=None, consecutive_passes=0, rng=None,
+             record_moves=False):
+    """Play random games from each of the (K, N, N) boards to the end.
+
+    next_players holds BLACK or WHITE for each game (or one of them for all), consecutive_passes the number of
+    passes just before each position. max_moves caps the stones played per game (default 3 * N * N, as in
+    MCTS rollouts); rng is a numpy Generator.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    num_games, board_size = boards.shape[0], boards.shape[1]
+    assert boards.shape == (num_games, board_size, board_size)
+    table = _get_playout_table(board_size)
+    if max_moves is None:
+        max_moves = 3 * board_size * board_size
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # All K padded boards in one array, plus a sentinel cell at the end that stands for "no string".
+    sentinel = num_games * table.num_cells
+    cells = np.empty(sentinel + 1, dtype=np.int8)
+    cells[:sentinel] = np.tile(table.template, num_games)
+    cells[sentinel] = OFF_BOARD
+    points = (np.arange(num_games) * table.num_cells)[:, np.newaxis] + table.indices
+    cells[points] = boards.reshape(num_games, -1)
+    neighbors = points[:, :, np.newaxis] + table.offsets
+    off_diagonals = table.off_diagonals
+
+    stones = cells[points] != EMPTY
+    labels = _label(cells, points, neighbors, stones, sentinel)
+
+    player = np.empty(num_games, dtype=np.int8)
+    player[:] = next_players
+    passes = np.zeros(num_games, dtype=np.int64)
+    passes[:] = consecutive_passes
+    num_moves = np.zeros(num_games, dtype=np.int64)
+    ko = np.full(num_games, -1)
+    active = passes < 2
+    moves = []
+
+    while active.any():
+        # Only the games still going; rows below index into these.
+        games = np.flatnonzero(active)
+        game_points = points[games]
+        board = cells[game_points]
+        is_empty = board == EMPTY
+        mover = player[games][:, np.newaxis]
+        opponent = 3 - mover
+        # One (games, N * N) array per direction rather than a (games, N * N, 4) array: reducing over a short
+        # last axis is much slower than combining four arrays.
+        neighbor_points = [game_points + offset for offset in table.offsets]
+        neighbor_cells = [cells[p] for p in neighbor_points]
+        neighbor_labels = [labels[p] for p in neighbor_points]
+
+        # Liberties: every empty point counts once for each distinct string next to it.
+        l0, l1, l2, l3 = neighbor_labels
+        distinct = np.concatenate([
+            l0[is_empty],
+            np.where(l1 != l0, l1, sentinel)[is_empty],
+            np.where((l2 != l0) & (l2 != l1), l2, sentinel)[is_empty],
+            np.where((l3 != l0) & (l3 != l1) & (l3 != l2), l3, sentinel)[is_empty]])
+        liberties = np.bincount(distinct, minlength=sentinel + 1)
+        liberties[sentinel] = 0
+        neighbor_liberties = [liberties[l] for l in neighbor_labels]
+
+        own = [c == mover for c in neighbor_cells]
+        captures = [(c == opponent) & (n == 1) for c, n in zip(neighbor_cells, neighbor_liberties)]
+        empty_neighbor = [c == EMPTY for c in neighbor_cells]
+        legal = empty_neighbor[0] | empty_neighbor[1] | empty_neighbor[2] | empty_neighbor[3]
+        eye = is_empty.copy()
+        for j in range(4):
+            legal |= captures[j] | (own[j] & (neighbor_liberties[j] >= 2))
+            eye &= own[j] | (neighbor_cells[j] == OFF_BOARD)
+        legal &= is_empty
+
+        friendly_diagonals = np.zeros(board.shape, dtype=np.int8)
+        for offset in table.diagonals:
+            friendly_diagonals += cells[game_points + offset] == mover
+        eye &= np.where(off_diagonals == 0, friendly_diagonals >= 3, friendly_diagonals + off_diagonals == 4)
+
+        candidates = legal & ~eye & (game_points != ko[games, np.newaxis])
+        draw = rng.random(candidates.shape)
+        draw[~candidates] = -1.0
+        choice = draw.argmax(axis=1)
+        plays = draw[np.arange(len(games)), choice] >= 0.0
+
+        ko[games] = -1
+        if record_moves:
+            record = np.full(num_games, -2, dtype=np.int16)
+            record[games] = np.where(plays, choice, -1)
+            moves.append(record)
+
+        rows = np.flatnonzero(plays)
+        if len(rows):
+            where = choice[rows]
+            played = game_points[rows, where]
+            cells[played] = mover[rows, 0]
+
+            # Join the new stone and the strings it touches under the smallest root.
+            joined = np.stack([own[j][rows, where] for j in range(4)], axis=1)
+            roots = np.where(joined, np.stack([l[rows, where] for l in neighbor_labels], axis=1), sentinel)
+            new_roots = np.minimum(played, roots.min(axis=1))
+            labels[played] = new_roots
+            for j in range(4):
+                labels[roots[:, j]] = new_roots
+            labels[sentinel] = sentinel
+            merged = joined.any(axis=1)
+            if merged.any():
+                merged_points = game_points[rows[merged]]
+                labels[merged_points] = labels[labels[merged_points]]
+
+            # Remove the strings it takes the last liberty of.
+            captured = np.stack([captures[j][rows, where] for j in range(4)], axis=1)
+            capturing = captured.any(axis=1)
+            if capturing.any():
+                dead = np.zeros(sentinel + 1, dtype=bool)
+                dead[np.stack([l[rows, where] for l in neighbor_labels], axis=1)[captured]] = True
+                capture_points = game_points[rows[capturing]]
+                removed = dead[labels[capture_points]]
+                cells[capture_points[removed]] = EMPTY
+                labels[capture_points[removed]] = sentinel
+
+                # Simple ko: a lone stone that took a single stone can't be taken back at once.
+                lone = ~merged[capturing] & (np.count_nonzero(removed, axis=1) == 1)
+                for j in range(4):
+                    lone &= ~empty_neighbor[j][rows[capturing], where[capturing]]
+                ko_rows = rows[capturing][lone]
+                ko[games[ko_rows]] = played[capturing][lone] + table.offsets[captured[capturing][lone].argmax(axis=1)]
+
+            num_moves[games[rows]] += 1
+
+        passes[games[plays]] = 0
+        passes[games[~plays]] += 1
+        active[games] = (passes[games] < 2) & (num_moves[games] < max_moves)
+        player[games] = np.where(active[games], opponent[:, 0], mover[:, 0])
+
+    scores = _scores(cells, points, neighbors, num_games, komi, sentinel)
+    final_boards = cells[points].reshape(num_games, board_size, board_size)
+    return PlayoutResult(final_boards, scores, num_moves, np.array(moves, dtype=np.int16) if record_moves else None)
+
+
+def random_games(num_games, board_size, komi=7.5, max_moves=None, rng=None, record_moves=False):
+    """num_games random games from the empty board, black first."""
+    boards = np.zeros((num_games, board_size, board_size), dtype=np.int8)
+    return play_out(boards, BLACK, komi=komi, max_moves=max_moves, rng=rng, record_moves=record_moves)
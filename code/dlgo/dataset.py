@@ -0,0 +1,211 @@
+import json
+import multiprocessing
+import os
+import signal
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dlgo import goboard_fast
+from dlgo.encoders import get_encoder_by_name
+from dlgo.recordfile import RecordReader
+
+"""
+Training data from game records: (features, next_move) pairs, written as shards of .npy files that are
+memory-mapped for reading.
+
+build_dataset() replays the games of a record file (see recordfile) on goboard_fast in a pool of worker
+processes. A worker takes games_per_task games at a time, encodes the position before every move with an
+encoder from dlgo.encoders and sends back one features array and one labels array for the lot. The label is
+the move that was played as a point index, (row - 1) * N + (col - 1), or N * N for a pass (the same index the
+record file and encoder.encode_point() use); a resignation ends a game and is not a position. The parent takes
+results in game order and cuts them into shards of exactly shard_size positions (the last one may be short),
+so the same records and settings always give the same shards, whatever the number of workers.
+
+A dataset directory holds features-00000.npy, labels-00000.npy, ... and dataset.json with the encoder, board
+size, feature shape and dtype, and shard sizes. Dataset opens every shard with mmap_mode='r' and batches() draws batches from one
+permutation of all the positions, across shards, so only the positions in the current batch are read.
+
+    stats = build_dataset('games.bin', 'data/', 'multiplane')
+    for features, labels in Dataset('data/').batches(256, seed=1):
+        ...
+"""
+
+__all__ = [
+    'BuildStats',
+    'Dataset',
+    'build_dataset',
+]
+
+METADATA = 'dataset.json'
+
+
+class BuildStats(namedtuple('BuildStats', 'num_games num_positions num_shards seconds')):
+    @property
+    def positions_per_sec(self):
+        return self.num_positions / self.seconds if self.seconds else 0.0
+
+
+# Set in each worker by _init_worker.
+_reader = None
+_encoder = None
+_dtype = None
+
+
+def _init_worker(records_path, encoder_name, dtype):
+    global _reader, _encoder, _dtype
+    # Ctrl-C is for the parent, which takes the pool down.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _reader = RecordReader(records_path)
+    _encoder = get_encoder_by_name(encoder_name, _reader.board_size)
+    _dtype = dtype
+
+
+def _encode_games(games):
+    """Features and labels for every position of the games in range games."""
+    reader = _reader
+    resign = reader.board_size * reader.board_size + 1
+    move_indices = [reader.move_indices(i) for i in games]
+    move_indices = [indices[:-1] if len(indices) and indices[-1] == resign else indices for indices in move_indices]
+    num_positions = sum(len(indices) for indices in move_indices)
+    features = np.zeros((num_positions,) + _encoder.shape(), dtype=_dtype)
+    labels = np.empty(num_positions, dtype=np.int16)
+    start = 0
+    for i, indices in zip(games, move_indices):
+        if not len(indices):
+            continue
+        game_state = goboard_fast.GameState.new_game(reader.board_size)
+        game_states = []
+        for move in reader.moves(i, len(indices)):
+            game_states.append(game_state)
+            game_state = game_state.apply_move(move)
+        _encoder.encode_batch(game_states, features[start:start + len(indices)])
+        labels[start:start + len(indices)] = indices
+        start += len(indices)
+    return features, labels
+
+
+def _shard_names(shard):
+    return 'features-%05d.npy' % shard, 'labels-%05d.npy' % shard
+
+
+def build_dataset(records_path, directory, encoder_name, shard_size=4096, games_per_task=16,
+                  num_workers=None, dtype=np.float32, progress=None):
+    """Encode every position of the games in the record file at records_path into shards in directory (made
+    if needed, and expected to hold no other dataset). progress, if given, is called with the BuildStats so
+    far after every shard. Returns the final BuildStats.
+    """
+    start_time = time.perf_counter()
+    if num_workers is None:
+        num_workers = os.cpu_count()
+    os.makedirs(directory, exist_ok=True)
+    with RecordReader(records_path) as reader:
+        num_games = len(reader)
+        board_size = reader.board_size
+    encoder = get_encoder_by_name(encoder_name, board_size)
+    tasks = [range(i, min(i + games_per_task, num_games)) for i in range(0, num_games, games_per_task)]
+
+    shard_features = np.empty((shard_size,) + encoder.shape(), dtype=dtype)
+    shard_labels = np.empty(shard_size, dtype=np.int16)
+    filled = 0
+    shard_sizes = []
+    num_positions = 0
+    num_done = 0
+
+    def write_shard(size):
+        features_name, labels_name = _shard_names(len(shard_sizes))
+        np.save(os.path.join(directory, features_name), shard_features[:size])
+        np.save(os.path.join(directory, labels_name), shard_labels[:size])
+        shard_sizes.append(size)
+        if progress is not None:
+            progress(BuildStats(num_done, num_positions, len(shard_sizes), time.perf_counter() - start_time))
+
+    with multiprocessing.Pool(num_workers, _init_worker, (records_path, encoder_name, dtype)) as pool:
+        for games, (features, labels) in zip(tasks, pool.imap(_encode_games, tasks)):
+            num_done += len(games)
+            pos = 0
+            while pos < len(labels):
+                count = min(len(labels) - pos, shard_size - filled)
+                shard_features[filled:filled + count] = features[pos:pos + count]
+                shard_labels[filled:filled + count] = labels[pos:pos + count]
+                filled += count
+                pos += count
+                num_positions += count
+                if filled == shard_size:
+                    write_shard(filled)
+                    filled = 0
+        if filled:
+            write_shard(filled)
+
+    with open(os.path.join(directory, METADATA), 'w') as f:
+        json.dump({
+            'encoder': encoder_name,
+            'board_size': board_size,
+            'shape': list(encoder.shape()),
+            'dtype': np.dtype(dtype).str,
+            'num_labels': board_size * board_size + 1,
+            'shard_sizes': shard_sizes,
+        }, f, indent=1)
+    return BuildStats(num_games, num_positions, len(shard_sizes), time.perf_counter() - start_time)
+
+
+class Dataset:
+    """The shards of a dataset directory made by build_dataset(), memory-mapped."""
+    def __init__(self, directory):
+        with open(os.path.join(directory, METADATA)) as f:
+            metadata = json.load(f)
+        self.encoder_name = metadata['encoder']
+        self.board_size = metadata['board_size']
+        self.num_labels = metadata['num_labels']
+        self.shape = tuple(metadata['shape'])
+        self.features = []
+        self.labels = []
+        for shard in range(len(metadata['shard_sizes'])):
+            features_name, labels_name = _shard_names(shard)
+            self.features.append(np.load(os.path.join(directory, features_name), mmap_mode='r'))
+            self.labels.append(np.load(os.path.join(directory, labels_name), mmap_mode='r'))
+        if 'dtype' in metadata:
+            self.dtype = np.dtype(metadata['dtype'])
+        else:
+            # Written before the dtype was recorded; those datasets always have a shard.
+            self.dtype = self.features[0].dtype
+        # Position i is in the last shard whose start is <= i.
+        self._starts = np.cumsum([0] + metadata['shard_sizes'])
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def __getitem__(self, i):
+        shard = int(np.searchsorted(self._starts, i, side='right')) - 1
+        local = i - self._starts[shard]
+        return self.features[shard][local], self.labels[shard][local]
+
+    def take(self, indices):
+        """Features and labels of the positions at indices (any order), as new arrays."""
+        indices = np.asarray(indices)
+        features = np.empty((len(indices),) + self.shape, dtype=self.dtype)
+        labels = np.empty(len(indices), dtype=np.int16)
+        shards = np.searchsorted(self._starts, indices, side='right') - 1
+        # Read each shard's positions in file order, in one fancy index per shard.
+        order = np.lexsort((indices, shards))
+        bounds = np.searchsorted(shards[order], np.arange(len(self.features) + 1))
+        for shard in range(len(self.features)):
+            rows = order[bounds[shard]:bounds[shard + 1]]
+            if len(rows):
+                local = indices[rows] - self._starts[shard]
+                features[rows] = self.features[shard][local]
+                labels[rows] = self.labels[shard][local]
+        return features, labels
+
+    def batches(self, batch_size, shuffle=True, seed=None, drop_last=False):
+        """Yield (features, labels) batches covering every position once: in a random order across all shards
+        if shuffle, else in order.
+        """
+        if shuffle:
+            order = np.random.default_rng(seed).permutation(len(self))
+        else:
+            order = np.arange(len(self))
+        end = len(order) - len(order) % batch_size if drop_last else len(order)
+        for start in range(0, end, batch_size):
+            yield self.take(order[start:start + batch_size])
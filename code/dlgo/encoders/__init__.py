@@ -0,0 +1,3 @@
+from .base import *
+from .oneplane import *
+from .multiplane import *
@@ -0,0 +1,103 @@
+import importlib
+
+import numpy as np
+
+from dlgo.gotypes import Point
+
+"""
+Encoders turn game states into NumPy arrays for a model, one (planes, rows, cols) array per state.
+
+Each encoder fills an array it is given instead of making its own, so a whole batch goes into one preallocated
+(batch, planes, rows, cols) array: encode_batch() zeroes the array once and then has each state write only its
+non-zero entries. Encoders read the board's strings directly and index the array with precomputed flat
+offsets, so no Point or other object is made per point.
+
+    encoder = get_encoder_by_name('multiplane', 19)
+    inputs = encoder.encode_batch(game_states)
+"""
+
+__all__ = [
+    'Encoder',
+    'get_encoder_by_name',
+]
+
+
+class Encoder:
+    def __init__(self, board_size, num_planes):
+        if isinstance(board_size, int):
+            board_size = (board_size, board_size)
+        self.board_width, self.board_height = board_size
+        self.num_planes = num_planes
+        # Offset of each point in a flattened (rows, cols) plane.
+        self._offsets = {
+            Point(row=r, col=c): (r - 1) * self.board_height + (c - 1)
+            for r in range(1, self.board_width + 1)
+            for c in range(1, self.board_height + 1)}
+
+    def name(self):
+        raise NotImplementedError()
+
+    def encode(self, game_state, out=None):
+        """Encode game_state into out, a (planes, rows, cols) array (a new one if None), and return it."""
+        if out is None:
+            out = np.zeros(self.shape())
+        else:
+            out[...] = 0
+        self._write(game_state, out.reshape(self.num_planes, -1))
+        return out
+
+    def encode_batch(self, game_states, out=None):
+        """Encode a sequence of game states into out, a (batch, planes, rows, cols) array (a new one if None),
+        and return it."""
+        if out is None:
+            out = np.zeros((len(game_states),) + self.shape())
+        else:
+            out[:len(game_states)] = 0
+        flat = out.reshape(out.shape[0], self.num_planes, -1)
+        for i, game_state in enumerate(game_states):
+            self._write(game_state, flat[i])
+        return out
+
+    def _write(self, game_state, planes):
+        """Write the non-zero entries for game_state into planes, a zeroed (planes, rows * cols) view."""
+        raise NotImplementedError()
+
+    def encode_point(self, point):
+        return self._offsets[point]
+
+    def decode_point_index(self, index):
+        row = index // self.board_height
+        col = index % self.board_height
+        return Point(row=row + 1, col=col + 1)
+
+    def num_points(self):
+        return self.board_width * self.board_height
+
+    def shape(self):
+        return self.num_planes, self.board_width, self.board_height
+
+
+def stones(board):
+    """(point, string) for every stone on the board."""
+    grid = getattr(board, '_grid', None)
+    if grid is not None:
+        # goboard_fast: every stone maps to its string already.
+        for point, string in grid.items():
+            if string is not None:
+                yield point, string
+        return
+    for r in range(1, board.num_rows + 1):
+        for c in range(1, board.num_cols + 1):
+            point = Point(row=r, col=c)
+            string = board.get_go_string(point)
+            if string is not None:
+                yield point, string
+
+
+def get_encoder_by_name(name, board_size):
+    """The encoder from the module dlgo.encoders.<name>, for a board_size (int or (rows, cols)) board."""
+    if isinstance(board_size, int):
+        board_size = (board_size, board_size)
+    module = importlib.import_module('dlgo.encoders.' + name)
+    constructor = getattr(module, 'create')
+    return constructor(board_size)
@@ -0,0 +1,76 @@
+from dlgo.encoders.base import Encoder, stones
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player
+
+"""
+Eight planes:
+
+0. black stones
+1. white stones
+2. stones in a string with 1 liberty
+3. stones in a string with 2 liberties
+4. stones in a string with 3 or more liberties
+5. the ko point: the capture the player to move may not play because it would repeat an earlier position
+6. move age, from the board's MoveAge: 1 for the last stone played, 1 / (1 + age) for older ones, 0 where the
+   age isn't known (empty points, and boards without move ages)
+7. player to move: all 1 if black is to move, all 0 if white
+
+Only a capture can be a ko, so the ko plane only checks the last liberties of the opponent's strings in atari.
+"""
+
+__all__ = [
+    'MultiPlaneEncoder',
+]
+
+BLACK_PLANE, WHITE_PLANE, LIBERTY_PLANE, KO_PLANE, MOVE_AGE_PLANE, PLAYER_PLANE = 0, 1, 2, 5, 6, 7
+
+
+class MultiPlaneEncoder(Encoder):
+    def __init__(self, board_size):
+        Encoder.__init__(self, board_size, 8)
+
+    def name(self):
+        return 'multiplane'
+
+    def _write(self, game_state, planes):
+        offsets = self._offsets
+        board = game_state.board
+        black = Player.black
+        # Offsets are collected in lists and each plane is written in one go.
+        player = game_state.next_player
+        black_offsets = []
+        white_offsets = []
+        liberty_offsets = ([], [], [])
+        # The last liberties of opponent strings in atari: the only points where a ko can be.
+        capture_points = set()
+        for point, string in stones(board):
+            offset = offsets[point]
+            (black_offsets if string.color is black else white_offsets).append(offset)
+            num_liberties = len(string.liberties)
+            if num_liberties >= 3:
+                liberty_offsets[2].append(offset)
+            else:
+                liberty_offsets[num_liberties - 1].append(offset)
+                if num_liberties == 1 and string.color is not player:
+                    capture_points.update(string.liberties)
+        planes[BLACK_PLANE, black_offsets] = 1
+        planes[WHITE_PLANE, white_offsets] = 1
+        for i, liberty_plane_offsets in enumerate(liberty_offsets):
+            planes[LIBERTY_PLANE + i, liberty_plane_offsets] = 1
+
+        for point in capture_points:
+            if game_state.does_move_violate_ko(player, Move.play(point)):
+                planes[KO_PLANE, offsets[point]] = 1
+
+        move_ages = getattr(board, 'move_ages', None)
+        if move_ages is not None:
+            ages = move_ages.move_ages.reshape(-1)
+            known = ages >= 0
+            planes[MOVE_AGE_PLANE, known] = 1.0 / (1.0 + ages[known])
+
+        if player == black:
+            planes[PLAYER_PLANE] = 1
+
+
+def create(board_size):
+    return MultiPlaneEncoder(board_size)
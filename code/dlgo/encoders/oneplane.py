@@ -0,0 +1,32 @@
+from dlgo.encoders.base import Encoder, stones
+
+"""
+One plane: 1 for a stone of the player to move, -1 for an opponent stone, 0 for an empty point.
+"""
+
+__all__ = [
+    'OnePlaneEncoder',
+]
+
+
+class OnePlaneEncoder(Encoder):
+    def __init__(self, board_size):
+        Encoder.__init__(self, board_size, 1)
+
+    def name(self):
+        return 'oneplane'
+
+    def _write(self, game_state, planes):
+        offsets = self._offsets
+        next_player = game_state.next_player
+        # Offsets are collected in lists and written in one go.
+        own_offsets = []
+        other_offsets = []
+        for point, string in stones(game_state.board):
+            (own_offsets if string.color is next_player else other_offsets).append(offsets[point])
+        planes[0, own_offsets] = 1
+        planes[0, other_offsets] = -1
+
+
+def create(board_size):
+    return OnePlaneEncoder(board_size)
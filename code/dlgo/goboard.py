@@ -101,7 +101,7 @@ class Board():
         for new_string_point in new_string.stones: # update all the points in this combined string 
             self._grid[new_string_point] = new_string 
 
-        self._hash ^= zobrist.HASH_CODE[point, player]
+        self._hash ^= zobrist.code(point, player)
 
         for other_color_string in adjacent_opposite_color: # remove liberties from opposing strings
             replacement = other_color_string.without_liberty(point)  # returns a GoString
@@ -126,7 +126,7 @@ class Board():
                     self._replace_string(neighbor_string.with_liberty(point))
             self._grid[point] = None 
 
-            self._hash ^= zobrist.HASH_CODE[point, string.color]
+            self._hash ^= zobrist.code(point, string.color)
     
     def is_on_grid(self, point):
         # the grid will go from 1 to num_rows (not 0 delimited)
@@ -0,0 +1,413 @@
+from dlgo import goboard_fast
+from dlgo.gotypes import Player, Point
+from dlgo.goboard_fast import GoString, Move
+from dlgo import zobrist
+
+"""
+Array-backed version of goboard_fast. The public API is the same as goboard_fast.Board / GameState, but
+internally every point is an integer index into a flat, padded list:
+- The board is stored row by row with a one point border all around it, so point (row, col) lives at
+  index row * (num_cols + 2) + col and the four neighbors are at fixed offsets (-stride, +stride, -1, +1).
+- _cells holds the color of each index (EMPTY, BLACK, WHITE or BORDER), so get() is a list lookup
+  instead of hashing a Point namedtuple into a dict.
+- _strings holds the string each index belongs to. Strings keep their stones and liberties as frozensets
+  of ints, which are much cheaper to hash and combine than frozensets of Points.
+- Neighbor lists and zobrist codes are precomputed per board size, indexed the same way.
+Points are only converted back into Point objects at the API boundary (neighbors, corners, get_go_string).
+"""
+
+__all__ = [
+    'Board',
+    'GameState',
+    'Move',
+]
+
+EMPTY = 0
+BLACK = Player.black.value
+WHITE = Player.white.value
+BORDER = 3
+
+COLOR_TO_PLAYER = (None, Player.black, Player.white, None)
+
+index_tables = {}
+
+
+class _IndexTable():
+    """Everything about a board size that can be computed once and shared by every board of that size."""
+    def __init__(self, num_rows, num_cols):
+        self.stride = num_cols + 2
+        self.size = (num_rows + 2) * self.stride
+        self.points = [None] * self.size
+        self.on_grid = []
+        self.neighbors = [()] * self.size
+        self.corners = [()] * self.size
+        self.empty_cells = [BORDER] * self.size
+        self.hash_codes = ([0] * self.size, [0] * self.size, [0] * self.size)
+
+        for r in range(1, num_rows + 1):
+            for c in range(1, num_cols + 1):
+                index = r * self.stride + c
+                point = Point(row=r, col=c)
+                self.points[index] = point
+                self.on_grid.append(index)
+                self.empty_cells[index] = EMPTY
+                self.hash_codes[EMPTY][index] = zobrist.code(point, None)
+                self.hash_codes[BLACK][index] = zobrist.code(point, Player.black)
+                self.hash_codes[WHITE][index] = zobrist.code(point, Player.white)
+
+        stride = self.stride
+        for index in self.on_grid:
+            self.neighbors[index] = tuple(
+                n for n in (index - stride, index + stride, index - 1, index + 1)
+                if self.empty_cells[n] != BORDER)
+            self.corners[index] = tuple(
+                n for n in (index - stride - 1, index - stride + 1, index + stride - 1, index + stride + 1)
+                if self.empty_cells[n] != BORDER)
+
+
+def get_index_table(dim):
+    if dim not in index_tables:
+        index_tables[dim] = _IndexTable(*dim)
+    return index_tables[dim]
+
+
+class _IndexString():
+    """Stones that are linked by a chain of connected stones of the
+    same color, stored as integer board indices.
+    """
+    __slots__ = ('color', 'stones', 'liberties')
+
+    def __init__(self, color, stones, liberties):
+        self.color = color
+        self.stones = frozenset(stones)
+        self.liberties = frozenset(liberties)
+
+    def without_liberty(self, index):
+        return _IndexString(self.color, self.stones, self.liberties - {index})
+
+    def with_liberty(self, index):
+        return _IndexString(self.color, self.stones, self.liberties | {index})
+
+    def merged_with(self, string):
+        """Return a new string containing all stones in both strings."""
+        assert string.color == self.color
+        combined_stones = self.stones | string.stones
+        return _IndexString(
+            self.color,
+            combined_stones,
+            (self.liberties | string.liberties) - combined_stones)
+
+    @property
+    def num_liberties(self):
+        return len(self.liberties)
+
+
+class MoveDelta():
+    """What a single Board.play changed: every string it overwrote (merged,
+    captured, lost or gained a liberty) and the hash before the move.
+    """
+    __slots__ = ('player', 'point', 'previous_hash', 'captured', 'replaced_strings')
+
+    def __init__(self, player, point, previous_hash):
+        self.player = player
+        self.point = point
+        self.previous_hash = previous_hash
+        self.captured = []
+        self.replaced_strings = []
+
+
+class Board():
+    def __init__(self, num_rows, num_cols):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._table = get_index_table((num_rows, num_cols))
+        self._stride = self._table.stride
+        self._cells = list(self._table.empty_cells)
+        self._strings = [None] * self._table.size
+        self._hash = zobrist.EMPTY_BOARD
+        self._undo_stack = []
+
+    def _index(self, point):
+        return point.row * self._stride + point.col
+
+    def neighbors(self, point):
+        points = self._table.points
+        return [points[n] for n in self._table.neighbors[self._index(point)]]
+
+    def corners(self, point):
+        points = self._table.points
+        return [points[n] for n in self._table.corners[self._index(point)]]
+
+    def place_stone(self, player, point):
+        self._place_stone(player, point, None)
+
+    def play(self, player, point):
+        """Place a stone in place and record a MoveDelta so undo() can take it back."""
+        delta = MoveDelta(player, point, self._hash)
+        self._place_stone(player, point, delta)
+        self._undo_stack.append(delta)
+        return delta
+
+    def undo(self):
+        """Take back the most recent play(), restoring the exact previous board."""
+        delta = self._undo_stack.pop()
+        cells = self._cells
+        strings = self._strings
+        for old_string in reversed(delta.replaced_strings):
+            for index in old_string.stones:
+                strings[index] = old_string
+                cells[index] = old_string.color
+        index = self._index(delta.point)
+        strings[index] = None
+        cells[index] = EMPTY
+        self._hash = delta.previous_hash
+        return delta
+
+    def _place_stone(self, player, point, delta):
+        assert self.is_on_grid(point)
+        index = point.row * self._stride + point.col
+        cells = self._cells
+        strings = self._strings
+        assert cells[index] == EMPTY
+        color = player.value
+        # 0. Examine the adjacent points.
+        adjacent_same_color = []
+        adjacent_opposite_color = []
+        liberties = []
+        for neighbor in self._table.neighbors[index]:
+            neighbor_color = cells[neighbor]
+            if neighbor_color == EMPTY:
+                liberties.append(neighbor)
+                continue
+            neighbor_string = strings[neighbor]
+            if neighbor_color == color:
+                if neighbor_string not in adjacent_same_color:
+                    adjacent_same_color.append(neighbor_string)
+            elif neighbor_string not in adjacent_opposite_color:
+                adjacent_opposite_color.append(neighbor_string)
+        new_string = _IndexString(color, (index,), liberties)
+
+        # 1. Merge any adjacent strings of the same color.
+        for same_color_string in adjacent_same_color:
+            new_string = new_string.merged_with(same_color_string)
+        if delta is not None:
+            delta.replaced_strings.extend(adjacent_same_color)
+        for new_string_index in new_string.stones:
+            strings[new_string_index] = new_string
+        cells[index] = color
+        hash_codes = self._table.hash_codes
+        self._hash ^= hash_codes[EMPTY][index] ^ hash_codes[color][index]
+
+        # 2. Reduce liberties of any adjacent strings of the opposite
+        #    color.
+        # 3. If any opposite color strings now have zero liberties,
+        #    remove them.
+        for other_color_string in adjacent_opposite_color:
+            replacement = other_color_string.without_liberty(index)
+            if replacement.num_liberties:
+                self._replace_string(replacement, delta)
+            else:
+                self._remove_string(other_color_string, delta)
+
+    def _replace_string(self, new_string, delta=None):
+        strings = self._strings
+        if delta is not None:
+            delta.replaced_strings.append(strings[next(iter(new_string.stones))])
+        for index in new_string.stones:
+            strings[index] = new_string
+
+    def _remove_string(self, string, delta=None):
+        if delta is not None:
+            delta.captured.append(string)
+            delta.replaced_strings.append(string)
+        cells = self._cells
+        strings = self._strings
+        neighbors = self._table.neighbors
+        hash_codes = self._table.hash_codes
+        for index in string.stones:
+            # Removing a string can create liberties for other strings.
+            for neighbor in neighbors[index]:
+                neighbor_string = strings[neighbor]
+                if neighbor_string is None:
+                    continue
+                if neighbor_string is not string:
+                    self._replace_string(neighbor_string.with_liberty(index), delta)
+            strings[index] = None
+            cells[index] = EMPTY
+            self._hash ^= hash_codes[string.color][index] ^ hash_codes[EMPTY][index]
+
+    def is_self_capture(self, player, point):
+        return self._is_self_capture(player.value, point.row * self._stride + point.col)
+
+    def _is_self_capture(self, color, index):
+        cells = self._cells
+        strings = self._strings
+        friendly_strings = []
+        for neighbor in self._table.neighbors[index]:
+            neighbor_color = cells[neighbor]
+            if neighbor_color == EMPTY:
+                # This point has a liberty. Can't be self capture.
+                return False
+            elif neighbor_color == color:
+                # Gather for later analysis.
+                friendly_strings.append(strings[neighbor])
+            elif strings[neighbor].num_liberties == 1:
+                # This move is real capture, not a self capture.
+                return False
+        return all(string.num_liberties == 1 for string in friendly_strings)
+
+    def will_capture(self, player, point):
+        return self._will_capture(player.value, point.row * self._stride + point.col)
+
+    def _will_capture(self, color, index):
+        cells = self._cells
+        strings = self._strings
+        for neighbor in self._table.neighbors[index]:
+            neighbor_color = cells[neighbor]
+            if neighbor_color == EMPTY or neighbor_color == color:
+                continue
+            if strings[neighbor].num_liberties == 1:
+                # This move would capture.
+                return True
+        return False
+
+    def hash_after(self, player, point):
+        """Return the zobrist hash the board would have after player plays
+        on point, without changing the board.
+        """
+        index = point.row * self._stride + point.col
+        color = player.value
+        cells = self._cells
+        hash_codes = self._table.hash_codes
+        new_hash = self._hash ^ hash_codes[EMPTY][index] ^ hash_codes[color][index]
+        captured = []
+        for neighbor in self._table.neighbors[index]:
+            neighbor_color = cells[neighbor]
+            if neighbor_color == EMPTY or neighbor_color == color:
+                continue
+            string = self._strings[neighbor]
+            if string.num_liberties != 1 or string in captured:
+                continue
+            captured.append(string)
+            for stone in string.stones:
+                new_hash ^= hash_codes[neighbor_color][stone] ^ hash_codes[EMPTY][stone]
+        return new_hash
+
+    def legal_points(self, player):
+        """Return (legal, capturing): the set of empty points where player
+        may play, ignoring ko, and the subset of those that capture. Same
+        contract as goboard_fast.Board.legal_points, but every call scans
+        the whole board.
+        """
+        cells = self._cells
+        points = self._table.points
+        color = player.value
+        legal = set()
+        capturing = set()
+        for index in self._table.on_grid:
+            if cells[index] != EMPTY or self._is_self_capture(color, index):
+                continue
+            legal.add(points[index])
+            if self._will_capture(color, index):
+                capturing.add(points[index])
+        return legal, capturing
+
+    def is_on_grid(self, point):
+        return 1 <= point.row <= self.num_rows and \
+            1 <= point.col <= self.num_cols
+
+    def get(self, point):
+        """Return the content of a point on the board.
+
+        Returns None if the point is empty or off the board, or a Player
+        if there is a stone on that point.
+        """
+        row, col = point
+        if 1 <= row <= self.num_rows and 1 <= col <= self.num_cols:
+            return COLOR_TO_PLAYER[self._cells[row * self._stride + col]]
+        return None
+
+    def get_go_string(self, point):
+        """Return the entire string of stones at a point.
+
+        Returns None if the point is empty, or a goboard_fast.GoString
+        (with Point stones and liberties) if there is a stone on that point.
+        """
+        if not self.is_on_grid(point):
+            return None
+        string = self._strings[self._index(point)]
+        if string is None:
+            return None
+        points = self._table.points
+        return GoString(
+            COLOR_TO_PLAYER[string.color],
+            [points[index] for index in string.stones],
+            [points[index] for index in string.liberties])
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and \
+            self.num_rows == other.num_rows and \
+            self.num_cols == other.num_cols and \
+            self._hash == other._hash
+
+    def __deepcopy__(self, memodict={}):
+        copied = Board.__new__(Board)
+        copied.num_rows = self.num_rows
+        copied.num_cols = self.num_cols
+        copied._table = self._table
+        copied._stride = self._stride
+        # Shallow copies are enough: cells are ints and strings are immutable.
+        copied._cells = self._cells[:]
+        copied._strings = self._strings[:]
+        copied._hash = self._hash
+        copied._undo_stack = []
+        return copied
+
+    def zobrist_hash(self):
+        return self._hash
+
+
+class GameState(goboard_fast.GameState):
+    """goboard_fast.GameState running on the array-backed Board."""
+    @classmethod
+    def new_game(cls, board_size):
+        if isinstance(board_size, int):
+            board_size = (board_size, board_size)
+        board = Board(*board_size)
+        return GameState(board, Player.black, None, None)
+
+    def is_valid_move(self, move):
+        if self.is_over():
+            return False
+        if move.is_pass or move.is_resign:
+            return True
+        board = self.board
+        index = board._index(move.point)
+        color = self.next_player.value
+        return (
+            board._cells[index] == EMPTY and
+            not board._is_self_capture(color, index) and
+            not (board._will_capture(color, index) and
+                 self.does_move_violate_ko(self.next_player, move)))
+
+    def legal_moves(self):
+        if self.is_over():
+            return [Move.pass_turn(), Move.resign()]
+        board = self.board
+        cells = board._cells
+        points = board._table.points
+        color = self.next_player.value
+        moves = []
+        for index in board._table.on_grid:
+            if cells[index] != EMPTY or board._is_self_capture(color, index):
+                continue
+            move = Move.play(points[index])
+            if board._will_capture(color, index) and \
+                    self.does_move_violate_ko(self.next_player, move):
+                continue
+            moves.append(move)
+        # These two moves are always legal.
+        moves.append(Move.pass_turn())
+        moves.append(Move.resign())
+
+        return moves
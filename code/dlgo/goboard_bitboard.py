@@ -0,0 +1,343 @@
+from dlgo import goboard_fast
+from dlgo.gotypes import Player, Point
+from dlgo.goboard_fast import GoString, Move
+from dlgo import zobrist
+
+"""
+Bitboard version of goboard_fast, meant for the small boards (9x9, 13x13) where we play huge numbers of random
+playouts. The public API is the same as goboard_fast.Board / GameState.
+- Each color is a single Python int with one bit per point. Rows are num_cols + 1 bits wide: the extra bit is
+  a guard column that is never set, so shifting by 1 moves a stone left/right without wrapping to the next row,
+  and shifting by the row width moves it up/down.
+- Strings are found by flood fill (grow the string by one step with shifts, mask with the stones of its color,
+  repeat until it stops growing) and liberties are the grown string masked with the empty points.
+- A board is just (black, white, hash), so copying it is O(1) and undo is a stack of those triples.
+- legal_moves works on whole masks at once (Board.legal_masks): a point is legal without looking at it individually
+  if it has an empty neighbor, captures, or touches a friendly string with a spare liberty. Only capturing points
+  need a ko check. Board.legal_points returns the same thing as sets of points, like goboard_fast.
+"""
+
+__all__ = [
+    'Board',
+    'GameState',
+    'Move',
+]
+
+bit_tables = {}
+
+
+class _BitTable():
+    """Masks, shifts, point conversions and zobrist codes shared by every board of one size."""
+    def __init__(self, num_rows, num_cols):
+        self.width = num_cols + 1
+        self.on_board = 0
+        self.points = {}
+        self.bits = {}
+        self.hash_codes = {}
+        self.neighbor_masks = {}
+        for r in range(1, num_rows + 1):
+            for c in range(1, num_cols + 1):
+                point = Point(row=r, col=c)
+                bit = 1 << ((r - 1) * self.width + (c - 1))
+                self.on_board |= bit
+                self.points[bit] = point
+                self.bits[point] = bit
+                # Same codes as goboard_fast, so hashes are comparable across engines.
+                empty_code = zobrist.code(point, None)
+                self.hash_codes[bit] = {
+                    Player.black: empty_code ^ zobrist.code(point, Player.black),
+                    Player.white: empty_code ^ zobrist.code(point, Player.white),
+                }
+        for bit in self.points:
+            self.neighbor_masks[bit] = \
+                ((bit << 1) | (bit >> 1) | (bit << self.width) | (bit >> self.width)) & self.on_board
+
+
+def get_bit_table(dim):
+    if dim not in bit_tables:
+        bit_tables[dim] = _BitTable(*dim)
+    return bit_tables[dim]
+
+
+def _iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+class Board():
+    def __init__(self, num_rows, num_cols):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._table = get_bit_table((num_rows, num_cols))
+        self._width = self._table.width
+        self._on_board = self._table.on_board
+        self._black = 0
+        self._white = 0
+        self._hash = zobrist.EMPTY_BOARD
+        self._undo_stack = []
+        if (num_rows, num_cols) not in goboard_fast.neighbor_tables:
+            goboard_fast.init_neighbor_table((num_rows, num_cols))
+        if (num_rows, num_cols) not in goboard_fast.corner_tables:
+            goboard_fast.init_corner_table((num_rows, num_cols))
+
+    def _stones(self, player):
+        return self._black if player == Player.black else self._white
+
+    def _adjacent(self, mask):
+        """All points next to a stone in mask, not including mask itself."""
+        width = self._width
+        grown = (mask << 1) | (mask >> 1) | (mask << width) | (mask >> width)
+        return grown & self._on_board & ~mask
+
+    def _flood(self, seed, stones):
+        """The string in stones that contains seed."""
+        string = seed
+        while True:
+            grown = (string | self._adjacent(string)) & stones
+            if grown == string:
+                return string
+            string = grown
+
+    def _empty(self):
+        return self._on_board & ~(self._black | self._white)
+
+    def neighbors(self, point):
+        return goboard_fast.neighbor_tables[self.num_rows, self.num_cols][point]
+
+    def corners(self, point):
+        return goboard_fast.corner_tables[self.num_rows, self.num_cols][point]
+
+    def place_stone(self, player, point):
+        assert self.is_on_grid(point)
+        bit = self._table.bits[point]
+        assert not (self._black | self._white) & bit
+        if player == Player.black:
+            own, other = self._black | bit, self._white
+        else:
+            own, other = self._white | bit, self._black
+        self._hash ^= self._table.hash_codes[bit][player]
+
+        # Remove any opponent strings next to the new stone that are left
+        # without liberties.
+        empty = self._on_board & ~(own | other)
+        checked = 0
+        for neighbor in _iter_bits(self._adjacent(bit) & other):
+            if neighbor & checked:
+                continue
+            string = self._flood(neighbor, other)
+            checked |= string
+            if not self._adjacent(string) & empty:
+                other &= ~string
+                empty |= string
+                hash_codes = self._table.hash_codes
+                for stone in _iter_bits(string):
+                    self._hash ^= hash_codes[stone][player.other]
+
+        if player == Player.black:
+            self._black, self._white = own, other
+        else:
+            self._white, self._black = own, other
+
+    def play(self, player, point):
+        """Place a stone in place, remembering the previous board for undo()."""
+        self._undo_stack.append((self._black, self._white, self._hash))
+        self.place_stone(player, point)
+
+    def undo(self):
+        """Take back the most recent play()."""
+        self._black, self._white, self._hash = self._undo_stack.pop()
+
+    def _captures(self, own_bit, own, other):
+        """Opponent stones captured by playing own_bit."""
+        adjacent_other = self._table.neighbor_masks[own_bit] & other
+        if not adjacent_other:
+            return 0
+        empty = self._on_board & ~(own | other | own_bit)
+        captured = 0
+        for neighbor in _iter_bits(adjacent_other):
+            if neighbor & captured:
+                continue
+            string = self._flood(neighbor, other)
+            if not self._adjacent(string) & empty:
+                captured |= string
+        return captured
+
+    def is_self_capture(self, player, point):
+        return self._is_self_capture(player, self._table.bits[point])
+
+    def _is_self_capture(self, player, bit):
+        own = self._stones(player)
+        other = self._stones(player.other)
+        empty = self._on_board & ~(own | other)
+        if self._table.neighbor_masks[bit] & empty:
+            # This point has a liberty. Can't be self capture.
+            return False
+        if self._captures(bit, own, other):
+            # This move is real capture, not a self capture.
+            return False
+        string = self._flood(bit, own | bit)
+        return not self._adjacent(string) & empty
+
+    def will_capture(self, player, point):
+        bit = self._table.bits[point]
+        return self._captures(bit, self._stones(player), self._stones(player.other)) != 0
+
+    def hash_after(self, player, point):
+        """The zobrist hash of the board after player plays on point."""
+        bit = self._table.bits[point]
+        captured = self._captures(bit, self._stones(player), self._stones(player.other))
+        return self._hash_after(player, bit, captured)
+
+    def _hash_after(self, player, bit, captured):
+        hash_codes = self._table.hash_codes
+        new_hash = self._hash ^ hash_codes[bit][player]
+        for stone in _iter_bits(captured):
+            new_hash ^= hash_codes[stone][player.other]
+        return new_hash
+
+    def legal_masks(self, player):
+        """(legal, capturing): masks of the points where player may play,
+        ignoring ko, and of the subset of those that capture something.
+        """
+        own = self._stones(player)
+        other = self._stones(player.other)
+        empty = self._empty()
+        width = self._width
+
+        # Points with an empty neighbor are always legal.
+        legal = empty & ((empty << 1) | (empty >> 1) | (empty << width) | (empty >> width))
+
+        capturing = 0
+        remaining = other
+        while remaining:
+            string = self._flood(remaining & -remaining, other)
+            remaining &= ~string
+            liberties = self._adjacent(string) & empty
+            if liberties & (liberties - 1) == 0:
+                # Exactly one liberty: playing there captures.
+                capturing |= liberties
+
+        remaining = own
+        while remaining:
+            string = self._flood(remaining & -remaining, own)
+            remaining &= ~string
+            liberties = self._adjacent(string) & empty
+            if liberties & (liberties - 1):
+                # Two or more liberties: playing on one of them keeps the string alive.
+                legal |= liberties
+
+        return legal | capturing, capturing
+
+    def legal_points(self, player):
+        """Return (legal, capturing) as sets of points, like
+        goboard_fast.Board.legal_points. Use legal_masks to skip the
+        conversion.
+        """
+        legal, capturing = self.legal_masks(player)
+        points = self._table.points
+        return {points[bit] for bit in _iter_bits(legal)}, \
+            {points[bit] for bit in _iter_bits(capturing)}
+
+    def is_on_grid(self, point):
+        return 1 <= point.row <= self.num_rows and \
+            1 <= point.col <= self.num_cols
+
+    def get(self, point):
+        """Return the content of a point on the board.
+
+        Returns None if the point is empty or off the board, or a Player
+        if there is a stone on that point.
+        """
+        bit = self._table.bits.get(point)
+        if bit is None:
+            return None
+        if self._black & bit:
+            return Player.black
+        if self._white & bit:
+            return Player.white
+        return None
+
+    def get_go_string(self, point):
+        """Return the entire string of stones at a point.
+
+        Returns None if the point is empty, or a goboard_fast.GoString
+        (a snapshot, computed by flood fill) if there is a stone on that point.
+        """
+        player = self.get(point)
+        if player is None:
+            return None
+        string = self._flood(self._table.bits[point], self._stones(player))
+        liberties = self._adjacent(string) & self._empty()
+        points = self._table.points
+        return GoString(
+            player,
+            [points[stone] for stone in _iter_bits(string)],
+            [points[liberty] for liberty in _iter_bits(liberties)])
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and \
+            self.num_rows == other.num_rows and \
+            self.num_cols == other.num_cols and \
+            self._black == other._black and \
+            self._white == other._white
+
+    def __deepcopy__(self, memodict={}):
+        copied = Board.__new__(Board)
+        copied.__dict__.update(self.__dict__)
+        copied._undo_stack = []
+        return copied
+
+    def zobrist_hash(self):
+        return self._hash
+
+
+class GameState(goboard_fast.GameState):
+    """goboard_fast.GameState running on the bitboard Board."""
+    @classmethod
+    def new_game(cls, board_size):
+        if isinstance(board_size, int):
+            board_size = (board_size, board_size)
+        board = Board(*board_size)
+        return GameState(board, Player.black, None, None)
+
+    def is_valid_move(self, move):
+        if self.is_over():
+            return False
+        if move.is_pass or move.is_resign:
+            return True
+        board = self.board
+        player = self.next_player
+        bit = board._table.bits[move.point]
+        own = board._stones(player)
+        other = board._stones(player.other)
+        if (own | other) & bit:
+            return False
+        captured = board._captures(bit, own, other)
+        if not captured:
+            # No capture, so no ko: legal unless it is self capture.
+            empty = board._on_board & ~(own | other)
+            return bool(board._table.neighbor_masks[bit] & empty) or \
+                bool(board._adjacent(board._flood(bit, own | bit)) & empty)
+        next_situation = (player.other, board._hash_after(player, bit, captured))
+        return next_situation not in self.previous_states
+
+    def legal_moves(self):
+        if self.is_over():
+            return [Move.pass_turn(), Move.resign()]
+        board = self.board
+        legal, capturing = board.legal_masks(self.next_player)
+        points = board._table.points
+        moves = []
+        for bit in _iter_bits(legal):
+            if bit & capturing:
+                next_situation = (self.next_player.other, board.hash_after(self.next_player, points[bit]))
+                if next_situation in self.previous_states:
+                    continue
+            moves.append(Move.play(points[bit]))
+        # These two moves are always legal.
+        moves.append(Move.pass_turn())
+        moves.append(Move.resign())
+
+        return moves
@@ -1,7 +1,7 @@
 import copy
 from dlgo.gotypes import Player, Point
 from dlgo.scoring import compute_game_result
-from dlgo import zobrist
+from dlgo import symmetry, zobrist
 from dlgo.utils import MoveAge
 
 """
@@ -9,10 +9,26 @@ This is faster in a few ways:
 - Board class has a method to check whether a move will capture, and only checks for ko if the move will capture. 
   You can't end up in a ko for a move that doesn't capture.
   This reduces the most expensive function call does_move_violate_ko from deepcopying the board and placing a move
-- Speaking of that function, when it does get run, we don't do a full deepcopy. 
-  GoString is immutable, we don't need to copy it, we can point to the same place in memory because it won't be changed anyway
-- MoveAge and the neighbor_tables and corner_tables don't seem to be used for anything. For now, maybe for later?
-- I also don't know why the zobrist.HASH_CODE includes the empty board now. Maybe it's for something later.
+- And when it does run, Board.hash_after computes the next hash by XORing the new stone in and the captured stones
+  out, without touching the grid at all.
+- GoStrings are updated in place instead of being rebuilt: a liberty change is a set add/remove, and a merge moves the
+  smaller strings into the largest one, so playing next to a big group costs O(neighbors), not O(size of the group).
+  The price is that copying the board has to copy each string once.
+- Board.play / Board.undo change the board in place and record a MoveDelta (stone placed, strings captured,
+  strings overwritten, previous hash), so the ko check and search agents can try a move and take it back
+  instead of copying the board. apply_move still returns a new GameState on a copied board.
+- previous_states is a SituationHistory that shares its storage with the states before it, so keeping many
+  GameStates alive (e.g. in a search tree) doesn't cost a copy of the whole game history per state.
+- The board keeps the set of empty points and, per player, the points that are legal (ignoring ko) and that
+  capture, updating only the points around each move and capture. legal_moves() reads those sets and only
+  runs the ko check on capturing points.
+- MoveAge is read by dlgo.encoders.multiplane, so deepcopy copies it along with the board (it used to start over
+  from an empty MoveAge). The corner_tables don't seem to be used for anything. For now, maybe for later?
+- I also don't know why the zobrist codes include the empty board now. Maybe it's for something later.
+- Zobrist codes come from zobrist.table(), a flat array indexed by point index and color, instead of a dict keyed
+  by (Point, Player) tuples.
+- The board also keeps its hash under each of the 8 symmetries (see dlgo.symmetry), packed into one int so that a
+  stone placed or captured is one more XOR. symmetry.canonicalize() reads them.
 """
 
 __all__ = [
@@ -58,6 +74,11 @@ def init_corner_table(dim):
     corner_tables[dim] = new_table
 
 
+def zobrist_offset(point):
+    """Where the codes for point start in zobrist.table()."""
+    return ((point.row - 1) * zobrist.MAX_BOARD_SIZE + point.col - 1) * zobrist.NUM_COLORS
+
+
 class IllegalMoveError(Exception):
     pass
 
@@ -65,28 +86,22 @@ class IllegalMoveError(Exception):
 class GoString():
     """Stones that are linked by a chain of connected stones of the
     same color.
+
+    Strings are mutable: the board adds and removes liberties in place and
+    merges smaller strings into larger ones, so a string's stones and
+    liberties always reflect the current board. Every stone of a string
+    maps to the same GoString object in the board's grid.
     """
     def __init__(self, color, stones, liberties):
         self.color = color
-        self.stones = frozenset(stones)
-        self.liberties = frozenset(liberties)
-
-    def without_liberty(self, point):
-        new_liberties = self.liberties - set([point])
-        return GoString(self.color, self.stones, new_liberties)
-
-    def with_liberty(self, point):
-        new_liberties = self.liberties | set([point])
-        return GoString(self.color, self.stones, new_liberties)
-
-    def merged_with(self, string):
-        """Return a new string containing all stones in both strings."""
-        assert string.color == self.color
-        combined_stones = self.stones | string.stones
-        return GoString(
-            self.color,
-            combined_stones,
-            (self.liberties | string.liberties) - combined_stones)
+        self.stones = set(stones)
+        self.liberties = set(liberties)
+
+    def remove_liberty(self, point):
+        self.liberties.remove(point)
+
+    def add_liberty(self, point):
+        self.liberties.add(point)
 
     @property
     def num_liberties(self):
@@ -99,15 +114,41 @@ class GoString():
             self.liberties == other.liberties
 
     def __deepcopy__(self, memodict={}):
-        return GoString(self.color, self.stones, copy.deepcopy(self.liberties))
+        return GoString(self.color, self.stones, self.liberties)
+
+
+class MoveDelta():
+    """What a single Board.play changed, so Board.undo can put it back:
+    the stone placed, the string it ended up in, the strings merged into
+    that string, the strings it captured, every liberty added to or removed
+    from a string, and the hashes before the move.
+    """
+    __slots__ = ('player', 'point', 'previous_hash', 'previous_symmetry_hashes', 'string', 'merged',
+                 'captured', 'liberty_edits', 'captured_ages')
+
+    def __init__(self, player, point, previous_hash, previous_symmetry_hashes):
+        self.player = player
+        self.point = point
+        self.previous_hash = previous_hash
+        self.previous_symmetry_hashes = previous_symmetry_hashes
+        self.string = None
+        self.merged = []
+        self.captured = []
+        # (string, point, was_added) in the order the edits were made.
+        self.liberty_edits = []
+        self.captured_ages = []
 
 
 class Board():
     def __init__(self, num_rows, num_cols):
+        assert num_rows <= zobrist.MAX_BOARD_SIZE and num_cols <= zobrist.MAX_BOARD_SIZE
         self.num_rows = num_rows
         self.num_cols = num_cols
         self._grid = {}
         self._hash = zobrist.EMPTY_BOARD
+        self._codes = zobrist.table()
+        self._symmetry_hashes = symmetry.EMPTY_BOARD_HASHES
+        self._symmetry_codes = symmetry.zobrist_codes(num_rows, num_cols)
 
         global neighbor_tables
         dim = (num_rows, num_cols)
@@ -118,7 +159,15 @@ class Board():
         self.neighbor_table = neighbor_tables[dim]
         self.corner_table = corner_tables[dim]
         self.move_ages = MoveAge(self)
-
+        self._undo_stack = []
+        # Empty points, and for each player the empty points they may play
+        # (ignoring ko) and the subset of those that capture. Points whose
+        # status may have changed since the last legal_points call are kept
+        # in _dirty and re-examined lazily.
+        self._empty = set(self.neighbor_table)
+        self._legal = {Player.black: set(), Player.white: set()}
+        self._capturing = {Player.black: set(), Player.white: set()}
+        self._dirty = set(self._empty)
 
     def neighbors(self, point):
         return self.neighbor_table[point]
@@ -127,10 +176,61 @@ class Board():
         return self.corner_table[point]
 
     def place_stone(self, player, point):
+        self._place_stone(player, point, None)
+
+    def play(self, player, point):
+        """Place a stone in place and remember how to take it back.
+
+        Unlike place_stone, every change is recorded in a MoveDelta on the
+        board's undo stack, so a search can walk down a line of play with
+        play() and back up again with undo() on a single board.
+        """
+        delta = MoveDelta(player, point, self._hash, self._symmetry_hashes)
+        self._place_stone(player, point, delta)
+        self._undo_stack.append(delta)
+        return delta
+
+    def undo(self):
+        """Take back the most recent play(), restoring the exact previous board."""
+        delta = self._undo_stack.pop()
+        grid = self._grid
+        # Captured strings were never modified, so they just go back on the grid.
+        for string in reversed(delta.captured):
+            for point in string.stones:
+                grid[point] = string
+        for string, point, was_added in reversed(delta.liberty_edits):
+            if was_added:
+                string.liberties.discard(point)
+            else:
+                string.liberties.add(point)
+        # Merged strings were never modified either; only the string they were
+        # merged into has to give their stones back.
+        string = delta.string
+        for merged_string in delta.merged:
+            string.stones -= merged_string.stones
+            for point in merged_string.stones:
+                grid[point] = merged_string
+        string.stones.discard(delta.point)
+        grid.pop(delta.point, None)
+        self._hash = delta.previous_hash
+        self._symmetry_hashes = delta.previous_symmetry_hashes
+        self._empty.add(delta.point)
+        for string in delta.captured:
+            self._empty -= string.stones
+        self._mark_dirty(delta.point, delta.captured)
+
+        for point, age in delta.captured_ages:
+            self.move_ages.set_age(point, age)
+        self.move_ages.reset_age(delta.point)
+        self.move_ages.decrement_all()
+        return delta
+
+    def _place_stone(self, player, point, delta):
         assert self.is_on_grid(point)
-        if self._grid.get(point) is not None:
+        grid = self._grid
+        if grid.get(point) is not None:
             print('Illegal play on %s' % str(point))
-        assert self._grid.get(point) is None
+        assert grid.get(point) is None
         # 0. Examine the adjacent points.
         adjacent_same_color = []
         adjacent_opposite_color = []
@@ -138,58 +238,157 @@ class Board():
         self.move_ages.increment_all()
         self.move_ages.add(point)
         for neighbor in self.neighbor_table[point]:
-            neighbor_string = self._grid.get(neighbor)
+            neighbor_string = grid.get(neighbor)
             if neighbor_string is None:
                 liberties.append(neighbor)
             elif neighbor_string.color == player:
-                if neighbor_string not in adjacent_same_color:
+                if not any(s is neighbor_string for s in adjacent_same_color):
                     adjacent_same_color.append(neighbor_string)
             else:
-                if neighbor_string not in adjacent_opposite_color:
+                if not any(s is neighbor_string for s in adjacent_opposite_color):
                     adjacent_opposite_color.append(neighbor_string)
-        new_string = GoString(player, [point], liberties)
+        edits = None if delta is None else delta.liberty_edits
 # tag::apply_zobrist[]
-        # 1. Merge any adjacent strings of the same color.
-        for same_color_string in adjacent_same_color:
-            new_string = new_string.merged_with(same_color_string)
-        for new_string_point in new_string.stones:
-            self._grid[new_string_point] = new_string
+        # 1. Merge any adjacent strings of the same color. The largest one
+        #    absorbs the new stone and the others, so the cost depends on the
+        #    size of the smaller strings, not on the size of the group.
+        if adjacent_same_color:
+            new_string = max(adjacent_same_color, key=lambda string: len(string.stones))
+            for same_color_string in adjacent_same_color:
+                if same_color_string is new_string:
+                    continue
+                new_string.stones |= same_color_string.stones
+                for stone in same_color_string.stones:
+                    grid[stone] = new_string
+                for liberty in same_color_string.liberties:
+                    self._add_liberty(new_string, liberty, edits)
+                if delta is not None:
+                    delta.merged.append(same_color_string)
+            new_string.stones.add(point)
+            for liberty in liberties:
+                self._add_liberty(new_string, liberty, edits)
+            self._remove_liberty(new_string, point, edits)
+        else:
+            new_string = GoString(player, [point], liberties)
+        grid[point] = new_string
+        if delta is not None:
+            delta.string = new_string
+        offset = zobrist_offset(point)
         # Remove empty-point hash code.
-        self._hash ^= zobrist.HASH_CODE[point, None]
+        self._hash ^= self._codes[offset + zobrist.EMPTY]
         # Add filled point hash code.
-        self._hash ^= zobrist.HASH_CODE[point, player]
+        self._hash ^= self._codes[offset + player.value]
+        self._symmetry_hashes ^= self._symmetry_codes[point][player.value]
 # end::apply_zobrist[]
 
         # 2. Reduce liberties of any adjacent strings of the opposite
         #    color.
         # 3. If any opposite color strings now have zero liberties,
         #    remove them.
+        captured = []
         for other_color_string in adjacent_opposite_color:
-            replacement = other_color_string.without_liberty(point)
-            if replacement.num_liberties:
-                self._replace_string(other_color_string.without_liberty(point))
-            else:
-                self._remove_string(other_color_string)
-
-    def _replace_string(self, new_string):
-        for point in new_string.stones:
-            self._grid[point] = new_string
-
-    def _remove_string(self, string):
+            self._remove_liberty(other_color_string, point, edits)
+            if not other_color_string.liberties:
+                self._remove_string(other_color_string, delta)
+                captured.append(other_color_string)
+        self._empty.discard(point)
+        self._mark_dirty(point, captured)
+
+    def _mark_dirty(self, point, captured):
+        """Mark every point whose legality may have changed after a stone
+        was placed on (or taken back from) point, capturing captured.
+
+        Whether a player may play on an empty point only depends on which
+        of its neighbors are empty and on which neighboring strings have
+        exactly one liberty. Neighbors only change around point and the
+        captured stones, and a string's one-liberty status can only flip
+        when it has at most two liberties afterwards or when stones next
+        to it were captured (or put back); all such points are liberties
+        of those strings.
+        """
+        dirty = self._dirty
+        grid = self._grid
+        neighbor_table = self.neighbor_table
+        dirty.add(point)
+        for neighbor in neighbor_table[point]:
+            dirty.add(neighbor)
+            string = grid.get(neighbor)
+            if string is not None and len(string.liberties) <= 2:
+                dirty.update(string.liberties)
+        for string in captured:
+            for stone in string.stones:
+                dirty.add(stone)
+                for neighbor in neighbor_table[stone]:
+                    dirty.add(neighbor)
+                    neighbor_string = grid.get(neighbor)
+                    if neighbor_string is not None:
+                        dirty.update(neighbor_string.liberties)
+
+    def legal_points(self, player):
+        """Return (legal, capturing): the set of empty points where player
+        may play, ignoring ko, and the subset of those that capture.
+
+        Only the points touched since the last call are re-examined. The
+        sets are owned by the board; don't modify them.
+        """
+        dirty = self._dirty
+        if dirty:
+            empty = self._empty
+            for color in (Player.black, Player.white):
+                legal = self._legal[color]
+                capturing = self._capturing[color]
+                for point in dirty:
+                    if point in empty and not self.is_self_capture(color, point):
+                        legal.add(point)
+                        if self.will_capture(color, point):
+                            capturing.add(point)
+                        else:
+                            capturing.discard(point)
+                    else:
+                        legal.discard(point)
+                        capturing.discard(point)
+            dirty.clear()
+        return self._legal[player], self._capturing[player]
+
+    @staticmethod
+    def _add_liberty(string, point, edits):
+        if point not in string.liberties:
+            string.liberties.add(point)
+            if edits is not None:
+                edits.append((string, point, True))
+
+    @staticmethod
+    def _remove_liberty(string, point, edits):
+        if point in string.liberties:
+            string.liberties.remove(point)
+            if edits is not None:
+                edits.append((string, point, False))
+
+    def _remove_string(self, string, delta=None):
+        grid = self._grid
+        edits = None
+        if delta is not None:
+            delta.captured.append(string)
+            edits = delta.liberty_edits
         for point in string.stones:
+            if delta is not None:
+                delta.captured_ages.append((point, self.move_ages.get(point.row - 1, point.col - 1)))
             self.move_ages.reset_age(point)
+            self._empty.add(point)
             # Removing a string can create liberties for other strings.
             for neighbor in self.neighbor_table[point]:
-                neighbor_string = self._grid.get(neighbor)
+                neighbor_string = grid.get(neighbor)
                 if neighbor_string is None:
                     continue
                 if neighbor_string is not string:
-                    self._replace_string(neighbor_string.with_liberty(point))
-            self._grid[point] = None
+                    self._add_liberty(neighbor_string, point, edits)
+            grid[point] = None
+            offset = zobrist_offset(point)
             # Remove filled point hash code.
-            self._hash ^= zobrist.HASH_CODE[point, string.color]
+            self._hash ^= self._codes[offset + string.color.value]
             # Add empty point hash code.
-            self._hash ^= zobrist.HASH_CODE[point, None]
+            self._hash ^= self._codes[offset + zobrist.EMPTY]
+            self._symmetry_hashes ^= self._symmetry_codes[point][string.color.value]
 
     def is_self_capture(self, player, point):
         friendly_strings = []
@@ -222,6 +421,30 @@ class Board():
                     return True
         return False
 
+    def hash_after(self, player, point):
+        """Return the zobrist hash the board would have after player plays
+        on point, without changing the board.
+
+        Any opponent string next to point with a single liberty is
+        captured, so its stones are XORed out along with the new stone
+        being XORed in.
+        """
+        codes = self._codes
+        offset = zobrist_offset(point)
+        new_hash = self._hash ^ codes[offset + zobrist.EMPTY] ^ codes[offset + player.value]
+        captured = []
+        for neighbor in self.neighbor_table[point]:
+            string = self._grid.get(neighbor)
+            if string is None or string.color == player or string.num_liberties != 1:
+                continue
+            if any(s is string for s in captured):
+                continue
+            captured.append(string)
+            for stone in string.stones:
+                offset = zobrist_offset(stone)
+                new_hash ^= codes[offset + string.color.value] ^ codes[offset + zobrist.EMPTY]
+        return new_hash
+
     def is_on_grid(self, point):
         return 1 <= point.row <= self.num_rows and \
             1 <= point.col <= self.num_cols
@@ -256,17 +479,56 @@ class Board():
 
     def __deepcopy__(self, memodict={}):
         copied = Board(self.num_rows, self.num_cols)
-        # Can do a shallow copy b/c the dictionary maps tuples
-        # (immutable) to GoStrings (also immutable)
-        copied._grid = copy.copy(self._grid)
+        # GoStrings are changed in place, so each one needs its own copy,
+        # shared by every stone of the string.
+        copied._grid = {}
+        string_copies = {}
+        for point, string in self._grid.items():
+            if string is not None:
+                string_copy = string_copies.get(id(string))
+                if string_copy is None:
+                    string_copy = string_copies[id(string)] = GoString(
+                        string.color, string.stones, string.liberties)
+                copied._grid[point] = string_copy
         copied._hash = self._hash
+        copied._symmetry_hashes = self._symmetry_hashes
+        copied.move_ages = copy.deepcopy(self.move_ages)
+        copied._empty = set(self._empty)
+        copied._legal = {player: set(points) for player, points in self._legal.items()}
+        copied._capturing = {player: set(points) for player, points in self._capturing.items()}
+        copied._dirty = set(self._dirty)
         return copied
 
+    def __getstate__(self):
+        # The neighbor/corner tables and zobrist codes are shared by every
+        # board of a size, so they are looked up again instead of pickled.
+        state = self.__dict__.copy()
+        del state['neighbor_table'], state['corner_table'], state['_codes'], state['_symmetry_codes']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        dim = (self.num_rows, self.num_cols)
+        if dim not in neighbor_tables:
+            init_neighbor_table(dim)
+        if dim not in corner_tables:
+            init_corner_table(dim)
+        self.neighbor_table = neighbor_tables[dim]
+        self.corner_table = corner_tables[dim]
+        self._codes = zobrist.table()
+        self._symmetry_codes = symmetry.zobrist_codes(self.num_rows, self.num_cols)
+
 # tag::return_zobrist[]
     def zobrist_hash(self):
         return self._hash
 # end::return_zobrist[]
 
+    def symmetry_hashes(self):
+        """The zobrist hashes of the board under all 8 symmetries, packed into one int (see
+        dlgo.symmetry.unpack_hashes). Symmetry 0, the identity, is zobrist_hash().
+        """
+        return self._symmetry_hashes
+
 
 class Move():
     """Any action a player can play on a turn.
@@ -319,17 +581,83 @@ class Move():
             other.point)
 
 
+class _HistorySegment():
+    """A run of consecutive situations shared by every SituationHistory
+    that ends inside it. first_index maps each situation to the first move
+    number it appears at, so membership is a single dict lookup.
+    """
+    __slots__ = ('parent', 'start', 'situations', 'first_index')
+
+    def __init__(self, parent, start):
+        self.parent = parent
+        self.start = start
+        self.situations = []
+        self.first_index = {}
+
+
+class SituationHistory():
+    """The (next_player, zobrist hash) situations of all earlier positions
+    in a game, used for the positional superko check.
+
+    Histories are persistent and share structure: extending a history
+    appends to its segment in place if nothing has been appended after it
+    yet, otherwise (a second move tried from the same position, as in a
+    search tree) it starts a new segment that points back at the shared
+    prefix. Each history is O(1) memory and extending one is O(1)
+    amortized, instead of a full frozenset copy per game state.
+    """
+    __slots__ = ('_segment', '_length')
+
+    def __init__(self, segment=None, length=0):
+        self._segment = segment
+        self._length = length
+
+    def with_situation(self, situation):
+        """Return a new history with situation appended."""
+        segment = self._segment
+        if segment is None or segment.start + len(segment.situations) != self._length:
+            segment = _HistorySegment(self if self._length else None, self._length)
+        segment.first_index.setdefault(situation, self._length)
+        segment.situations.append(situation)
+        return SituationHistory(segment, self._length + 1)
+
+    def __contains__(self, situation):
+        segment, length = self._segment, self._length
+        while segment is not None:
+            index = segment.first_index.get(situation)
+            if index is not None and index < length:
+                return True
+            if segment.parent is None:
+                return False
+            segment, length = segment.parent._segment, segment.parent._length
+        return False
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        """Situations from the start of the game to the most recent one."""
+        segments = []
+        segment, length = self._segment, self._length
+        while segment is not None:
+            segments.append((segment, length))
+            if segment.parent is None:
+                break
+            segment, length = segment.parent._segment, segment.parent._length
+        for segment, length in reversed(segments):
+            yield from segment.situations[:length - segment.start]
+
+
 class GameState():
     def __init__(self, board, next_player, previous, move):
         self.board = board
         self.next_player = next_player
         self.previous_state = previous
         if previous is None:
-            self.previous_states = frozenset()
+            self.previous_states = SituationHistory()
         else:
-            self.previous_states = frozenset(
-                previous.previous_states |
-                {(previous.next_player, previous.board.zobrist_hash())})
+            self.previous_states = previous.previous_states.with_situation(
+                (previous.next_player, previous.board.zobrist_hash()))
         self.last_move = move
 
     def apply_move(self, move):
@@ -339,7 +667,7 @@ class GameState():
             next_board.place_stone(self.next_player, move.point)
         else:
             next_board = self.board
-        return GameState(next_board, self.next_player.other, self, move)
+        return type(self)(next_board, self.next_player.other, self, move)
 
     @classmethod
     def new_game(cls, board_size):
@@ -362,9 +690,7 @@ class GameState():
             return False
         if not self.board.will_capture(player, move.point):
             return False
-        next_board = copy.deepcopy(self.board)
-        next_board.place_stone(player, move.point)
-        next_situation = (player.other, next_board.zobrist_hash())
+        next_situation = (player.other, self.board.hash_after(player, move.point))
         return next_situation in self.previous_states
 
     def is_valid_move(self, move):
@@ -388,12 +714,17 @@ class GameState():
         return self.last_move.is_pass and second_last_move.is_pass
 
     def legal_moves(self):
+        if self.is_over():
+            return [Move.pass_turn(), Move.resign()]
+        legal, capturing = self.board.legal_points(self.next_player)
         moves = []
-        for row in range(1, self.board.num_rows + 1):
-            for col in range(1, self.board.num_cols + 1):
-                move = Move.play(Point(row, col))
-                if self.is_valid_move(move):
-                    moves.append(move)
+        # In no particular order: sorting would cost O(board) on every call. Callers that need a fixed
+        # order sort the moves themselves.
+        for point in legal:
+            move = Move.play(point)
+            if point in capturing and self.does_move_violate_ko(self.next_player, move):
+                continue
+            moves.append(move)
         # These two moves are always legal.
         moves.append(Move.pass_turn())
         moves.append(Move.resign())
@@ -1,3 +1,4 @@
 from .alphabeta import *
 from .depthprune import *
-from .minimax import *
\ No newline at end of file
+from .minimax import *
+from .tttsolver import *
@@ -0,0 +1,248 @@
+import time
+from collections import namedtuple
+
+from dlgo.agent.base import Agent
+from dlgo.gotypes import Point
+from dlgo.transposition import TranspositionTable
+
+"""
+Alpha-beta search (negamax form) with iterative deepening, for any game state with the usual interface
+(next_player, legal_moves(), apply_move(), is_over(), winner() and board.zobrist_hash()): tic-tac-toe and
+the Go engines.
+
+- Depth 1, 2, 3, ... are searched in turn until max_depth, the node budget or the time limit is reached. The
+  move from the deepest finished iteration is played; an iteration cut short by the budget is thrown away.
+- Every searched position goes in a transposition table with its score, whether the score is exact or only a
+  bound, its best move, the depth it was searched to and whether that search stopped at the depth limit
+  anywhere. The table saves re-searching transpositions, and its best move is tried first when the position
+  comes up again in the next, deeper iteration. After it come captures (on Go boards), then the rest in
+  legal_moves() order.
+- Positions at the depth limit are scored by eval_fn(game_state), from the point of view of the player to
+  move. Finished games are scored by their winner, so a quick win beats a slow one.
+- A win or loss score counts plies from the root, but the table stores it counted from the position itself
+  (_to_table / _from_table), so a transposition reached at a different ply gets the right distance to the end.
+- The table key is (next_player, whether the last move was a pass) and the board hash: the same board with and
+  without a pending pass are different positions, since passing back ends the game.
+"""
+
+__all__ = [
+    'AlphaBetaAgent',
+    'AlphaBetaStats',
+    'capture_diff',
+]
+
+MAX_SCORE = 1000000
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Scores beyond this are wins or losses, MAX_SCORE minus the number of plies to the end of the game.
+WIN_SCORE = MAX_SCORE // 2
+
+
+def capture_diff(game_state):
+    """Stones of the player to move minus stones of the opponent (Go boards)."""
+    board = game_state.board
+    own_stones = 0
+    other_stones = 0
+    for r in range(1, board.num_rows + 1):
+        for c in range(1, board.num_cols + 1):
+            color = board.get(Point(r, c))
+            if color is None:
+                continue
+            if color == game_state.next_player:
+                own_stones += 1
+            else:
+                other_stones += 1
+    return own_stones - other_stones
+
+
+class AlphaBetaStats(namedtuple('AlphaBetaStats', 'depth nodes seconds score')):
+    """What the last select_move() did. depth is the deepest finished iteration, nodes counts every position
+    visited in all iterations (including the unfinished one).
+    """
+    @property
+    def effective_branching_factor(self):
+        """b such that a uniform tree of this depth with b children per node has as many nodes."""
+        if self.depth == 0:
+            return 0.0
+        return self.nodes ** (1.0 / self.depth)
+
+    def __str__(self):
+        return 'depth %d, %d nodes in %.3fs (%.0f nodes/sec), EBF %.2f, score %d' % (
+            self.depth, self.nodes, self.seconds, self.nodes / self.seconds if self.seconds else 0.0,
+            self.effective_branching_factor, self.score)
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+def _same_move(a, b):
+    return a.point == b.point and a.is_pass == b.is_pass and a.is_resign == b.is_resign
+
+
+def _table_key(game_state):
+    """(player, zobrist_hash) for the transposition table, with the player
+    side also saying whether the opponent just passed.
+    """
+    last_move = game_state.last_move
+    passed = last_move is not None and last_move.is_pass
+    return (game_state.next_player, passed), game_state.board.zobrist_hash()
+
+
+def _to_table(score, ply):
+    """A score counted from the root, as stored: a win or loss counted from the position at ply."""
+    if score > WIN_SCORE:
+        return score + ply
+    if score < -WIN_SCORE:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply):
+    """The inverse of _to_table."""
+    if score > WIN_SCORE:
+        return score - ply
+    if score < -WIN_SCORE:
+        return score + ply
+    return score
+
+
+class AlphaBetaAgent(Agent):
+    """Iterative deepening alpha-beta. Give at least one of max_depth,
+    max_nodes and time_limit (seconds) unless the game is small enough to
+    search to the end. eval_fn defaults to 0 for every unfinished position;
+    use capture_diff or your own for Go.
+    """
+    def __init__(self, max_depth=None, eval_fn=None, max_nodes=None, time_limit=None, table=None, verbose=False):
+        Agent.__init__(self)
+        self.max_depth = max_depth
+        self.eval_fn = eval_fn if eval_fn is not None else (lambda game_state: 0)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.table = table if table is not None else TranspositionTable(1 << 18)
+        self.verbose = verbose
+        self.stats = None
+
+    def select_move(self, game_state):
+        self._start = time.perf_counter()
+        self._nodes = 0
+        self.table.new_search()
+        best_move = None
+        best_score = 0
+        depth = 0
+        while self.max_depth is None or depth < self.max_depth:
+            self._reached_horizon = False
+            try:
+                score, move = self._search_root(game_state, depth + 1)
+            except _OutOfBudget:
+                break
+            depth += 1
+            best_score, best_move = score, move
+            if not self._reached_horizon or abs(score) > WIN_SCORE:
+                # Every line ended the game, or a forced result was found: deeper won't change anything.
+                break
+
+        self.stats = AlphaBetaStats(depth, self._nodes, time.perf_counter() - self._start, best_score)
+        if self.verbose:
+            print(self.stats)
+        if best_move is None:
+            # Not even depth 1 finished: play the first candidate.
+            best_move = self._ordered_moves(game_state, None)[0]
+        return best_move
+
+    def _search_root(self, game_state, depth):
+        best_move = None
+        best_score = -MAX_SCORE - 1
+        alpha = -MAX_SCORE - 1
+        beta = MAX_SCORE + 1
+        for move in self._ordered_moves(game_state, self._table_move(game_state)):
+            score = -self._negamax(game_state.apply_move(move), depth - 1, -beta, -alpha, 1)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        # At the root, ply 0, root- and node-relative scores are the same.
+        self.table.put(*_table_key(game_state), (best_score, EXACT, best_move, depth, self._reached_horizon), depth)
+        return best_score, best_move
+
+    def _negamax(self, game_state, depth, alpha, beta, ply):
+        self._nodes += 1
+        if self.max_nodes is not None and self._nodes > self.max_nodes:
+            raise _OutOfBudget()
+        if self.time_limit is not None and self._nodes % 64 == 0 and \
+                time.perf_counter() - self._start > self.time_limit:
+            raise _OutOfBudget()
+
+        if game_state.is_over():
+            winner = game_state.winner()
+            if winner is None:
+                return 0
+            return MAX_SCORE - ply if winner == game_state.next_player else -(MAX_SCORE - ply)
+        if depth == 0:
+            self._reached_horizon = True
+            return self.eval_fn(game_state)
+
+        key = _table_key(game_state)
+        table_move = None
+        entry = self.table.get(*key)
+        if entry is not None:
+            table_score, bound, table_move, table_depth, table_horizon = entry
+            table_score = _from_table(table_score, ply)
+            if table_depth >= depth:
+                # If that search stopped at the depth limit somewhere, so does this one.
+                self._reached_horizon = self._reached_horizon or table_horizon
+                if bound == EXACT:
+                    return table_score
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, table_score)
+                else:
+                    beta = min(beta, table_score)
+                if alpha >= beta:
+                    return table_score
+
+        original_alpha = alpha
+        outer_horizon = self._reached_horizon
+        self._reached_horizon = False
+        best_score = -MAX_SCORE - 1
+        best_move = None
+        for move in self._ordered_moves(game_state, table_move):
+            score = -self._negamax(game_state.apply_move(move), depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.put(
+            *key, (_to_table(best_score, ply), bound, best_move, depth, self._reached_horizon), depth)
+        self._reached_horizon = self._reached_horizon or outer_horizon
+        return best_score
+
+    def _table_move(self, game_state):
+        entry = self.table.get(*_table_key(game_state))
+        return entry[2] if entry is not None else None
+
+    def _ordered_moves(self, game_state, first_move):
+        """The table's best move, then captures, then everything else. Resigning is never searched."""
+        board = game_state.board
+        player = game_state.next_player
+        will_capture = getattr(board, 'will_capture', None)
+        first = []
+        captures = []
+        others = []
+        for move in game_state.legal_moves():
+            if move.is_resign:
+                continue
+            if first_move is not None and _same_move(move, first_move):
+                first.append(move)
+            elif will_capture is not None and move.is_play and will_capture(player, move.point):
+                captures.append(move)
+            else:
+                others.append(move)
+        return first + captures + others
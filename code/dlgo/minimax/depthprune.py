@@ -0,0 +1,163 @@
+import random
+import time
+
+from dlgo.agent.base import Agent
+from dlgo.agent.helpers import is_point_an_eye
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player, Point
+from dlgo.minimax.alphabeta import MAX_SCORE
+from dlgo.scoring import evaluate_territory
+from dlgo.search import search_position
+from dlgo.transposition import TranspositionTable
+
+"""
+Depth-pruned minimax for Go: search every line max_depth moves deep and score the positions there with an
+evaluation function, instead of playing to the end of the game.
+
+The search runs on one copy of the board with play()/undo() (see dlgo.search for the boards that have them),
+and every evaluation is memoized in a TranspositionTable keyed by (player to move, zobrist hash), so a position
+reached again, by a different move order or in the search for a later move, isn't evaluated twice. Candidate moves
+are the legal points that don't fill one of the mover's own eyes; ko is checked against the game history
+and the line being searched.
+
+Evaluation functions take (board, player) and score the board from player's point of view.
+"""
+
+__all__ = [
+    'DepthPrunedAgent',
+    'capture_diff_eval',
+    'territory_eval',
+]
+
+_points = {}
+
+
+def _board_points(board):
+    dim = (board.num_rows, board.num_cols)
+    if dim not in _points:
+        _points[dim] = [Point(r, c) for r in range(1, dim[0] + 1) for c in range(1, dim[1] + 1)]
+    return _points[dim]
+
+
+def capture_diff_eval(board, player):
+    """Stones of player minus stones of the opponent."""
+    own_stones = 0
+    other_stones = 0
+    for color in map(board.get, _board_points(board)):
+        if color is None:
+            continue
+        if color == player:
+            own_stones += 1
+        else:
+            other_stones += 1
+    return own_stones - other_stones
+
+
+def territory_eval(board, player):
+    """Area (stones plus surrounded empty points) of player minus that of
+    the opponent, adjusted for strings in atari: an opponent string in atari
+    is as good as captured, since player moves next; one of player's own in
+    atari counts half against player.
+    """
+    territory = evaluate_territory(board)
+    black_area = territory.num_black_territory + territory.num_black_stones
+    white_area = territory.num_white_territory + territory.num_white_stones
+    score = black_area - white_area if player == Player.black else white_area - black_area
+
+    # By point, not by string object: only goboard_fast hands out the same object for every stone of a string.
+    seen = set()
+    for point in _board_points(board):
+        if point in seen:
+            continue
+        string = board.get_go_string(point)
+        if string is None:
+            continue
+        seen.update(string.stones)
+        if string.num_liberties == 1:
+            if string.color == player:
+                score -= len(string.stones) / 2
+            else:
+                score += 2 * len(string.stones)
+    return score
+
+
+class DepthPrunedAgent(Agent):
+    """Minimax to max_depth moves, scoring with eval_fn(board, player)."""
+    def __init__(self, max_depth=2, eval_fn=territory_eval, table=None, verbose=False):
+        Agent.__init__(self)
+        self.max_depth = max_depth
+        self.eval_fn = eval_fn
+        self.table = table if table is not None else TranspositionTable(1 << 16)
+        self.verbose = verbose
+        self.num_nodes = 0
+
+    def select_move(self, game_state):
+        start = time.perf_counter()
+        board, player, self._history, _ = search_position(game_state)
+        self._board = board
+        self._situations = set()
+        self.num_nodes = 0
+
+        best_points = []
+        best_score = -MAX_SCORE
+        for point in self._candidates(player):
+            self._play(player, point)
+            score = -self._best_result(player.other, self.max_depth - 1)
+            self._undo(player)
+            if score > best_score:
+                best_points = [point]
+                best_score = score
+            elif score == best_score:
+                best_points.append(point)
+
+        if self.verbose:
+            print('%d nodes in %.3fs, best score %s; evaluations: %s' % (
+                self.num_nodes, time.perf_counter() - start, best_score, self.table))
+        if not best_points:
+            return Move.pass_turn()
+        return Move.play(random.choice(best_points))
+
+    def _best_result(self, player, depth):
+        self.num_nodes += 1
+        if depth == 0:
+            return self._evaluate(player)
+        best_so_far = -MAX_SCORE
+        for point in self._candidates(player):
+            self._play(player, point)
+            best_so_far = max(best_so_far, -self._best_result(player.other, depth - 1))
+            self._undo(player)
+        if best_so_far == -MAX_SCORE:
+            # Nothing worth playing: player passes, so score the position as it is.
+            return self._evaluate(player)
+        return best_so_far
+
+    def _evaluate(self, player):
+        zobrist_hash = self._board.zobrist_hash()
+        score = self.table.get(player, zobrist_hash)
+        if score is None:
+            score = self.eval_fn(self._board, player)
+            self.table.put(player, zobrist_hash, score)
+        return score
+
+    def _candidates(self, player):
+        board = self._board
+        legal, capturing = board.legal_points(player)
+        candidates = []
+        for point in sorted(legal):
+            if is_point_an_eye(board, point, player):
+                continue
+            if point in capturing:
+                next_situation = (player.other, board.hash_after(player, point))
+                if next_situation in self._situations or next_situation in self._history:
+                    continue
+            candidates.append(point)
+        return candidates
+
+    def _play(self, player, point):
+        self._board.play(player, point)
+        self._situations.add((player.other, self._board.zobrist_hash()))
+
+    def _undo(self, player):
+        """Take back player's last _play()."""
+        self._situations.discard((player.other, self._board.zobrist_hash()))
+        self._board.undo()
@@ -1,8 +1,16 @@
 import enum
-import agent
-from ttt import *  # GameState, Move
 import random
 
+from dlgo.agent.base import Agent
+from dlgo.transposition import TranspositionTable
+
+__all__ = [
+    'GameResult',
+    'MinimaxAgent',
+    'best_result',
+    'reverse_game_outcome',
+]
+
 
 class GameResult(enum.Enum):
     loss = 1
@@ -10,15 +18,29 @@ class GameResult(enum.Enum):
     win = 3
 
 
-class MinimaxAgent(agent.Agent):
+class MinimaxAgent(Agent):
+    """Searches the whole game tree, so only for small games like tic-tac-toe.
 
-    def select_move(self, game_state: GameState) -> Move:
+    Results are kept in a transposition table, so a position reached by
+    different move orders is only searched once; the table is kept between
+    moves. With a solver (e.g. a tttsolver.TicTacToeSolver), results are
+    looked up in it instead of searched.
+    """
+    def __init__(self, table=None, solver=None):
+        Agent.__init__(self)
+        self.table = table if table is not None else TranspositionTable(1 << 16)
+        self.solver = solver
+
+    def select_move(self, game_state):
         winning_moves = []
         draw_moves = []
         losing_moves = []
         for possible_move in game_state.legal_moves():
             next_state = game_state.apply_move(possible_move)
-            opponent_best_outcome = best_result(next_state)
+            if self.solver is not None:
+                opponent_best_outcome = self.solver.best_result(next_state)
+            else:
+                opponent_best_outcome = best_result(next_state, self.table)
             our_best_outcome = reverse_game_outcome(opponent_best_outcome)
             if our_best_outcome == GameResult.win:
                 winning_moves.append(possible_move)
@@ -34,20 +56,44 @@ class MinimaxAgent(agent.Agent):
             return random.choice(losing_moves)
 
 
-def best_result(game_state: GameState) -> GameResult:
+def best_result(game_state, table=None):
+    """The best result the player to move can force. table, a
+    TranspositionTable, remembers the results of positions already searched.
+    """
     if game_state.is_over():
-        # this code generalizes to other games. 
-        # in tic-tac-toe if the game_state.is_over() and you played and won on the previous move, 
+        # this code generalizes to other games.
+        # in tic-tac-toe if the game_state.is_over() and you played and won on the previous move,
         # then game_state.next_player will be always be the other player
         # so only the last condition will ever activate
         # in other games, if opponent resigns, then it will be your move and you are the winner
         if game_state.winner() == game_state.next_player:
-            return GameResult.win 
+            return GameResult.win
         elif game_state.winner() == None:
             return GameResult.draw
         else:
             return GameResult.loss
 
+    if table is not None:
+        zobrist_hash = game_state.board.zobrist_hash()
+        cached = table.get(game_state.next_player, zobrist_hash)
+        if cached is not None:
+            return cached
+
+    best_result_so_far = GameResult.loss
+    for candidate_move in game_state.legal_moves():
+        next_state = game_state.apply_move(candidate_move)
+        opponent_best_result = best_result(next_state, table)
+        our_result = reverse_game_outcome(opponent_best_result)
+        if our_result.value > best_result_so_far.value:
+            best_result_so_far = our_result
+            if best_result_so_far == GameResult.win:
+                # Nothing beats a win.
+                break
+
+    if table is not None:
+        table.put(game_state.next_player, zobrist_hash, best_result_so_far)
+    return best_result_so_far
+
 
 def reverse_game_outcome(game_result: GameResult) -> GameResult:
     assert game_result is not None
@@ -55,4 +101,4 @@ def reverse_game_outcome(game_result: GameResult) -> GameResult:
         return GameResult.loss
     if game_result == GameResult.loss:
         return GameResult.win
-    return GameResult.draw
\ No newline at end of file
+    return GameResult.draw
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+
+from dlgo.minimax.minimax import GameResult
+from dlgo.ttt import Player, Point
+
+"""
+Tic-tac-toe solved once, up front, so that MinimaxAgent can look results up instead of searching.
+
+A board is encoded as a base 3 number with one digit per square (0 empty, 1 x, 2 o), and the 8 rotations and
+reflections of a board share an entry under the smallest of their 8 encodings. Whose move it is follows from
+the number of pieces, so the encoding alone is the key. The solver searches every position reachable from
+the empty board once (765 of them after folding the symmetries) and stores the result for the player to move.
+
+    solver = TicTacToeSolver.load_or_solve('ttt_solved.json')
+    bot = MinimaxAgent(solver=solver)
+"""
+
+__all__ = [
+    'TicTacToeSolver',
+]
+
+SIZE = 3
+POINTS = [Point(row, col) for row in range(1, SIZE + 1) for col in range(1, SIZE + 1)]
+POWERS = [3 ** i for i in range(SIZE * SIZE)]
+PLAYER_TO_CELL = {None: 0, Player.x: 1, Player.o: 2}
+LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
+    (0, 4, 8), (2, 4, 6),  # diagonals
+]
+
+
+def _symmetries():
+    """For each of the 8 symmetries, the square each square's content comes from."""
+    def index(row, col):
+        return row * SIZE + col
+    last = SIZE - 1
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c),
+        lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c),
+        lambda r, c: (c, r),
+        lambda r, c: (last - r, c),
+        lambda r, c: (last - c, last - r),
+    ]
+    return [
+        [index(*transform(r, c)) for r in range(SIZE) for c in range(SIZE)]
+        for transform in transforms]
+
+
+SYMMETRIES = _symmetries()
+
+
+def canonical_key(cells):
+    """The smallest encoding of cells under the 8 symmetries."""
+    return min(
+        sum(cells[source] * power for source, power in zip(symmetry, POWERS))
+        for symmetry in SYMMETRIES)
+
+
+def _has_line(cells, cell):
+    return any(cells[a] == cell and cells[b] == cell and cells[c] == cell for a, b, c in LINES)
+
+
+class TicTacToeSolver:
+    def __init__(self, results=None):
+        # canonical key -> GameResult value for the player to move
+        self.results = results if results is not None else {}
+        self.solve_seconds = None
+
+    @classmethod
+    def solved(cls):
+        solver = cls()
+        start = time.perf_counter()
+        solver._solve([0] * (SIZE * SIZE), 1)
+        solver.solve_seconds = time.perf_counter() - start
+        return solver
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls({int(key): value for key, value in data['results'].items()})
+
+    @classmethod
+    def load_or_solve(cls, path):
+        """Load the table from path, or solve the game and save it there."""
+        if os.path.exists(path):
+            return cls.load(path)
+        solver = cls.solved()
+        solver.save(path)
+        return solver
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'results': {str(key): value for key, value in self.results.items()}}, f)
+
+    def _solve(self, cells, cell):
+        """Result for the player with pieces `cell` to move on cells."""
+        key = canonical_key(cells)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        other = 3 - cell
+        if _has_line(cells, other):
+            # The player who just moved won.
+            result = GameResult.loss.value
+        elif 0 not in cells:
+            result = GameResult.draw.value
+        else:
+            result = GameResult.loss.value
+            for i in range(SIZE * SIZE):
+                if cells[i] != 0:
+                    continue
+                cells[i] = cell
+                opponent_result = self._solve(cells, other)
+                cells[i] = 0
+                # Results are 1, 2, 3 for loss, draw, win, so the opponent's result mirrors to 4 - it.
+                # No cut off after a win: every reachable position has to end up in the table.
+                result = max(result, 4 - opponent_result)
+        self.results[key] = result
+        return result
+
+    def __len__(self):
+        return len(self.results)
+
+    def best_result(self, game_state):
+        """The result the player to move can force, looked up in O(1)."""
+        cells = [PLAYER_TO_CELL[game_state.board.get(point)] for point in POINTS]
+        return GameResult(self.results[canonical_key(cells)])
@@ -0,0 +1,296 @@
+import math
+import mmap
+import numbers
+import os
+import struct
+
+import numpy as np
+
+from dlgo import goboard_fast, sgf
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player, Point
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends still go out in one write() each, just without the lock.
+    fcntl = None
+
+"""
+A binary file of game records, for reading training data without parsing text.
+
+Layout (little endian):
+
+- File header, 16 bytes: the magic b'DLGOREC1', format version (uint16), board size (uint16), bytes per
+  move (uint8: 1 up to 15x15, else 2) and 3 bytes of padding.
+- Then any number of chunks, each one written in a single append:
+  - chunk header, 16 bytes: b'CHNK', number of games (uint32), size of the rest of the chunk (uint64)
+  - the chunk's index: one 20 byte entry per game, GAME_DTYPE: where the game's moves start (from the start
+    of the chunk's moves), number of moves (uint32), komi (float32) and result (float32)
+  - the moves of every game, one after the other, one uint8 or uint16 per move: point (r - 1) * N + (c - 1),
+    N * N for a pass, N * N + 1 for a resignation.
+
+A result is black's score minus white's (komi included), +inf for B+R, -inf for W+R, 0 for a draw and nan
+if unknown. Moves alternate strictly, black first. Setup stones from SGF (handicap) go in as moves of their
+color with passes between, so replaying the record gives the same position.
+
+Because every chunk carries its own index and goes out in one locked append, any number of processes can add
+to the same file at once (each RecordWriter buffers chunk_size games per chunk). RecordReader memory-maps
+the file, walks the chunk headers once to put all the indexes into NumPy arrays, and from then on finds game
+i or its first k moves in O(1), as a zero-copy view of the file. position(i, k) still replays those k moves
+to make a GameState.
+
+    with RecordWriter('games.bin', 19) as writer:
+        writer.add(moves, komi=7.5, result='W+2.5')
+    reader = RecordReader('games.bin')
+    game_state = reader.position(123, 50)
+"""
+
+__all__ = [
+    'RecordReader',
+    'RecordWriter',
+    'convert_sgf',
+    'format_result',
+    'parse_result',
+]
+
+MAGIC = b'DLGOREC1'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sHHB3x')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIQ')
+GAME_DTYPE = np.dtype([('offset', '<u8'), ('num_moves', '<u4'), ('komi', '<f4'), ('result', '<f4')])
+
+
+def _move_dtype(board_size):
+    return np.dtype('<u1') if board_size * board_size + 2 <= 256 else np.dtype('<u2')
+
+
+def parse_result(result):
+    """The float result of an SGF style result string ('B+3.5', 'W+R', ...; None or '?' if unknown)."""
+    if result is None or result == '' or result == '?':
+        return math.nan
+    if result in ('0', 'Draw', 'D'):
+        return 0.0
+    winner, _, margin = result.partition('+')
+    sign = 1.0 if winner.upper() == 'B' else -1.0 if winner.upper() == 'W' else math.nan
+    if margin[:1].upper() in ('R', 'T', 'F'):
+        return sign * math.inf
+    try:
+        return sign * float(margin)
+    except ValueError:
+        return math.nan
+
+
+def format_result(value):
+    """The result string of a float result."""
+    if math.isnan(value):
+        return '?'
+    if value == 0:
+        return '0'
+    winner = 'B' if value > 0 else 'W'
+    if math.isinf(value):
+        return winner + '+R'
+    return '%s+%.1f' % (winner, abs(value))
+
+
+class RecordWriter:
+    """Appends games to path (made if it doesn't exist yet), chunk_size games per append."""
+    def __init__(self, path, board_size, chunk_size=256):
+        self.path = path
+        self.board_size = board_size
+        self.chunk_size = chunk_size
+        self._move_dtype = _move_dtype(board_size)
+        self._pass = board_size * board_size
+        self._resign = self._pass + 1
+        self._games = []
+        self._moves = []
+        self._num_buffered_moves = 0
+        self.num_games = 0
+
+    def add(self, moves, komi=7.5, result=None):
+        """Add a game: goboard_fast Moves, black first and alternating. result is a number (see above; 0 is
+        a draw), a result string, or None if unknown.
+        """
+        size = self.board_size
+        indices = np.array([
+            (move.point.row - 1) * size + move.point.col - 1 if move.is_play else
+            self._pass if move.is_pass else self._resign
+            for move in moves], dtype=self._move_dtype)
+        if isinstance(result, numbers.Real):
+            result = float(result)
+        else:
+            result = parse_result(result)
+        self._games.append((self._num_buffered_moves * self._move_dtype.itemsize, len(indices), komi, result))
+        self._moves.append(indices)
+        self._num_buffered_moves += len(indices)
+        self.num_games += 1
+        if len(self._games) >= self.chunk_size:
+            self.flush()
+
+    def add_record(self, record, komi=7.5):
+        """Add a selfplay.GameRecord."""
+        self.add(record.moves, komi, record.result_string)
+
+    def flush(self):
+        """Append the buffered games to the file as one chunk."""
+        if not self._games:
+            return
+        index = np.array(self._games, dtype=GAME_DTYPE)
+        moves = np.concatenate(self._moves) if self._moves else np.zeros(0, self._move_dtype)
+        body = index.tobytes() + moves.tobytes()
+        chunk = CHUNK_HEADER.pack(CHUNK_MAGIC, len(index), len(body)) + body
+
+        with open(self.path, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Under the lock, so only the first writer of a new file writes the header.
+                if os.fstat(f.fileno()).st_size == 0:
+                    f.write(FILE_HEADER.pack(MAGIC, VERSION, self.board_size, self._move_dtype.itemsize))
+                else:
+                    _check_header(self.path, self.board_size)
+                f.write(chunk)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        self._games = []
+        self._moves = []
+        self._num_buffered_moves = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(path, board_size=None):
+    with open(path, 'rb') as f:
+        header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError('%s: not a game record file' % path)
+    magic, version, size, move_bytes = FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('%s: not a game record file' % path)
+    if version != VERSION:
+        raise ValueError('%s: game record file version %d, this reader only reads version %d' % (
+            path, version, VERSION))
+    if board_size is not None and size != board_size:
+        raise ValueError('%s holds %dx%d games, not %dx%d' % (path, size, size, board_size, board_size))
+    return size, move_bytes
+
+
+class RecordReader:
+    """The games in a record file, by index. Chunks appended after opening show up after reload()."""
+    def __init__(self, path):
+        self.path = path
+        self.board_size, move_bytes = _check_header(path)
+        self._move_dtype = np.dtype('<u1') if move_bytes == 1 else np.dtype('<u2')
+        size = self.board_size
+        points = [Point(row=r, col=c) for r in range(1, size + 1) for c in range(1, size + 1)]
+        self._move_table = [Move.play(point) for point in points] + [Move.pass_turn(), Move.resign()]
+        self._file = None
+        self._map = None
+        self.reload()
+
+    def reload(self):
+        """Map the file again and read the index of every complete chunk."""
+        self.close()
+        self._file = open(self.path, 'rb')
+        file_size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), file_size, access=mmap.ACCESS_READ)
+        indexes = []
+        starts = []
+        pos = FILE_HEADER.size
+        while pos + CHUNK_HEADER.size <= file_size:
+            magic, num_games, body_size = CHUNK_HEADER.unpack_from(self._map, pos)
+            if magic != CHUNK_MAGIC:
+                raise ValueError('%s: bad chunk at byte %d' % (self.path, pos))
+            body = pos + CHUNK_HEADER.size
+            if body + body_size > file_size:
+                # A chunk still being written (or cut short): leave it out.
+                break
+            indexes.append(np.frombuffer(self._map, GAME_DTYPE, num_games, body))
+            starts.append(np.full(num_games, body + num_games * GAME_DTYPE.itemsize, dtype=np.int64))
+            pos = body + body_size
+        index = np.concatenate(indexes) if indexes else np.zeros(0, GAME_DTYPE)
+        # Flat arrays, copied out of the map, so that looking a game up is a couple of array reads.
+        self.offsets = (np.concatenate(starts) if starts else np.zeros(0, np.int64)) + index['offset'].astype(np.int64)
+        self.num_moves = index['num_moves'].astype(np.int64)
+        self.komis = index['komi'].astype(np.float64)
+        self.results = index['result'].astype(np.float64)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def move_indices(self, i, num_moves=None):
+        """The first num_moves (default: all) moves of game i as packed move indices, a view of the file."""
+        count = int(self.num_moves[i])
+        if num_moves is not None:
+            count = min(count, num_moves)
+        return np.frombuffer(self._map, self._move_dtype, count, int(self.offsets[i]))
+
+    def moves(self, i, num_moves=None):
+        """The first num_moves (default: all) moves of game i as goboard_fast Moves."""
+        table = self._move_table
+        return [table[m] for m in self.move_indices(i, num_moves).tolist()]
+
+    def result(self, i):
+        return format_result(self.results[i])
+
+    def komi(self, i):
+        return float(self.komis[i])
+
+    def position(self, i, k):
+        """The goboard_fast GameState after the first k moves of game i."""
+        game_state = goboard_fast.GameState.new_game(self.board_size)
+        for move in self.moves(i, k):
+            game_state = game_state.apply_move(move)
+        return game_state
+
+    def close(self):
+        """Unmap the file. Arrays from move_indices() are views of the map and have to be gone by then."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _sgf_moves(game):
+    """The moves of an SGFGame, strictly alternating from black: setup stones first, then the main line, with
+    passes wherever a color moves twice in a row.
+    """
+    moves = []
+    next_player = Player.black
+    for player, move in [(player, Move.play(point)) for player, point in game.setup_stones()] + \
+            game.goboard_moves():
+        if player != next_player:
+            moves.append(Move.pass_turn())
+            next_player = next_player.other
+        moves.append(move)
+        next_player = next_player.other
+    return moves
+
+
+def convert_sgf(source, path, board_size=19, chunk_size=256):
+    """Append every board_size game in source (anything sgf.iter_games takes) to the record file at path.
+    Returns (games written, games skipped for another board size).
+    """
+    skipped = 0
+    with RecordWriter(path, board_size, chunk_size) as writer:
+        for game in sgf.iter_games(source):
+            if game.board_size != board_size:
+                skipped += 1
+                continue
+            writer.add(_sgf_moves(game), game.komi, game.result)
+    return writer.num_games, skipped
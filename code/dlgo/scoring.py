@@ -2,6 +2,8 @@
 from __future__ import absolute_import
 from collections import namedtuple
 
+import numpy as np
+
 from dlgo.gotypes import Player, Point
 # end::scoring_imports[]
 
@@ -28,6 +30,18 @@ class Territory:
                 self.num_dame += 1
                 self.dame_points.append(point)
 
+    @classmethod
+    def from_counts(cls, num_black_territory, num_white_territory,
+                    num_black_stones, num_white_stones, dame_points):
+        territory = cls({})
+        territory.num_black_territory = num_black_territory
+        territory.num_white_territory = num_white_territory
+        territory.num_black_stones = num_black_stones
+        territory.num_white_stones = num_white_stones
+        territory.num_dame = len(dame_points)
+        territory.dame_points = dame_points
+        return territory
+
 # <1> A `territory_map` splits the board into stones, territory and neutral points (dame).
 # <2> Depending on the status of a point, we increment the respective counter.
 # end::scoring_territory[]
@@ -60,79 +74,107 @@ Map a board into territory and dame.
 Any points that are completely surrounded by a single color are
 counted as territory; it makes no attempt to identify even
 trivially dead groups.
+
+The board is copied into a flat NumPy array with a border around it, so
+every point on the board has its four neighbors at fixed offsets. The
+empty points are split into regions in a single labeling pass, and the
+colors touching each region are then worked out for all regions at once.
 """
 
+EMPTY, BLACK, WHITE, OFF_BOARD = 0, 1, 2, 3
 
-# tag::scoring_evaluate_territory[]
-def evaluate_territory(board):
 
-    status = {}
-    for r in range(1, board.num_rows + 1):
-        for c in range(1, board.num_cols + 1):
-            p = Point(row=r, col=c)
-            if p in status:  # <1>
-                continue
-            stone = board.get(p)
-            if stone is not None:  # <2>
-                status[p] = board.get(p)
-            else:
-                group, neighbors = _collect_region(p, board)
-                if len(neighbors) == 1:  # <3>
-                    neighbor_stone = neighbors.pop()
-                    stone_str = 'b' if neighbor_stone == Player.black else 'w'
-                    fill_with = 'territory_' + stone_str
-                else:
-                    fill_with = 'dame'  # <4>
-                for pos in group:
-                    status[pos] = fill_with
-    return Territory(status)
-
-# <1> Skip the point, if you already visited this as part of a different group.
-# <2> If the point is a stone, add it as status.
-# <3> If a point is completely surrounded by black or white stones, count it as territory.
-# <4> Otherwise the point has to be a neutral point, so we add it to dame.
-# end::scoring_evaluate_territory[]
+class _ScoringTable:
+    """Points and the padded array layout shared by every board of one size."""
+    def __init__(self, num_rows, num_cols):
+        stride = num_cols + 2
+        self.points = [Point(row=r, col=c) for r in range(1, num_rows + 1) for c in range(1, num_cols + 1)]
+        self.indices = np.array([point.row * stride + point.col for point in self.points])
+        self.offsets = np.array([-stride, -1, 1, stride])
+        self.point_at = dict(zip(self.indices.tolist(), self.points))
+        self.template = np.full((num_rows + 2) * stride, OFF_BOARD, dtype=np.int8)
 
 
-""" _collect_region:
+_scoring_tables = {}
+
+
+def _get_scoring_table(num_rows, num_cols):
+    if (num_rows, num_cols) not in _scoring_tables:
+        _scoring_tables[num_rows, num_cols] = _ScoringTable(num_rows, num_cols)
+    return _scoring_tables[num_rows, num_cols]
 
-Find the contiguous section of a board containing a point. Also
-identify all the boundary points.
-"""
 
+def _label_regions(empty, neighbors, size):
+    """Label every empty point with the smallest index in its region.
 
-# tag::scoring_collect_region[]
-def _collect_region(start_pos, board, visited=None):
-
-    if visited is None:
-        visited = {}
-    if start_pos in visited:
-        return [], set()
-    all_points = [start_pos]
-    all_borders = set()
-    visited[start_pos] = True
-    here = board.get(start_pos)
-    deltas = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for delta_r, delta_c in deltas:
-        next_p = Point(row=start_pos.row + delta_r, col=start_pos.col + delta_c)
-        if not board.is_on_grid(next_p):
-            continue
-        neighbor = board.get(next_p)
-        if neighbor == here:
-            points, borders = _collect_region(next_p, board, visited)
-            all_points += points
-            all_borders |= borders
-        else:
-            all_borders.add(neighbor)
-    return all_points, all_borders
-# end::scoring_collect_region[]
+    empty holds the indices of the empty points, neighbors their four
+    neighbor indices and size the length of the padded board. Each round a
+    point takes the smallest label among itself and its neighbors, then the
+    label of that label (pointer jumping), so labels cross a big region in
+    a handful of rounds rather than one step per round. Everything that
+    isn't empty keeps the label size, which is larger than any index.
+    """
+    labels = np.full(size, size)
+    labels[empty] = empty
+    current = empty
+    while True:
+        smallest = np.minimum(current, labels[neighbors].min(axis=1))
+        labels[empty] = smallest
+        smallest = labels[smallest]
+        if np.array_equal(smallest, current):
+            return current
+        labels[empty] = smallest
+        current = smallest
+
+
+# tag::scoring_evaluate_territory[]
+def evaluate_territory(board):
+
+    table = _get_scoring_table(board.num_rows, board.num_cols)
+    cells = table.template.copy()
+    black = Player.black
+    cells[table.indices] = [  # <1>
+        EMPTY if stone is None else BLACK if stone is black else WHITE
+        for stone in map(board.get, table.points)]
+
+    empty = table.indices[cells[table.indices] == EMPTY]
+    neighbors = empty[:, np.newaxis] + table.offsets
+    labels = _label_regions(empty, neighbors, len(cells))  # <2>
+
+    neighbor_colors = cells[neighbors]
+    touches_black = np.zeros(len(cells), dtype=bool)
+    touches_white = np.zeros(len(cells), dtype=bool)
+    touches_black[labels[(neighbor_colors == BLACK).any(axis=1)]] = True  # <3>
+    touches_white[labels[(neighbor_colors == WHITE).any(axis=1)]] = True
+    black_region = touches_black[labels]
+    white_region = touches_white[labels]
+
+    is_dame = black_region == white_region  # <4>
+    num_black_stones = int(np.count_nonzero(cells == BLACK))
+    return Territory.from_counts(
+        int(np.count_nonzero(black_region & ~white_region)),
+        int(np.count_nonzero(white_region & ~black_region)),
+        num_black_stones,
+        len(table.points) - len(empty) - num_black_stones,
+        [table.point_at[index] for index in empty[is_dame].tolist()])
+
+# <1> Copy the board into the padded array: the border around it is OFF_BOARD, every point on it EMPTY, BLACK or WHITE.
+# <2> Split the empty points into connected regions.
+# <3> Mark every region that has an empty point next to a black stone, and the same for white.
+# <4> A region that touches only one color is that color's territory; one that touches both, or neither, is dame.
+# end::scoring_evaluate_territory[]
 
 
 # tag::scoring_compute_game_result[]
 def compute_game_result(game_state):
-    territory = evaluate_territory(game_state.board)
+    return compute_board_result(game_state.board)
+
+
+def compute_board_result(board, komi=7.5):
+    """Area score of a board, for when there is no GameState (e.g. at the end of a search rollout)."""
+    territory = evaluate_territory(board)
     return GameResult(
         territory.num_black_territory + territory.num_black_stones,
         territory.num_white_territory + territory.num_white_stones,
-        komi=7.5)
-# end::scoring_compute_game_result[]
\ No newline at end of file
+        komi=komi)
+# end::scoring_compute_game_result[]
@@ -0,0 +1,27 @@
+import copy
+
+"""
+Helpers shared by the search agents (dlgo.agent.mcts, dlgo.agent.parallel_mcts, dlgo.minimax.depthprune) that
+search on a single board with play() and undo() instead of building a GameState per node.
+"""
+
+__all__ = [
+    'SEARCH_BOARD_METHODS',
+    'search_position',
+]
+
+# What a search does with its board, beyond the Board basics every engine has.
+SEARCH_BOARD_METHODS = ('play', 'undo', 'hash_after', 'legal_points')
+
+
+def search_position(game_state):
+    """(board, next_player, history, consecutive_passes) to start a search from, with a board of its own."""
+    missing = [name for name in SEARCH_BOARD_METHODS if not hasattr(game_state.board, name)]
+    if missing:
+        raise TypeError('searching needs a board with %s (goboard_fast, goboard_array or goboard_bitboard); '
+                        '%s.Board has no %s' % (
+                            ', '.join(SEARCH_BOARD_METHODS), type(game_state.board).__module__, ', '.join(missing)))
+    board = copy.deepcopy(game_state.board)
+    history = game_state.previous_states.with_situation((game_state.next_player, board.zobrist_hash()))
+    passes = 1 if game_state.last_move is not None and game_state.last_move.is_pass else 0
+    return board, game_state.next_player, history, passes
@@ -0,0 +1,227 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import time
+from collections import namedtuple
+
+from dlgo.agent import batch_mcts, mcts, naive
+from dlgo.gotypes import Player
+from dlgo.scoring import compute_game_result
+from dlgo.utils import WorkerError
+
+"""
+Headless self-play: complete games between two agents with nothing printed along the way, and the numbers we
+track engine throughput with (games/sec, moves/sec, average game length).
+
+A game log is one line per game,
+
+    <game> <seed> <result> <moves> <seconds>
+
+e.g. "12 1012 W+17.5 143 0.0412", with '#' lines for the settings and the summary. Each game seeds the
+random module with its own seed, so any single game can be replayed from its log line.
+
+SelfPlayFarm runs the same games on a pool of worker processes. Workers take the next game number from a
+shared counter whenever they finish one, so a slow game never holds up a batch, and send finished records
+back on a queue. A game's seed depends only on its number, so results don't depend on the number of
+workers or on which worker played what. A worker that raises sends the exception back and records() raises it
+in the parent; a worker that dies without a word is noticed by its exit code.
+"""
+
+__all__ = [
+    'AGENTS',
+    'GameRecord',
+    'SelfPlayFarm',
+    'SelfPlayStats',
+    'format_record',
+    'make_agent',
+    'play_game',
+]
+
+# Short names for make_agent(). Anything else is given as 'module:Class'.
+AGENTS = {
+    'random': naive.RandomBot,
+    'mcts': mcts.MCTSAgent,
+    'batch-mcts': batch_mcts.BatchMCTSAgent,
+}
+
+
+def make_agent(spec):
+    """Build an agent from a short name in AGENTS or a 'module:Class' path, e.g. 'dlgo.agent.naive:RandomBot'."""
+    if spec in AGENTS:
+        return AGENTS[spec]()
+    module_name, sep, class_name = spec.partition(':')
+    if not sep:
+        raise ValueError('unknown agent %r: use one of %s or module:Class' % (spec, ', '.join(sorted(AGENTS))))
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class GameRecord(namedtuple('GameRecord', 'seed moves winner result num_moves seconds')):
+    """One finished game. result is the scoring.GameResult, or None if the game ended by resignation or
+    hit max_moves; winner is None only for a game cut off at max_moves.
+    """
+    @property
+    def result_string(self):
+        if self.result is not None:
+            return str(self.result)
+        if self.winner is None:
+            return '?'
+        return '%s+R' % ('B' if self.winner == Player.black else 'W')
+
+
+def play_game(engine, board_size, black_agent, white_agent, seed, max_moves=None):
+    """Play one game on engine (a goboard module) and return its GameRecord."""
+    random.seed(seed)
+    agents = {
+        Player.black: black_agent,
+        Player.white: white_agent,
+    }
+    if max_moves is None:
+        max_moves = 10 * board_size * board_size
+    start = time.perf_counter()
+    game = engine.GameState.new_game(board_size)
+    moves = []
+    while not game.is_over() and len(moves) < max_moves:
+        move = agents[game.next_player].select_move(game)
+        game = game.apply_move(move)
+        moves.append(move)
+
+    winner = result = None
+    if game.is_over():
+        if game.last_move.is_resign:
+            winner = game.next_player
+        else:
+            result = compute_game_result(game)
+            winner = result.winner
+    return GameRecord(seed, moves, winner, result, len(moves), time.perf_counter() - start)
+
+
+def format_record(index, record):
+    return '%d %d %s %d %.4f' % (index, record.seed, record.result_string, record.num_moves, record.seconds)
+
+
+class SelfPlayStats:
+    """Running totals over GameRecords."""
+    def __init__(self):
+        self.num_games = 0
+        self.num_moves = 0
+        self.seconds = 0.0
+        self.wins = {Player.black: 0, Player.white: 0, None: 0}
+
+    def add(self, record):
+        self.num_games += 1
+        self.num_moves += record.num_moves
+        self.seconds += record.seconds
+        self.wins[record.winner] += 1
+
+    def summary(self, wall_seconds):
+        """Throughput against wall_seconds, the elapsed time of the whole run."""
+        return 'games=%d moves=%d games/sec=%.2f moves/sec=%.1f avg_length=%.1f black=%d white=%d unfinished=%d' % (
+            self.num_games, self.num_moves,
+            self.num_games / wall_seconds, self.num_moves / wall_seconds,
+            self.num_moves / max(self.num_games, 1),
+            self.wins[Player.black], self.wins[Player.white], self.wins[None])
+
+
+def _farm_worker(engine_name, board_size, black_spec, white_spec, seed, max_moves, num_games, counter, results):
+    # Ctrl-C goes to the whole process group. Workers ignore it and finish the game they are playing;
+    # the parent decides when to stop handing out games.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        engine = importlib.import_module('dlgo.' + engine_name)
+        black = make_agent(black_spec)
+        white = make_agent(white_spec)
+        while True:
+            with counter.get_lock():
+                index = counter.value
+                if index >= num_games:
+                    break
+                counter.value = index + 1
+            results.put((index, play_game(engine, board_size, black, white, seed + index, max_moves)))
+    except Exception as exc:
+        results.put(WorkerError(exc))
+    finally:
+        results.put(None)
+
+
+class SelfPlayFarm:
+    """Plays num_games games on num_workers processes (default: one per core).
+
+    Engine and agents are given by name (see make_agent) so that every
+    worker builds its own. Iterate over records() to get (index, GameRecord)
+    in the order games finish. After stop(), workers finish the games they
+    are playing and start no new ones; records() still returns those.
+    After terminate(), records() returns the games already finished and
+    then ends.
+
+    If a worker raises, records() kills the others and raises the same
+    exception. If a worker dies without reporting (killed, out of memory),
+    records() raises RuntimeError.
+    """
+    # How long records() waits on the queue before checking on the workers.
+    poll_seconds = 1.0
+
+    def __init__(self, engine_name, board_size, black_spec, white_spec, num_games,
+                 seed=0, num_workers=None, max_moves=None):
+        if num_workers is None:
+            num_workers = os.cpu_count()
+        self.num_games = num_games
+        self._counter = multiprocessing.Value('l', 0)
+        self._results = multiprocessing.Queue()
+        self._workers = [
+            multiprocessing.Process(
+                target=_farm_worker,
+                args=(engine_name, board_size, black_spec, white_spec, seed, max_moves,
+                      num_games, self._counter, self._results),
+                daemon=True)
+            for _ in range(num_workers)]
+        self._running = len(self._workers)
+        self._terminated = False
+        for worker in self._workers:
+            worker.start()
+
+    def records(self):
+        while self._running:
+            try:
+                item = self._results.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                if self._terminated:
+                    # Everything the workers finished before they were killed has been returned.
+                    break
+                self._check_workers()
+                continue
+            if item is None:
+                self._running -= 1
+            elif isinstance(item, WorkerError):
+                self.terminate()
+                item.reraise()
+            else:
+                yield item
+        for worker in self._workers:
+            worker.join()
+
+    def _check_workers(self):
+        """Raise if a worker died without sending its sentinel."""
+        for worker in self._workers:
+            if worker.exitcode not in (None, 0):
+                self.terminate()
+                raise RuntimeError('self-play worker %d died with exit code %d' % (worker.pid, worker.exitcode))
+        if all(worker.exitcode is not None for worker in self._workers):
+            # Every worker exited cleanly and the queue stayed empty for a whole poll, yet some
+            # sentinels never came.
+            raise RuntimeError('self-play workers exited without finishing')
+
+    def stop(self):
+        """Stop handing out games."""
+        with self._counter.get_lock():
+            self._counter.value = self.num_games
+
+    def terminate(self):
+        """Kill the workers, dropping the games they are playing. Games they
+        already finished are still returned by records().
+        """
+        for worker in self._workers:
+            worker.terminate()
+        self._terminated = True
@@ -0,0 +1,303 @@
+import os
+import re
+from collections import namedtuple
+
+from dlgo import goboard_fast
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Player, Point
+
+"""
+Reading and writing game records in SGF (FF[4]), one game or many to a file.
+
+Reading streams: iter_games() reads a file in chunks and yields each game as soon as its closing parenthesis
+has been read, so only one game is ever held in memory, however big the file or directory. Finding the end of
+a game takes one regex match per run of text between parentheses (property values, which may contain
+parentheses, are skipped whole), and a game is then split into tokens with a single findall. Only the main
+line is kept: wherever the record branches, the first variation is followed and the others are skipped.
+
+A game comes out as an SGFGame: its root properties plus the main line as (color, point) pairs. goboard_moves()
+turns those into goboard_fast Moves and replay() plays them out as GameStates, with any setup stones (AB/AW,
+e.g. handicap) placed on the starting board.
+
+SGF coordinates are letters, column first, with row 'a' at the top of the board; dlgo's row 1 is at the
+bottom, so a row letter i from the top is row num_rows - i. A pass is B[] (or B[tt] on boards up to 19x19).
+
+    for game in iter_games('games/'):
+        for game_state in replay(game):
+            ...
+"""
+
+__all__ = [
+    'SGFError',
+    'SGFGame',
+    'format_game',
+    'iter_games',
+    'parse_game',
+    'parse_games',
+    'record_to_sgf',
+    'replay',
+    'write_games',
+]
+
+CHUNK_SIZE = 1 << 16
+
+# A run of anything but parentheses, with property values (which may contain them) skipped whole.
+_SKIP = re.compile(r'(?:[^()\[]+|\[(?:[^\\\]]|\\.)*\])*', re.S)
+_TOKEN = re.compile(r'\[((?:[^\\\]]|\\.)*)\]|([();])|([A-Za-z]+)', re.S)
+_ESCAPE = re.compile(r'\\(.)', re.S)
+_SOFT_LINE_BREAK = re.compile(r'\\\r?\n')
+
+
+class SGFError(Exception):
+    pass
+
+
+class SGFGame(namedtuple('SGFGame', 'properties moves')):
+    """properties: the root node's properties, each a list of values. moves: the main line as (color, point)
+    pairs, color 'B' or 'W' and point a Point, or None for a pass.
+    """
+    @property
+    def board_size(self):
+        return int(self.properties.get('SZ', ['19'])[0].split(':')[0])
+
+    @property
+    def komi(self):
+        try:
+            return float(self.properties.get('KM', ['0'])[0])
+        except ValueError:
+            return 0.0
+
+    @property
+    def result(self):
+        return self.properties.get('RE', [None])[0]
+
+    def setup_stones(self):
+        """(Player, Point) for every stone placed on the starting board."""
+        size = self.board_size
+        stones = []
+        for ident, player in (('AB', Player.black), ('AW', Player.white)):
+            for value in self.properties.get(ident, []):
+                stones.extend((player, point) for point in _decode_points(value, size))
+        return stones
+
+    def goboard_moves(self):
+        """The main line as (Player, goboard_fast.Move) pairs."""
+        return [
+            (Player.black if color == 'B' else Player.white,
+             Move.pass_turn() if point is None else Move.play(point))
+            for color, point in self.moves]
+
+
+def _decode_point(value, size):
+    if value == '' or (value == 'tt' and size <= 19):
+        return None
+    if len(value) != 2:
+        raise SGFError('bad point %r' % value)
+    col = ord(value[0]) - 96
+    row = size - (ord(value[1]) - 97)
+    if not (1 <= col <= size and 1 <= row <= size):
+        raise SGFError('point %r off a %dx%d board' % (value, size, size))
+    return Point(row=row, col=col)
+
+
+_point_tables = {}
+
+
+def _point_table(size):
+    """Every point value on a size x size board, decoded: the same Point objects for every game."""
+    if size not in _point_tables:
+        table = {'': None}
+        if size <= 19:
+            table['tt'] = None
+        for row in range(1, size + 1):
+            for col in range(1, size + 1):
+                point = Point(row=row, col=col)
+                table[_encode_point(point, size)] = point
+        _point_tables[size] = table
+    return _point_tables[size]
+
+
+def _decode_points(value, size):
+    """The points of a point or of a compressed rectangle like 'aa:cc'."""
+    if ':' not in value:
+        return [_decode_point(value, size)]
+    first, last = (_decode_point(corner, size) for corner in value.split(':'))
+    return [
+        Point(row=r, col=c)
+        for r in range(min(first.row, last.row), max(first.row, last.row) + 1)
+        for c in range(min(first.col, last.col), max(first.col, last.col) + 1)]
+
+
+def _encode_point(point, size):
+    if point is None:
+        return ''
+    return chr(96 + point.col) + chr(97 + size - point.row)
+
+
+def _unescape(value):
+    return _ESCAPE.sub(r'\1', _SOFT_LINE_BREAK.sub('', value))
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(']', '\\]')
+
+
+def parse_game(text):
+    """The SGFGame of the text of one game tree, '(' to ')'."""
+    properties = {}
+    moves = []
+    size = None
+    points = None
+    # depth: parentheses open; skip_depth: inside a variation that isn't the main line, the depth it started
+    # at; closed: depth at which a variation was just closed, so a '(' there starts a sibling to skip.
+    depth = 0
+    skip_depth = None
+    closed = None
+    num_nodes = 0
+    ident = None
+    for value, punctuation, name in _TOKEN.findall(text):
+        if punctuation == '(':
+            depth += 1
+            if skip_depth is None and closed == depth - 1:
+                skip_depth = depth
+            continue
+        if punctuation == ')':
+            if skip_depth == depth:
+                skip_depth = None
+            depth -= 1
+            closed = depth
+            continue
+        if skip_depth is not None:
+            continue
+        if punctuation == ';':
+            num_nodes += 1
+            if num_nodes == 2:
+                size = int(properties.get('SZ', ['19'])[0].split(':')[0])
+                points = _point_table(size)
+            ident = None
+        elif name:
+            ident = name
+        elif ident is not None:
+            if num_nodes == 1:
+                properties.setdefault(ident, []).append(_unescape(value))
+            elif ident == 'B' or ident == 'W':
+                point = points.get(value, value)
+                if point is value:
+                    # Not a point on this board; _decode_point says why.
+                    point = _decode_point(value, size)
+                moves.append((ident, point))
+    if depth != 0:
+        raise SGFError('unbalanced parentheses')
+    return SGFGame(properties, moves)
+
+
+def parse_games(stream):
+    """Yield the SGFGame of every game tree in a text stream, reading it CHUNK_SIZE characters at a time."""
+    buffer = ''
+    pos = 0
+    depth = 0
+    game_start = None
+    while True:
+        pos = _SKIP.match(buffer, pos).end()
+        if pos == len(buffer) or buffer[pos] == '[':
+            # The end of the buffer, or a property value that goes on past it.
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                if game_start is not None or pos != len(buffer):
+                    raise SGFError('unexpected end of file')
+                return
+            keep = pos if game_start is None else game_start
+            buffer = buffer[keep:] + chunk
+            pos -= keep
+            if game_start is not None:
+                game_start = 0
+            continue
+        if buffer[pos] == '(':
+            if depth == 0:
+                game_start = pos
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                yield parse_game(buffer[game_start:pos + 1])
+                game_start = None
+            elif depth < 0:
+                raise SGFError("')' without '('")
+        pos += 1
+
+
+def _sgf_paths(path):
+    if not os.path.isdir(path):
+        yield path
+        return
+    for directory, subdirectories, filenames in os.walk(path):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.sgf'):
+                yield os.path.join(directory, filename)
+
+
+def iter_games(source):
+    """Yield every game in source: an SGF file, a directory (every .sgf file in it and below, in name order)
+    or an open text stream.
+    """
+    if hasattr(source, 'read'):
+        yield from parse_games(source)
+        return
+    for path in _sgf_paths(source):
+        # Old records come in all sorts of encodings; the structure is ASCII either way.
+        with open(path, encoding='utf-8', errors='replace') as f:
+            yield from parse_games(f)
+
+
+def replay(game):
+    """Yield the goboard_fast GameState after each move of the main line, starting with the position before
+    the first move. A player who moves twice in a row is taken to have passed in between.
+    """
+    game_state = goboard_fast.GameState.new_game(game.board_size)
+    setup_stones = game.setup_stones()
+    if setup_stones:
+        for player, point in setup_stones:
+            game_state.board.place_stone(player, point)
+        if game.moves and game.moves[0][0] == 'W':
+            game_state = goboard_fast.GameState(game_state.board, Player.white, None, None)
+    yield game_state
+    for player, move in game.goboard_moves():
+        if player != game_state.next_player:
+            game_state = game_state.apply_move(Move.pass_turn())
+        game_state = game_state.apply_move(move)
+        yield game_state
+
+
+def format_game(moves, board_size, komi=7.5, result=None, properties=None):
+    """The SGF text of one game: moves are goboard_fast Moves, black first and alternating. Extra root
+    properties (e.g. {'PB': 'mcts'}) come from properties. A resignation ends the record; the result says who
+    resigned.
+    """
+    root = [('GM', '1'), ('FF', '4'), ('CA', 'UTF-8'), ('SZ', str(board_size)), ('KM', '%g' % komi)]
+    if result is not None:
+        root.append(('RE', result))
+    if properties:
+        root.extend(sorted(properties.items()))
+    parts = ['(;', ''.join('%s[%s]' % (ident, _escape(str(value))) for ident, value in root)]
+    color = 'B'
+    for move in moves:
+        if move.is_resign:
+            break
+        parts.append(';%s[%s]' % (color, _encode_point(move.point if move.is_play else None, board_size)))
+        color = 'W' if color == 'B' else 'B'
+    parts.append(')\n')
+    return ''.join(parts)
+
+
+def record_to_sgf(record, board_size, komi=7.5, properties=None):
+    """The SGF text of a selfplay.GameRecord."""
+    result = record.result_string
+    return format_game(record.moves, board_size, komi, None if result == '?' else result, properties)
+
+
+def write_games(path, games):
+    """Write SGF texts (e.g. from format_game) to path, one after another."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for text in games:
+            f.write(text)
@@ -0,0 +1,215 @@
+import numpy as np
+
+from dlgo import zobrist
+from dlgo.gotypes import Point
+
+"""
+The 8 symmetries of a square board (4 rotations, each with or without a reflection), applied to board arrays,
+to move indices and to Points, and used to find a canonical orientation of a position.
+
+Symmetry s transposes the board if s >= 4 and then rotates it s % 4 quarter turns (np.rot90 on the last two
+axes). 0 is the identity, 1-3 are rotations and 4-7 are reflections, so every reflection is its own inverse
+and INVERSE[s] undoes s. Arrays are (..., rows, cols) with row 1 at index 0, the way dlgo.encoders lays out its
+planes, and a move index is (row - 1) * cols + (col - 1) with pass and resignation (rows * cols and one more)
+left alone, as in recordfile and dlgo.dataset.
+
+Each symmetry is a permutation of the points, kept per board size as index arrays, so transforming is a single
+fancy index however many arrays and symmetries there are:
+
+    all_eight = transform_arrays(planes)            # (8, batch, planes, N, N)
+    moves = transform_indices(labels, 19)           # (8, batch)
+    features, labels, chosen = augment(features, labels, rng)
+
+On a rectangular board only the symmetries that keep its shape (the identity, the half turn and two
+reflections) map positions to positions; symmetries() lists them.
+
+goboard_fast.Board keeps the Zobrist hash of its position under all 8 symmetries up to date: for every point
+and color zobrist_codes() has the 8 codes packed into one Python int, 64 bits per symmetry, so a stone placed or
+captured is still a single XOR. canonicalize() picks the symmetry with the smallest hash, so the 8 orientations
+of a position share one key, e.g. for a cache of evaluations.
+"""
+
+__all__ = [
+    'EMPTY_BOARD_HASHES',
+    'INVERSE',
+    'NUM_SYMMETRIES',
+    'augment',
+    'canonical_hash',
+    'canonicalize',
+    'inverse',
+    'symmetries',
+    'transform_arrays',
+    'transform_indices',
+    'transform_point',
+    'transform_points',
+    'unpack_hashes',
+    'zobrist_codes',
+]
+
+NUM_SYMMETRIES = 8
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+HASH_BITS = 64
+_HASH_MASK = (1 << HASH_BITS) - 1
+
+
+def _apply(array, s):
+    """array under symmetry s, by axis operations (a view)."""
+    if s >= 4:
+        array = np.swapaxes(array, -1, -2)
+    return np.rot90(array, s % 4, axes=(-2, -1))
+
+
+class _Tables:
+    """Index arrays for the symmetries of a rows x cols board.
+
+    source[s, j] is the point that symmetry s moves to point j (for reading transformed arrays), and
+    target[s, i] where it moves point i, with two more entries for pass and resignation (for moves). shapes[s]
+    is the (rows, cols) the board has afterwards.
+    """
+    def __init__(self, rows, cols):
+        grid = np.arange(rows * cols).reshape(rows, cols)
+        transformed = [_apply(grid, s) for s in range(NUM_SYMMETRIES)]
+        self.shapes = [t.shape for t in transformed]
+        self.source = np.stack([t.ravel() for t in transformed])
+        self.target = np.empty((NUM_SYMMETRIES, rows * cols + 2), dtype=np.int64)
+        self.target[:, rows * cols:] = [rows * cols, rows * cols + 1]
+        for s in range(NUM_SYMMETRIES):
+            self.target[s, self.source[s]] = np.arange(rows * cols)
+        self.same_shape = [s for s in range(NUM_SYMMETRIES) if self.shapes[s] == (rows, cols)]
+
+
+_tables = {}
+
+
+def _tables_for(rows, cols=None):
+    if cols is None:
+        cols = rows
+    key = (rows, cols)
+    if key not in _tables:
+        _tables[key] = _Tables(rows, cols)
+    return _tables[key]
+
+
+def inverse(s):
+    return INVERSE[s]
+
+
+def symmetries(rows, cols=None):
+    """The symmetries that map a rows x cols board (square if cols is None) onto itself."""
+    return _tables_for(rows, cols).same_shape
+
+
+def transform_arrays(arrays, syms=None):
+    """arrays, shape (..., rows, cols), under each symmetry in syms (default: all 8), as one new array of
+    shape (len(syms), ..., rows, cols). The board must be square unless every symmetry keeps its shape.
+    """
+    rows, cols = arrays.shape[-2:]
+    tables = _tables_for(rows, cols)
+    if syms is None:
+        syms = range(NUM_SYMMETRIES)
+    syms = list(syms)
+    if any(tables.shapes[s] != (rows, cols) for s in syms):
+        raise ValueError('symmetries %s change the shape of a %dx%d board' % (syms, rows, cols))
+    flat = arrays.reshape(arrays.shape[:-2] + (rows * cols,))
+    out = np.take(flat, tables.source[syms], axis=-1)
+    # take() puts the symmetry axis next to last: (..., len(syms), rows * cols).
+    return np.moveaxis(out, -2, 0).reshape((len(syms),) + arrays.shape)
+
+
+def transform_indices(indices, rows, cols=None, syms=None):
+    """Move indices (any shape) under each symmetry in syms (default: all 8): an array of shape
+    (len(syms),) + indices.shape. Pass and resignation stay as they are.
+    """
+    tables = _tables_for(rows, cols)
+    if syms is None:
+        syms = range(NUM_SYMMETRIES)
+    return tables.target[list(syms)][:, np.asarray(indices)]
+
+
+def transform_points(rows_array, cols_array, board_rows, board_cols=None):
+    """Rows and columns (1-based, any shape) under all 8 symmetries: two arrays of shape (8,) + shape."""
+    if board_cols is None:
+        board_cols = board_rows
+    tables = _tables_for(board_rows, board_cols)
+    index = (np.asarray(rows_array) - 1) * board_cols + (np.asarray(cols_array) - 1)
+    target = tables.target[:, index]
+    out_cols = np.array([shape[1] for shape in tables.shapes]).reshape((NUM_SYMMETRIES,) + (1,) * index.ndim)
+    return target // out_cols + 1, target % out_cols + 1
+
+
+def transform_point(point, s, rows, cols=None):
+    """The Point that symmetry s moves point to."""
+    tables = _tables_for(rows, cols)
+    out_cols = tables.shapes[s][1]
+    target = int(tables.target[s, (point.row - 1) * (cols or rows) + point.col - 1])
+    return Point(row=target // out_cols + 1, col=target % out_cols + 1)
+
+
+def augment(arrays, indices, rng=None, syms=None):
+    """Each of a batch of arrays, shape (batch, ..., rows, cols), and its move index under a symmetry of its
+    own, drawn from syms (default: all that keep the board's shape). Returns new arrays, new indices and the
+    symmetry used for each.
+    """
+    rows, cols = arrays.shape[-2:]
+    tables = _tables_for(rows, cols)
+    if rng is None:
+        rng = np.random.default_rng()
+    if syms is None:
+        syms = tables.same_shape
+    chosen = np.asarray(syms)[rng.integers(len(syms), size=len(arrays))]
+    batch = len(arrays)
+    flat = arrays.reshape(batch, -1, rows * cols)
+    out = flat[np.arange(batch)[:, None, None], np.arange(flat.shape[1])[None, :, None],
+               tables.source[chosen][:, None, :]]
+    new_indices = tables.target[chosen, np.asarray(indices)]
+    return out.reshape(arrays.shape), new_indices, chosen
+
+
+_zobrist_codes = {}
+
+
+def zobrist_codes(rows, cols):
+    """For every Point of a rows x cols board, its packed symmetric Zobrist codes by color value (index 1 for
+    black, 2 for white): bits 64 * s and up hold code(T_s(point), color) ^ code(T_s(point), empty), the change
+    of the hash under symmetry s when a stone of that color is placed on point or taken off it.
+    """
+    key = (rows, cols)
+    if key not in _zobrist_codes:
+        codes = zobrist.table()
+        tables = _tables_for(rows, cols)
+        table = {}
+        for r in range(1, rows + 1):
+            for c in range(1, cols + 1):
+                packed = [0, 0, 0]
+                for s in range(NUM_SYMMETRIES):
+                    out_cols = tables.shapes[s][1]
+                    target = int(tables.target[s, (r - 1) * cols + c - 1])
+                    offset = zobrist.point_index(target // out_cols + 1, target % out_cols + 1) * zobrist.NUM_COLORS
+                    for color in (1, 2):
+                        packed[color] |= (codes[offset + color] ^ codes[offset + zobrist.EMPTY]) << (HASH_BITS * s)
+                table[Point(row=r, col=c)] = tuple(packed)
+        _zobrist_codes[key] = table
+    return _zobrist_codes[key]
+
+
+# The packed symmetric hashes of an empty board: EMPTY_BOARD under every symmetry.
+EMPTY_BOARD_HASHES = sum(zobrist.EMPTY_BOARD << (HASH_BITS * s) for s in range(NUM_SYMMETRIES))
+
+
+def unpack_hashes(packed):
+    """The 8 hashes in packed symmetric hashes, by symmetry."""
+    return [(packed >> (HASH_BITS * s)) & _HASH_MASK for s in range(NUM_SYMMETRIES)]
+
+
+def canonicalize(board):
+    """(s, hash) for the symmetry s of board with the smallest Zobrist hash, among those that keep its shape.
+    Transforming the board's arrays by s gives the canonical orientation, whose zobrist_hash() is hash.
+    """
+    hashes = unpack_hashes(board.symmetry_hashes())
+    s = min(symmetries(board.num_rows, board.num_cols), key=hashes.__getitem__)
+    return s, hashes[s]
+
+
+def canonical_hash(board):
+    """A hash that is the same for all orientations of the position on board."""
+    return canonicalize(board)[1]
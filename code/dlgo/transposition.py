@@ -0,0 +1,93 @@
+"""
+A fixed-size transposition table for search agents.
+
+Positions are keyed by (next_player, zobrist_hash), so a position reached through different move orders is
+found again and its stored result (whatever the search wants to keep: a game result, a score and a bound,
+visit counts...) is reused instead of searched again. The key ignores the game history, so in Go two
+positions that differ only in which earlier positions superko forbids share an entry.
+
+The table has a fixed number of slots, allocated up front, so its memory use doesn't grow with the search.
+Each key maps to one slot, picked by Fibonacci hashing (the top bits of the hash times a large odd constant)
+rather than by the low bits of the hash: a hash is the XOR of a few codes, and on small boards the low bits
+of those codes are linearly dependent, so different positions would pile up in the same slots. When two keys
+want the same slot, the new entry replaces the old one if the old one was stored before the last
+new_search() or was searched less deeply; otherwise the new entry is dropped. Replacing a different key
+counts as an eviction.
+"""
+
+__all__ = [
+    'TranspositionTable',
+]
+
+_FIBONACCI = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+class TranspositionTable():
+    def __init__(self, size=1 << 20):
+        """size is rounded up to a power of two."""
+        num_slots = 1
+        bits = 0
+        while num_slots < size:
+            num_slots *= 2
+            bits += 1
+        self._shift = 64 - bits
+        self._hashes = [None] * num_slots
+        self._players = [None] * num_slots
+        self._values = [None] * num_slots
+        self._depths = [0] * num_slots
+        self._generations = [0] * num_slots
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.num_entries = 0
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def get(self, player, zobrist_hash, min_depth=0):
+        """The value stored for this position, or None. With min_depth, only
+        a value from a search at least that deep counts as a hit.
+        """
+        slot = ((zobrist_hash * _FIBONACCI) & _MASK64) >> self._shift
+        if self._hashes[slot] == zobrist_hash and self._players[slot] == player and \
+                self._depths[slot] >= min_depth:
+            self.hits += 1
+            return self._values[slot]
+        self.misses += 1
+        return None
+
+    def put(self, player, zobrist_hash, value, depth=0):
+        """Store value for this position. Returns False if the slot holds a
+        deeper result for another position from the current search.
+        """
+        slot = ((zobrist_hash * _FIBONACCI) & _MASK64) >> self._shift
+        stored_hash = self._hashes[slot]
+        if stored_hash is None:
+            self.num_entries += 1
+        elif stored_hash != zobrist_hash or self._players[slot] != player:
+            if self._generations[slot] == self._generation and self._depths[slot] > depth:
+                return False
+            self.evictions += 1
+        self._hashes[slot] = zobrist_hash
+        self._players[slot] = player
+        self._values[slot] = value
+        self._depths[slot] = depth
+        self._generations[slot] = self._generation
+        self.stores += 1
+        return True
+
+    def new_search(self):
+        """Mark everything stored so far as old: it stays usable, but any new entry may replace it."""
+        self._generation += 1
+
+    def clear(self):
+        self.__init__(len(self))
+
+    def __str__(self):
+        lookups = self.hits + self.misses
+        return '%d/%d slots used, %d hits, %d misses (%.1f%% hit rate), %d stores, %d evictions' % (
+            self.num_entries, len(self), self.hits, self.misses,
+            100.0 * self.hits / lookups if lookups else 0.0, self.stores, self.evictions)
@@ -0,0 +1,215 @@
+import random
+
+import numpy as np
+
+from dlgo.ttt.tttboard import Move
+from dlgo.ttt.ttttypes import Player, Point
+
+"""
+m,n,k games: tic-tac-toe generalized to an m x n board where k in a row wins, e.g. 15x15 five in a row (gomoku
+without the opening rules). GameState.new_game() with no arguments is plain tic-tac-toe, and the public API is
+the same as tttboard.Board / GameState, so the search agents work on any of them.
+
+- The board is a flat list with one cell per point (0 empty, 1 x, 2 o), copied in one slice by apply_move.
+- Only the player who just moved can have made a line, and only through the point they played, so apply_move
+  counts that player's pieces outwards from the point along the four lines through it (row, column and both
+  diagonals) and stores the result on the new state. That's at most 4 * 2 * (k - 1) cells, whatever the board
+  size. k or more in a row wins.
+- has_lines() checks a whole batch of boards, a (batch, m, n) array of cells, with NumPy: for each direction it
+  ANDs k shifted views of the board, so no Python loop runs per board or per point.
+"""
+
+__all__ = [
+    'Board',
+    'GameState',
+    'Move',
+    'has_lines',
+    'winners',
+]
+
+EMPTY, X, O = 0, 1, 2
+PLAYER_TO_CELL = {Player.x: X, Player.o: O}
+CELL_TO_PLAYER = {EMPTY: None, X: Player.x, O: Player.o}
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+tables = {}
+
+
+class _MNKTable:
+    """Points, moves and zobrist codes shared by every board of one size."""
+    def __init__(self, num_rows, num_cols):
+        self.points = [Point(row, col) for row in range(1, num_rows + 1) for col in range(1, num_cols + 1)]
+        self.index = {point: i for i, point in enumerate(self.points)}
+        self.moves = [Move.play(point) for point in self.points]
+        # Codes drawn from a fixed seed per size, so hashes are the same in every run.
+        rng = random.Random('%d,%d' % (num_rows, num_cols))
+        self.hash_codes = [(0, rng.getrandbits(63), rng.getrandbits(63)) for _ in self.points]
+
+
+def get_table(dim):
+    if dim not in tables:
+        tables[dim] = _MNKTable(*dim)
+    return tables[dim]
+
+
+class Board:
+    def __init__(self, num_rows=3, num_cols=3):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._table = get_table((num_rows, num_cols))
+        self._cells = [EMPTY] * (num_rows * num_cols)
+        self._hash = 0
+
+    def place(self, player: Player, point: Point) -> None:
+        assert self.is_on_grid(point)
+        i = self._table.index[point]
+        assert self._cells[i] == EMPTY
+        cell = PLAYER_TO_CELL[player]
+        self._cells[i] = cell
+        self._hash ^= self._table.hash_codes[i][cell]
+
+    def copy(self) -> 'Board':
+        board = Board.__new__(Board)
+        board.num_rows = self.num_rows
+        board.num_cols = self.num_cols
+        board._table = self._table
+        board._cells = self._cells[:]
+        board._hash = self._hash
+        return board
+
+    def __deepcopy__(self, memodict={}):
+        return self.copy()
+
+    def zobrist_hash(self) -> int:
+        return self._hash
+
+    def is_on_grid(self, point: Point) -> bool:
+        return 1 <= point.row <= self.num_rows \
+            and 1 <= point.col <= self.num_cols
+
+    def get(self, point: Point) -> Player:
+        i = self._table.index.get(point)
+        if i is None:
+            return None
+        return CELL_TO_PLAYER[self._cells[i]]
+
+    def cells(self):
+        """The board as a (num_rows, num_cols) array of 0 (empty), 1 (x) and 2 (o), as has_lines() takes it."""
+        return np.array(self._cells, dtype=np.int8).reshape(self.num_rows, self.num_cols)
+
+    def line_through(self, point: Point, k: int) -> bool:
+        """Whether the piece at point is part of k or more in a row."""
+        cells = self._cells
+        cell = cells[self._table.index[point]]
+        if cell == EMPTY:
+            return False
+        num_rows, num_cols = self.num_rows, self.num_cols
+        for dr, dc in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = point.row + sign * dr, point.col + sign * dc
+                while 1 <= r <= num_rows and 1 <= c <= num_cols and \
+                        cells[(r - 1) * num_cols + c - 1] == cell:
+                    count += 1
+                    if count >= k:
+                        return True
+                    r += sign * dr
+                    c += sign * dc
+            if count >= k:
+                return True
+        return False
+
+
+class GameState:
+    def __init__(self, board: Board, next_player: Player, previous: 'GameState', last_move: Move, k: int = 3):
+        self.board = board
+        self.next_player = next_player
+        self.previous = previous
+        self.last_move = last_move
+        self.k = k
+        # Set by apply_move, which knows where a new line could be.
+        self._winner = None
+        self._is_over = False
+        self._num_pieces = 0
+
+    @classmethod
+    def new_game(cls, num_rows=3, num_cols=None, k=None) -> 'GameState':
+        """An empty num_rows x num_cols board (square if num_cols is None) where k in a row wins (k defaults to
+        the shorter side)."""
+        if num_cols is None:
+            num_cols = num_rows
+        if k is None:
+            k = min(num_rows, num_cols)
+        return GameState(board=Board(num_rows, num_cols), next_player=Player.x, previous=None, last_move=None, k=k)
+
+    def apply_move(self, move: Move) -> 'GameState':
+        assert self.is_valid_move(move)
+        player = self.next_player
+        if not move.is_play:
+            # As in tttboard, passing or resigning just hands the turn over.
+            next_state = GameState(self.board, player.other, self, move, self.k)
+            next_state._num_pieces = self._num_pieces
+            return next_state
+
+        board = self.board.copy()
+        board.place(player, move.point)
+        next_state = GameState(board, player.other, self, move, self.k)
+        next_state._num_pieces = self._num_pieces + 1
+        if board.line_through(move.point, self.k):
+            next_state._winner = player
+            next_state._is_over = True
+        else:
+            next_state._is_over = next_state._num_pieces == len(board._cells)
+        return next_state
+
+    def is_valid_move(self, move: Move) -> bool:
+        if self._is_over:
+            return False
+        if move.is_pass or move.is_resign:
+            return True
+        return self.board.is_on_grid(move.point) and self.board.get(move.point) is None
+
+    def legal_moves(self) -> list:
+        """Moves to every empty point, in row order; none once the game is over."""
+        if self._is_over:
+            return []
+        moves = self.board._table.moves
+        return [moves[i] for i, cell in enumerate(self.board._cells) if cell == EMPTY]
+
+    def is_over(self) -> bool:
+        return self._is_over
+
+    def winner(self) -> Player:
+        return self._winner
+
+
+def has_lines(boards, k, cell):
+    """For a (batch, num_rows, num_cols) array of cells, a (batch,) bool array: whether each board has k or
+    more of cell in a row."""
+    pieces = np.asarray(boards) == cell
+    num_rows, num_cols = pieces.shape[1:]
+    found = np.zeros(len(pieces), dtype=bool)
+    for dr, dc in DIRECTIONS:
+        # lines[:, r, c] ends up true if the k cells starting at (r, c) and going (dr, dc) are all pieces.
+        rows = num_rows - (k - 1) * dr
+        cols = num_cols - (k - 1) * abs(dc)
+        if rows <= 0 or cols <= 0:
+            continue
+        col_start = (k - 1) if dc < 0 else 0
+        lines = pieces[:, :rows, col_start:col_start + cols].copy()
+        for step in range(1, k):
+            r = step * dr
+            c = col_start + step * dc
+            lines &= pieces[:, r:r + rows, c:c + cols]
+        found |= lines.any(axis=(1, 2))
+    return found
+
+
+def winners(boards, k):
+    """For a (batch, num_rows, num_cols) array of cells, a (batch,) int8 array of the winner of each board:
+    1 (x), 2 (o) or 0 (no line). Boards from real games never have lines for both players; x wins if they do."""
+    boards = np.asarray(boards)
+    result = np.zeros(len(boards), dtype=np.int8)
+    result[has_lines(boards, k, O)] = O
+    result[has_lines(boards, k, X)] = X
+    return result
@@ -0,0 +1,170 @@
+from dlgo.ttt.tttboard import BOARD_SIZE, HASH_CODE, Move
+from dlgo.ttt.ttttypes import Player, Point
+
+"""
+Bitboard version of tttboard, for when tic-tac-toe is the target of a search benchmark rather than
+something to play. The public API is the same as tttboard.Board / GameState.
+- Each player's pieces are a 9 bit int, bit (row - 1) * 3 + (col - 1) for Point(row, col).
+- A player has won if one of the 8 WIN_MASKS (3 rows, 3 columns, 2 diagonals) is all set in their int. Only the
+  player who just moved can have made a line, and only with a mask through the point they played, so
+  apply_move checks those few masks once and the result is stored on the new state: is_over() and winner()
+  are attribute lookups.
+- A board is just (x, o, hash), so apply_move copies it in O(1). Moves, points and hash codes are precomputed
+  per bit, and nothing is printed.
+"""
+
+__all__ = [
+    'Board',
+    'GameState',
+    'Move',
+    'WIN_MASKS',
+]
+
+NUM_POINTS = BOARD_SIZE * BOARD_SIZE
+FULL_BOARD = (1 << NUM_POINTS) - 1
+
+POINTS = [Point(row, col) for row in range(1, BOARD_SIZE + 1) for col in range(1, BOARD_SIZE + 1)]
+BITS = {point: 1 << i for i, point in enumerate(POINTS)}
+MOVES = [Move.play(point) for point in POINTS]
+
+
+def _line_mask(points):
+    mask = 0
+    for point in points:
+        mask |= BITS[point]
+    return mask
+
+
+WIN_MASKS = tuple(
+    [_line_mask(Point(row, col) for col in range(1, BOARD_SIZE + 1)) for row in range(1, BOARD_SIZE + 1)] +
+    [_line_mask(Point(row, col) for row in range(1, BOARD_SIZE + 1)) for col in range(1, BOARD_SIZE + 1)] +
+    [_line_mask(Point(i, i) for i in range(1, BOARD_SIZE + 1)),
+     _line_mask(Point(i, BOARD_SIZE + 1 - i) for i in range(1, BOARD_SIZE + 1))])
+# For each point, the win masks through it.
+MASKS_THROUGH = [tuple(mask for mask in WIN_MASKS if mask & (1 << i)) for i in range(NUM_POINTS)]
+# Same codes as tttboard, so hashes are comparable across engines.
+HASH_CODES = [{player: HASH_CODE[point, player] for player in (Player.x, Player.o)} for point in POINTS]
+
+
+def has_line(pieces):
+    """Whether a 9 bit set of pieces contains a win mask."""
+    for mask in WIN_MASKS:
+        if pieces & mask == mask:
+            return True
+    return False
+
+
+class Board:
+    def __init__(self):
+        self.num_rows = BOARD_SIZE
+        self.num_cols = BOARD_SIZE
+        self._x = 0
+        self._o = 0
+        self._hash = 0
+
+    def place(self, player: Player, point: Point) -> None:
+        bit = BITS[point]
+        assert not (self._x | self._o) & bit
+        if player == Player.x:
+            self._x |= bit
+        else:
+            self._o |= bit
+        self._hash ^= HASH_CODE[point, player]
+
+    def copy(self) -> 'Board':
+        board = Board.__new__(Board)
+        board.num_rows = BOARD_SIZE
+        board.num_cols = BOARD_SIZE
+        board._x = self._x
+        board._o = self._o
+        board._hash = self._hash
+        return board
+
+    def __deepcopy__(self, memodict={}):
+        return self.copy()
+
+    def zobrist_hash(self) -> int:
+        return self._hash
+
+    def pieces(self, player: Player) -> int:
+        return self._x if player == Player.x else self._o
+
+    def empty_points(self) -> int:
+        return FULL_BOARD & ~(self._x | self._o)
+
+    @staticmethod
+    def is_on_grid(point: Point) -> bool:
+        return 1 <= point.row <= BOARD_SIZE \
+            and 1 <= point.col <= BOARD_SIZE
+
+    def get(self, point: Point) -> Player:
+        bit = BITS.get(point)
+        if bit is None:
+            return None
+        if self._x & bit:
+            return Player.x
+        if self._o & bit:
+            return Player.o
+        return None
+
+
+class GameState:
+    def __init__(self, board: Board, next_player: Player, previous: 'GameState', last_move: Move):
+        self.board = board
+        self.next_player = next_player
+        self.previous = previous
+        self.last_move = last_move
+        # Set by apply_move, which knows which lines the last move could have made.
+        self._winner = None
+        self._is_over = False
+
+    @classmethod
+    def new_game(cls) -> 'GameState':
+        return GameState(board=Board(), next_player=Player.x, previous=None, last_move=None)
+
+    def apply_move(self, move: Move) -> 'GameState':
+        assert self.is_valid_move(move)
+        player = self.next_player
+        if not move.is_play:
+            # As in tttboard, passing or resigning just hands the turn over.
+            return GameState(self.board, player.other, self, move)
+
+        index = (move.point.row - 1) * BOARD_SIZE + move.point.col - 1
+        board = self.board.copy()
+        if player == Player.x:
+            board._x |= 1 << index
+            pieces = board._x
+        else:
+            board._o |= 1 << index
+            pieces = board._o
+        board._hash ^= HASH_CODES[index][player]
+        next_state = GameState(board, player.other, self, move)
+        for mask in MASKS_THROUGH[index]:
+            if pieces & mask == mask:
+                next_state._winner = player
+                next_state._is_over = True
+                break
+        else:
+            next_state._is_over = board._x | board._o == FULL_BOARD
+        return next_state
+
+    def is_valid_move(self, move: Move) -> bool:
+        if self._is_over:
+            return False
+        if move.is_pass or move.is_resign:
+            return True
+        bit = BITS.get(move.point)
+        return bit is not None and not (self.board._x | self.board._o) & bit
+
+    def legal_moves(self) -> list:
+        """The moves to empty points, in the same order as tttboard; none once the game is over."""
+        if self._is_over:
+            return []
+        empty = FULL_BOARD & ~(self.board._x | self.board._o)
+        return [MOVES[i] for i in range(NUM_POINTS) if empty >> i & 1]
+
+    def is_over(self) -> bool:
+        return self._is_over
+
+    def winner(self) -> Player:
+        return self._winner
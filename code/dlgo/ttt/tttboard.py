@@ -1,4 +1,5 @@
 import copy
+import random
 
 from dlgo.ttt.ttttypes import Player, Point
 
@@ -21,6 +22,15 @@ DIAG_1 = (Point(1, 1), Point(2, 2), Point(3, 3))
 # Top right to lower left diagonal
 DIAG_2 = (Point(1, 3), Point(2, 2), Point(3, 1))
 
+# Zobrist codes, drawn from a fixed seed so hashes are the same in every run.
+_hash_rng = random.Random(20230101)
+HASH_CODE = {
+    (Point(row, col), player): _hash_rng.getrandbits(63)
+    for row in ROWS
+    for col in COLS
+    for player in (Player.x, Player.o)
+}
+
 
 # class Move:
 #     def __init__(self, point):
@@ -56,6 +66,7 @@ class Board:
         self.num_rows = BOARD_SIZE
         self.num_cols = BOARD_SIZE
         self._grid = {}
+        self._hash = 0
 
     def place(self, player: Player, point: Point) -> None:
         """
@@ -64,6 +75,10 @@ class Board:
         assert self._grid.get(point) is None
         assert self.is_on_grid(point)
         self._grid[point] = player
+        self._hash ^= HASH_CODE[point, player]
+
+    def zobrist_hash(self) -> int:
+        return self._hash
 
     @staticmethod
     def is_on_grid(point: Point) -> bool:
@@ -95,8 +110,6 @@ class GameState:
 
     def apply_move(self, move: Move) -> 'GameState':
         # You don't need Player as input because you know who is playing.
-        print(move)
-        print(move.point)
         assert self.is_valid_move(move)
         if move.is_play:
             next_board = copy.deepcopy(self.board)
@@ -126,7 +139,8 @@ class GameState:
             for c in COLS:
                 point = Point(r,c)
                 if self.board.get(point) is None:
-                    moves.append()
+                    moves.append(Move.play(point))
+        return moves
 
     def _has_3_in_a_row(self, player: Player) -> bool:
         # Vertical
@@ -1,5 +1,7 @@
+import pickle
 import platform
 import subprocess
+import traceback
 
 import numpy as np
 
@@ -67,8 +69,10 @@ class MoveAge():
 
     Methods:
         reset_age(point): Sets the age of "point" back to -1
+        set_age(point, age): Sets the age of "point" to "age"
         add(point): Sets the age of "point" to 0
         increment_all(): increments all the ages by 1
+        decrement_all(): undoes increment_all
 
     """
 
@@ -81,8 +85,39 @@ class MoveAge():
     def reset_age(self, point):
         self.move_ages[point.row - 1, point.col - 1] = -1
 
+    def set_age(self, point, age):
+        self.move_ages[point.row - 1, point.col - 1] = age
+
     def add(self, point):
         self.move_ages[point.row - 1, point.col - 1] = 0
 
     def increment_all(self):
-        self.move_ages[self.move_ages > -1] += 1
\ No newline at end of file
+        self.move_ages[self.move_ages > -1] += 1
+
+    def decrement_all(self):
+        self.move_ages[self.move_ages > -1] -= 1
+
+
+class RemoteTraceback(Exception):
+    """The formatted traceback of an exception raised in another process, chained as the __cause__ of the
+    re-raised one so that both tracebacks are printed.
+    """
+    def __str__(self):
+        return self.args[0]
+
+
+class WorkerError():
+    """What a worker process sends back on its result queue instead of a result when it raises. The process
+    reading the queue calls reraise().
+    """
+    def __init__(self, exc):
+        self.traceback = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        try:
+            # Not every exception survives the queue; keep the message of one that doesn't.
+            pickle.loads(pickle.dumps(exc))
+        except Exception:
+            exc = RuntimeError(repr(exc))
+        self.exc = exc
+
+    def reraise(self):
+        raise self.exc from RemoteTraceback(self.traceback)
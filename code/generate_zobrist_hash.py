@@ -1,7 +1,15 @@
-import random
+import sys
 
+from dlgo import zobrist
 from dlgo.gotypes import Point, Player
 
+# The codes are no longer generated into dlgo/zobrist.py: zobrist.table() draws them from a fixed seed on first use.
+# This prints the codes for one board size as the old (Point, Player) dict literal, for inspecting them or
+# exporting them to other tools:
+#
+#     python generate_zobrist_hash.py 19
+
+
 def to_python(player_state):
     if player_state is None:
         return 'None'
@@ -9,34 +17,24 @@ def to_python(player_state):
         return Player.black
     return Player.white
 
-MAX63 = 0x7fffffffffffffff
-
-table = {}
-empty_board = 0 
-for row in range(1, 20):
-    for col in range (1, 20):
-        for state in (Player.white, Player.black):
-            code = random.randint(0, MAX63)
-            table[Point(row, col), state] = code
-
-        
-# print('from .gotypes import Player, Point')
-# print('')
-# print("__all__ = ['HASH_CODE', 'EMPTY_BOARD']")
-# print('HASH_CODE = {')
-# for (pt, state), hash_code in table.items():
-#     print(f'    ({pt}, {to_python(state)}): {hash_code},')
-# print('}')
-# print('')
-# print(f'EMPTY_BOARD = {(empty_board,)}')
-
-print('from .gotypes import Player, Point')
-print('')
-print("__all__ = ['HASH_CODE', 'EMPTY_BOARD']")
-print('')
-print('HASH_CODE = {')
-for (pt, state), hash_code in table.items():
-    print('    (%r, %s): %r,' % (pt, to_python(state), hash_code))
-print('}')
-print('')
-print('EMPTY_BOARD = %d' % (empty_board,))
\ No newline at end of file
+
+def main():
+    board_size = int(sys.argv[1]) if len(sys.argv) > 1 else 19
+
+    print('from .gotypes import Player, Point')
+    print('')
+    print("__all__ = ['HASH_CODE', 'EMPTY_BOARD']")
+    print('')
+    print('HASH_CODE = {')
+    for row in range(1, board_size + 1):
+        for col in range(1, board_size + 1):
+            pt = Point(row, col)
+            for state in (None, Player.black, Player.white):
+                print('    (%r, %s): %r,' % (pt, to_python(state), zobrist.code(pt, state)))
+    print('}')
+    print('')
+    print('EMPTY_BOARD = %d' % (zobrist.EMPTY_BOARD,))
+
+
+if __name__ == '__main__':
+    main()
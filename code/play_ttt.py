@@ -1,5 +1,8 @@
-from dlgo import agent
+import argparse
+import time
+
 from dlgo import ttt
+from dlgo.minimax import MinimaxAgent, TicTacToeSolver
 
 
 COL_NAMES = 'ABC'
@@ -27,14 +30,24 @@ def point_from_coords(text):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--table', help='load the solved game from this file, or solve it and save it there')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.table:
+        solver = TicTacToeSolver.load_or_solve(args.table)
+    else:
+        solver = TicTacToeSolver.solved()
+    how = 'solved' if solver.solve_seconds is not None else 'loaded'
+    print('%s %d positions in %.1f ms' % (how, len(solver), 1000 * (time.perf_counter() - start)))
+
     game = ttt.GameState.new_game()
 
     human_player = ttt.Player.x
     # bot_player = ttt.Player.o
 
-    # bot = minimax.MinimaxAgent()
-    bot = agent.RandomBot()
-
+    bot = MinimaxAgent(solver=solver)
 
     while not game.is_over():
         print_board(game.board)
@@ -0,0 +1,154 @@
+import argparse
+import importlib
+import os
+import signal
+import sys
+import time
+
+from dlgo import recordfile, selfplay, sgf
+
+"""
+Plays complete games between two agents without rendering anything and reports throughput. This is the
+number to track when changing a board engine; bot_v_bot.py is for watching a game.
+
+    python self_play.py --engine goboard_fast --board-size 9 --games 100 --log games.log
+    python self_play.py --black random --white dlgo.agent.naive:RandomBot
+    python self_play.py --games 10000 --workers 0 --log games.log
+    python self_play.py --black mcts --white random --games 20 --sgf games.sgf
+    python self_play.py --board-size 19 --games 1000 --workers 0 --records games.bin
+
+With --workers the games are spread over that many processes (0: one per core). Either way the totals are
+printed every --report-every seconds while the games run. Ctrl-C stops starting new games, waits for the ones
+being played and logs them; a second Ctrl-C drops the games in progress. A game that has finished is always
+logged: Ctrl-C never interrupts recording it.
+"""
+
+
+class CtrlC:
+    """SIGINT handler for the game loop: the first Ctrl-C calls on_stop, later ones call on_kill. Neither is
+    meant to raise while a finished game is being recorded.
+    """
+    def __init__(self, on_stop, on_kill):
+        self.count = 0
+        self.on_stop = on_stop
+        self.on_kill = on_kill
+
+    def __call__(self, signum, frame):
+        self.count += 1
+        # os.write, not print: the handler may run in the middle of a print.
+        if self.count == 1:
+            os.write(2, b'stopping: finishing the games in progress (Ctrl-C again to drop them)\n')
+            self.on_stop()
+        else:
+            self.on_kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine', default='goboard_fast')
+    parser.add_argument('--board-size', type=int, default=9)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--black', default='random', help='agent name (%s) or module:Class' % (
+        ', '.join(sorted(selfplay.AGENTS)),))
+    parser.add_argument('--white', default='random')
+    parser.add_argument('--max-moves', type=int, default=None, help='default: 10 * board size^2')
+    parser.add_argument('--seed', type=int, default=0, help='game i is seeded with seed + i')
+    parser.add_argument('--log', default=None, help='write one line per game here ("-" for stdout)')
+    parser.add_argument('--workers', type=int, default=1, help='processes to play on, 0 for one per core')
+    parser.add_argument('--report-every', type=float, default=10.0, help='seconds between progress lines')
+    parser.add_argument('--sgf', default=None, help='write every game to this SGF file')
+    parser.add_argument('--records', default=None, help='append every game to this record file (see recordfile)')
+    args = parser.parse_args()
+
+    engine = importlib.import_module('dlgo.' + args.engine)
+    black = selfplay.make_agent(args.black)
+    white = selfplay.make_agent(args.white)
+
+    log = None
+    if args.log == '-':
+        log = sys.stdout
+    elif args.log is not None:
+        log = open(args.log, 'w')
+    if log is not None:
+        log.write('# engine=%s board_size=%d black=%s white=%s seed=%d\n' % (
+            args.engine, args.board_size, args.black, args.white, args.seed))
+
+    sgf_file = None
+    if args.sgf is not None:
+        sgf_file = open(args.sgf, 'w', encoding='utf-8')
+    records = None
+    if args.records is not None:
+        records = recordfile.RecordWriter(args.records, args.board_size)
+
+    stats = selfplay.SelfPlayStats()
+    start = time.perf_counter()
+
+    def add(index, record):
+        stats.add(record)
+        if log is not None:
+            log.write(selfplay.format_record(index, record) + '\n')
+        if sgf_file is not None:
+            sgf_file.write(sgf.record_to_sgf(record, args.board_size, properties={
+                'PB': args.black, 'PW': args.white, 'GN': 'seed %d' % record.seed}))
+        if records is not None:
+            records.add_record(record)
+
+    if args.workers == 1:
+        playing = False
+
+        def drop_game():
+            # Only a game still being played is dropped; once play_game returns the record is kept.
+            if playing:
+                raise KeyboardInterrupt
+
+        def games():
+            nonlocal playing
+            for i in range(args.games):
+                if ctrl_c.count:
+                    return
+                record = None
+                try:
+                    playing = True
+                    record = selfplay.play_game(engine, args.board_size, black, white, args.seed + i, args.max_moves)
+                    playing = False
+                except KeyboardInterrupt:
+                    if record is None:
+                        return
+                yield i, record
+
+        ctrl_c = CtrlC(on_stop=lambda: None, on_kill=drop_game)
+        finished = games()
+    else:
+        farm = selfplay.SelfPlayFarm(
+            args.engine, args.board_size, args.black, args.white, args.games,
+            seed=args.seed, num_workers=args.workers or None, max_moves=args.max_moves)
+        # After terminate() records() still returns the games that were already finished.
+        ctrl_c = CtrlC(on_stop=farm.stop, on_kill=farm.terminate)
+        finished = farm.records()
+
+    previous_handler = signal.signal(signal.SIGINT, ctrl_c)
+    try:
+        last_report = start
+        for index, record in finished:
+            add(index, record)
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                print('  ' + stats.summary(now - start), flush=True)
+                last_report = now
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    summary = stats.summary(time.perf_counter() - start)
+
+    if log is not None:
+        log.write('# ' + summary + '\n')
+        if log is not sys.stdout:
+            log.close()
+    if sgf_file is not None:
+        sgf_file.close()
+    if records is not None:
+        records.close()
+    print('%s %dx%d: %s' % (args.engine, args.board_size, args.board_size, summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dlgo.dataset import Dataset, build_dataset
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Point
+from dlgo.recordfile import RecordWriter
+
+
+class DatasetTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.records = os.path.join(self.directory, 'games.bin')
+
+    def build(self, games):
+        with RecordWriter(self.records, 5) as writer:
+            for moves in games:
+                writer.add(moves, result='B+1.5')
+        data = os.path.join(self.directory, 'data')
+        build_dataset(self.records, data, 'oneplane', shard_size=2, num_workers=1)
+        return Dataset(data)
+
+    def test_take(self):
+        moves = [Move.play(Point(3, 3)), Move.play(Point(2, 2)), Move.play(Point(4, 4)), Move.pass_turn()]
+        dataset = self.build([moves])
+        self.assertEqual(len(dataset), 4)
+        features, labels = dataset.take([3, 0])
+        self.assertEqual(features.shape, (2,) + dataset.shape)
+        self.assertEqual(labels.tolist(), [25, 12])
+
+    def test_empty_dataset(self):
+        # A resignation is not a position, so this game gives no shards at all.
+        dataset = self.build([[Move.resign()]])
+        self.assertEqual(dataset.features, [])
+        self.assertEqual(len(dataset), 0)
+        features, labels = dataset.take(np.arange(0))
+        self.assertEqual(features.shape, (0,) + dataset.shape)
+        self.assertEqual(features.dtype, np.float32)
+        self.assertEqual(len(labels), 0)
+        self.assertEqual(list(dataset.batches(8)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
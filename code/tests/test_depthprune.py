@@ -0,0 +1,26 @@
+import unittest
+
+from dlgo import goboard_array, goboard_bitboard, goboard_fast
+from dlgo.gotypes import Player, Point
+from dlgo.minimax.depthprune import territory_eval
+
+
+class TerritoryEvalTest(unittest.TestCase):
+    def test_same_score_on_every_engine(self):
+        # A 3-stone white string in atari on 5x5: its only liberty is (2, 5).
+        black = [Point(1, 2), Point(1, 3), Point(1, 4), Point(2, 1), Point(3, 2), Point(3, 3), Point(3, 4)]
+        white = [Point(2, 2), Point(2, 3), Point(2, 4)]
+        scores = {}
+        for engine in (goboard_fast, goboard_array, goboard_bitboard):
+            board = engine.Board(5, 5)
+            for point in black:
+                board.place_stone(Player.black, point)
+            for point in white:
+                board.place_stone(Player.white, point)
+            scores[engine.__name__] = territory_eval(board, Player.black)
+        # Black's area is 5 points more than white's, and the white string counts 2 per stone as captured.
+        self.assertEqual(scores, {name: 11 for name in scores})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import importlib
+import random
+import unittest
+
+from dlgo import goboard_fast
+from dlgo.agent import naive
+from dlgo.gotypes import Player, Point
+
+"""
+The alternate board engines must behave exactly like goboard_fast. Random games are played on goboard_fast;
+every move is replayed on the candidate engine and after each move the two boards must agree on every point,
+every string's stones and liberties, the zobrist hash, the set of legal moves and, for both players,
+Board.legal_points() (which the search agents rely on).
+
+compare_engines.py times the engines against each other.
+"""
+
+ENGINES = ['goboard_array', 'goboard_bitboard']
+BOARD_SIZES = [5, 9]
+NUM_GAMES = 3
+SEED = 0
+
+
+class EngineParityTest(unittest.TestCase):
+    def assert_same_position(self, reference, candidate):
+        ref_board, cand_board = reference.board, candidate.board
+        self.assertEqual(ref_board.zobrist_hash(), cand_board.zobrist_hash(), 'zobrist hashes differ')
+        for r in range(1, ref_board.num_rows + 1):
+            for c in range(1, ref_board.num_cols + 1):
+                point = Point(r, c)
+                self.assertEqual(ref_board.get(point), cand_board.get(point), 'stones differ at %s' % (point,))
+                ref_string = ref_board.get_go_string(point)
+                if ref_string is not None:
+                    cand_string = cand_board.get_go_string(point)
+                    self.assertEqual(ref_string.stones, cand_string.stones, 'strings differ at %s' % (point,))
+                    self.assertEqual(
+                        ref_string.liberties, cand_string.liberties, 'liberties differ at %s' % (point,))
+        self.assertEqual(reference.next_player, candidate.next_player)
+        # goboard_fast returns its legal moves in no particular order.
+        self.assertEqual(set(reference.legal_moves()), set(candidate.legal_moves()), 'legal moves differ')
+        for player in (Player.black, Player.white):
+            ref_legal, ref_capturing = ref_board.legal_points(player)
+            cand_legal, cand_capturing = cand_board.legal_points(player)
+            self.assertEqual(set(ref_legal), set(cand_legal), 'legal points differ for %s' % (player,))
+            self.assertEqual(
+                set(ref_capturing), set(cand_capturing), 'capturing points differ for %s' % (player,))
+
+    def check_parity(self, candidate_engine, board_size):
+        random.seed(SEED)
+        bot = naive.RandomBot()
+        for _ in range(NUM_GAMES):
+            reference = goboard_fast.GameState.new_game(board_size)
+            candidate = candidate_engine.GameState.new_game(board_size)
+            while not reference.is_over():
+                move = bot.select_move(reference)
+                self.assertTrue(candidate.is_valid_move(move), '%s is not valid on %s' % (
+                    move, candidate_engine.__name__))
+                reference = reference.apply_move(move)
+                candidate = candidate.apply_move(move)
+                self.assert_same_position(reference, candidate)
+            self.assertTrue(candidate.is_over())
+
+    def test_engines_match_goboard_fast(self):
+        for engine_name in ENGINES:
+            engine = importlib.import_module('dlgo.' + engine_name)
+            for board_size in BOARD_SIZES:
+                with self.subTest(engine=engine_name, board_size=board_size):
+                    self.check_parity(engine, board_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import math
+import os
+import tempfile
+import unittest
+
+from dlgo.goboard_fast import Move
+from dlgo.gotypes import Point
+from dlgo.recordfile import RecordReader, RecordWriter, parse_result
+
+
+class RecordFileTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'games.bin')
+
+    def test_draw_round_trip(self):
+        moves = [Move.play(Point(3, 3)), Move.play(Point(2, 2)), Move.pass_turn(), Move.pass_turn()]
+        results = [0, 0.0, '0', 'Draw', 'B+3.5', None]
+        with RecordWriter(self.path, 5) as writer:
+            for result in results:
+                writer.add(moves, komi=0.0, result=result)
+        with RecordReader(self.path) as reader:
+            self.assertEqual(len(reader), len(results))
+            self.assertEqual([reader.result(i) for i in range(len(reader))], ['0', '0', '0', '0', 'B+3.5', '?'])
+            self.assertEqual(reader.moves(0), moves)
+
+    def test_parse_result(self):
+        self.assertEqual(parse_result('0'), 0.0)
+        self.assertEqual(parse_result('W+R'), -math.inf)
+        self.assertTrue(math.isnan(parse_result(None)))
+        self.assertTrue(math.isnan(parse_result('')))
+        self.assertTrue(math.isnan(parse_result('?')))
+
+
+if __name__ == '__main__':
+    unittest.main()